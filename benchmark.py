@@ -0,0 +1,241 @@
+"""
+链接过滤流程的性能基准 - 使用合成列表页,不需要浏览器
+
+测量每个链接的平均耗时和内存分配(峰值、运行结束后仍占用的内存):
+- candidates: page_candidates(过滤非职位链接 + 本页去重)
+- dedupe:     job_id跨页去重(与抓取循环相同)
+- filter:     JobFilter.apply(排除/匹配关键字,生成职位记录)
+- pipeline:   以上三步串联
+- scrape:     JobScraper._scrape_current_page(经由FakeWebDriver提取链接,需要安装selenium)
+- rank:       按关键字相关度给所有候选职位打分并取前100个(ranking.rank_jobs,有NumPy时向量化)
+
+另外比较每个职位记录的内存: 字典 {'title', 'url'} 与 Job(__slots__,URL前缀驻留)。
+
+用法:
+    python benchmark.py                       # 1万、10万链接
+    python benchmark.py --links 1000000 --repeat 1
+    python benchmark.py --stages filter --keywords AI 算法
+"""
+
+import argparse
+import contextlib
+import gc
+import os
+import time
+import tracemalloc
+
+from fake_browser import FakeWebDriver, synthetic_pages
+from job_filter import JobCounter, JobFilter, page_candidates
+from job_record import Job
+from url_tools import job_id
+
+
+DEFAULT_KEYWORDS = ['AI', '大模型', '算法']
+DEFAULT_EXCLUDE = ['实习', '销售']
+
+
+def _dedupe(candidates, seen_ids):
+    """跨页去重(与JobScraper._iter_crawl相同)"""
+    new_ids = {}
+    for href, text in candidates:
+        key = job_id(href)
+        if key not in seen_ids:
+            new_ids.setdefault(key, (href, text))
+    seen_ids.update(new_ids)
+    return list(new_ids.values())
+
+
+def stage_candidates(pages, keywords, exclude):
+    for links in pages:
+        page_candidates(links)
+
+
+def stage_dedupe(pages, keywords, exclude):
+    seen_ids = set()
+    for candidates in [page_candidates(links) for links in pages]:
+        _dedupe(candidates, seen_ids)
+
+
+def stage_filter(pages, keywords, exclude):
+    job_filter = JobFilter(keywords, exclude)
+    jobs = JobCounter()
+    for candidates in [page_candidates(links) for links in pages]:
+        job_filter.apply(candidates, jobs)
+
+
+def stage_pipeline(pages, keywords, exclude):
+    job_filter = JobFilter(keywords, exclude)
+    jobs = JobCounter()
+    seen_ids = set()
+    for links in pages:
+        job_filter.apply(_dedupe(page_candidates(links), seen_ids), jobs)
+
+
+def stage_scrape(pages, keywords, exclude):
+    from web_scraper import JobScraper
+    driver = FakeWebDriver(pages)
+    scraper = JobScraper(driver=driver)
+    for page_num in range(1, len(pages) + 1):
+        driver.get(f"https://www.zhaopin.com/sou/jl530/kw010G0I8/p{page_num}")
+        scraper._scrape_current_page()
+
+
+def stage_rank(pages, keywords, exclude):
+    from ranking import RelevanceProfile, rank_jobs
+    jobs = [Job(text, href) for links in pages for href, text in page_candidates(links)]
+    rank_jobs(jobs, RelevanceProfile(keywords, exclude), top_k=100)
+
+
+STAGES = {
+    'candidates': stage_candidates,
+    'dedupe': stage_dedupe,
+    'filter': stage_filter,
+    'pipeline': stage_pipeline,
+    'scrape': stage_scrape,
+    'rank': stage_rank,
+}
+
+# 计时时排除的准备工作(各阶段的前置步骤单独计时后扣除)
+BASELINES = {
+    'dedupe': 'candidates',
+    'filter': 'candidates',
+    'rank': 'candidates',
+}
+
+
+def _run_quiet(func, *args):
+    """运行时丢弃输出(过滤器每个匹配职位打印一行,计入耗时但不刷屏)"""
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        return func(*args)
+
+
+def time_stage(func, pages, keywords, exclude, repeat):
+    """
+    多次运行取最快一次
+    Returns:
+        float: 耗时(秒)
+    """
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        _run_quiet(func, pages, keywords, exclude)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def measure_allocations(func, pages, keywords, exclude):
+    """
+    内存分配统计(tracemalloc,只统计运行期间新分配的内存)
+    Returns:
+        tuple: (峰值内存字节数, 运行结束后仍占用的字节数)
+    """
+    gc.collect()
+    tracemalloc.start()
+    _run_quiet(func, pages, keywords, exclude)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, retained
+
+
+def job_memory(pages):
+    """
+    每个职位记录占用的内存(tracemalloc,包括标题和URL字符串)
+    Returns:
+        dict: {'jobs': 职位数, 'dict': 字典每个职位字节数, 'Job': Job每个职位字节数}
+    """
+    candidates = [(href, text, page_num) for page_num, links in enumerate(pages, 1)
+                  for href, text in page_candidates(links)]
+    page_urls = [f"https://www.zhaopin.com/sou/jl530/kw010G0I8/p{n}" for n in range(len(pages) + 1)]
+    sizes = {'jobs': len(candidates)}
+    if not candidates:
+        return sizes
+
+    def copy(value):
+        # 真实抓取时每个标题/URL都是从页面新读取的字符串,不与生成器共享
+        return (value + ' ')[:-1]
+
+    builders = {
+        'dict': lambda href, text, n: {'title': copy(text), 'url': copy(href), 'source_page': page_urls[n]},
+        'Job': lambda href, text, n: Job(copy(text), copy(href), source_page=page_urls[n]),
+    }
+    for name, build in builders.items():
+        gc.collect()
+        tracemalloc.start()
+        records = [build(href, text, n) for href, text, n in candidates]
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        sizes[name] = current / len(records)
+        del records
+    return sizes
+
+
+def run(links_counts, stages, keywords, exclude, repeat=3, page_size=100, seed=0, allocations=True):
+    """
+    运行基准
+    Returns:
+        list: [{'links', 'stage', 'seconds', 'ns_per_link', 'peak_bytes_per_link', 'retained_bytes_per_link'}, ...]
+    """
+    results = []
+    for count in links_counts:
+        pages = synthetic_pages(count, page_size=page_size, seed=seed)
+        print(f"\n===== {count:,} 个链接({len(pages)} 页) =====")
+        print(f"{'阶段':<12}{'总耗时':>10}{'每链接':>12}{'峰值内存/链接':>14}{'残留内存/链接':>14}")
+
+        for stage in stages:
+            func = STAGES[stage]
+            try:
+                seconds = time_stage(func, pages, keywords, exclude, repeat)
+            except ImportError as e:
+                print(f"{stage:<12}跳过(缺少依赖: {e.name})")
+                continue
+
+            peak, retained = measure_allocations(func, pages, keywords, exclude) if allocations else (0, 0)
+            result = {
+                'links': count,
+                'stage': stage,
+                'seconds': seconds,
+                'ns_per_link': seconds / count * 1e9,
+                'peak_bytes_per_link': peak / count,
+                'retained_bytes_per_link': retained / count,
+            }
+            results.append(result)
+            print(f"{stage:<12}{seconds * 1000:>8.1f}ms{result['ns_per_link']:>10.0f}ns"
+                  f"{result['peak_bytes_per_link']:>14.0f}B{result['retained_bytes_per_link']:>14.0f}B")
+
+        # 扣除前置步骤,得到该阶段本身的耗时
+        by_stage = {r['stage']: r for r in results if r['links'] == count}
+        for stage, baseline in BASELINES.items():
+            if stage in by_stage and baseline in by_stage:
+                own = by_stage[stage]['ns_per_link'] - by_stage[baseline]['ns_per_link']
+                print(f"  {stage} 本身约 {own:.0f}ns/链接(扣除{baseline})")
+
+        if allocations:
+            sizes = job_memory(pages)
+            if 'Job' in sizes:
+                print(f"职位记录内存({sizes['jobs']:,} 个): 字典 {sizes['dict']:.0f}B/个, "
+                      f"Job {sizes['Job']:.0f}B/个 ({1 - sizes['Job'] / sizes['dict']:.0%} 更少)")
+    return results
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="链接过滤流程的性能基准(合成列表页)")
+    parser.add_argument("--links", type=int, nargs="+", default=[10000, 100000], help="链接总数(可多个)")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES), help="测量的阶段")
+    parser.add_argument("--keywords", nargs="+", default=DEFAULT_KEYWORDS, help="匹配关键字")
+    parser.add_argument("--exclude", nargs="+", default=DEFAULT_EXCLUDE, help="排除关键字")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数(取最快一次)")
+    parser.add_argument("--page-size", type=int, default=100, help="每页链接数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--no-alloc", action="store_true", help="不统计内存分配(更快)")
+    args = parser.parse_args()
+
+    run(args.links, args.stages, args.keywords, args.exclude, args.repeat, args.page_size, args.seed,
+        allocations=not args.no_alloc)
+
+
+if __name__ == "__main__":
+    main()
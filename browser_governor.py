@@ -0,0 +1,150 @@
+"""
+浏览器内存管理 - 长时间抓取时定期更换Chrome
+
+Chrome在一个会话中打开的页面越多,占用内存越大。本模块:
+- 统计浏览器进程树(chromedriver及其所有Chrome子进程)的内存占用(需要psutil,没有时只按页数)
+- 抓取页数或内存超过上限时通知抓取器更换浏览器
+- 接近上限时提前在后台启动新浏览器并打开目标网站,更换时几乎没有等待
+"""
+
+import contextvars
+import threading
+from urllib.parse import urlsplit
+
+
+def browser_rss(driver):
+    """
+    浏览器进程树的内存占用(RSS,字节)
+    Returns:
+        int: 内存占用,无法获取(未安装psutil等)时返回None
+    """
+    try:
+        import psutil
+    except ImportError:
+        return None
+
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+    except Exception:
+        return None
+
+
+class BrowserGovernor:
+    """按页数和内存占用决定何时更换浏览器"""
+
+    def __init__(self, max_pages=100, max_rss_mb=1536, check_every=5, warm_ahead=0.8):
+        """
+        Args:
+            max_pages: 一个浏览器最多抓取的页数,None表示不限制
+            max_rss_mb: 浏览器进程树的内存上限(MB),None表示不限制
+            check_every: 每抓取多少页检查一次内存
+            warm_ahead: 达到上限的该比例时开始在后台启动新浏览器
+        """
+        self.max_pages = max_pages
+        self.max_rss = max_rss_mb * 1024 * 1024 if max_rss_mb else None
+        self.check_every = check_every
+        self.warm_ahead = warm_ahead
+        self.pages = 0
+        self.last_rss = None
+        self._warm_thread = None
+        self._warm_driver = None
+        self._warm_error = None
+        self._lock = threading.Lock()
+
+    def page_done(self, scraper, next_url=None):
+        """
+        每抓取完一页调用
+        Args:
+            scraper: JobScraper
+            next_url: 下一页URL(用于预先打开目标网站)
+        Returns:
+            str: 需要更换浏览器的原因,不需要时返回None
+        """
+        self.pages += 1
+
+        if self.max_rss and self.pages % self.check_every == 0:
+            self.last_rss = browser_rss(scraper.driver)
+
+        if self._near_limit():
+            self._start_warm(scraper, next_url)
+
+        if self.max_pages and self.pages >= self.max_pages:
+            return f"已抓取 {self.pages} 页"
+        if self.max_rss and self.last_rss and self.last_rss >= self.max_rss:
+            return f"浏览器内存 {self.last_rss / 1024 / 1024:.0f}MB"
+        return None
+
+    def _near_limit(self):
+        """是否接近上限(该提前准备新浏览器了)"""
+        if self.max_pages and self.pages >= self.max_pages * self.warm_ahead:
+            return True
+        return bool(self.max_rss and self.last_rss and self.last_rss >= self.max_rss * self.warm_ahead)
+
+    def _start_warm(self, scraper, next_url):
+        """在后台启动新浏览器并打开目标网站首页(DNS、连接、缓存都预热好)"""
+        with self._lock:
+            if self._warm_thread or self._warm_driver:
+                return
+            self._warm_error = None
+            # 沿用当前上下文(输出进入发起搜索的日志)
+            self._warm_thread = threading.Thread(
+                target=contextvars.copy_context().run, args=(self._run_warm, scraper, next_url),
+                name="browser-warm", daemon=True
+            )
+            self._warm_thread.start()
+
+    def _run_warm(self, scraper, next_url):
+        driver = None
+        try:
+            driver = scraper._create_driver(scraper.headless)
+            if next_url:
+                parts = urlsplit(next_url)
+                driver.get(f"{parts.scheme}://{parts.netloc}/")
+        except Exception as e:
+            self._warm_error = e
+            if driver:
+                scraper._quit_driver(driver)
+                driver = None
+
+        with self._lock:
+            self._warm_driver = driver
+
+    def take_driver(self):
+        """
+        取出后台准备好的浏览器(仍在启动时等待完成),并重新开始计数
+        Returns:
+            WebDriver或None(预热失败或没有预热)
+        """
+        thread = self._warm_thread
+        if thread:
+            thread.join()
+
+        with self._lock:
+            driver = self._warm_driver
+            self._warm_driver = None
+            self._warm_thread = None
+
+        if self._warm_error:
+            print(f"后台启动新浏览器失败,将直接启动: {self._warm_error}")
+        self.pages = 0
+        self.last_rss = None
+        return driver
+
+    def close(self, scraper=None):
+        """关闭尚未使用的预热浏览器(传入scraper时由它关闭,同时释放配置目录)"""
+        driver = self.take_driver()
+        if driver:
+            if scraper is not None:
+                scraper._quit_driver(driver)
+                return
+            try:
+                driver.quit()
+            except Exception:
+                pass
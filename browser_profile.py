@@ -0,0 +1,186 @@
+"""
+持久化浏览器配置目录 - 跨运行保留Cookie和磁盘缓存
+
+默认每次启动Chrome都使用临时配置目录,网站的JS/CSS等静态资源每次重新下载,Cookie也从零开始。
+本模块为每个网站提供固定的 user-data-dir:
+- 第二次及以后的运行首屏加载明显更快,Cookie保留也减少了验证页
+- 同一配置目录同时只能被一个Chrome使用: 用文件锁保证,多个进程/浏览器同时运行时自动使用同一网站的下一个槽位
+- 总大小超过上限时先清理最久未用配置的缓存目录(保留Cookie),仍超出再删除整个配置
+"""
+
+import os
+import re
+import shutil
+import threading
+
+
+DEFAULT_PROFILE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'profiles')
+
+# 可以安全删除的缓存目录(相对配置目录)
+CACHE_DIRS = [
+    os.path.join('Default', 'Cache'),
+    os.path.join('Default', 'Code Cache'),
+    os.path.join('Default', 'GPUCache'),
+    os.path.join('Default', 'Service Worker', 'CacheStorage'),
+    'GrShaderCache',
+    'ShaderCache',
+]
+
+
+def _try_lock(handle):
+    """非阻塞地锁定文件,已被锁定时返回False"""
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(handle):
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    except OSError:
+        pass
+
+
+def _dir_size(path):
+    """目录总大小(字节)"""
+    total = 0
+    for dir_path, _, file_names in os.walk(path):
+        for name in file_names:
+            try:
+                total += os.path.getsize(os.path.join(dir_path, name))
+            except OSError:
+                continue
+    return total
+
+
+class ProfileManager:
+    """按网站分配持久化的Chrome配置目录"""
+
+    def __init__(self, root=DEFAULT_PROFILE_ROOT, max_bytes=1024 * 1024 * 1024,
+                 disk_cache_bytes=256 * 1024 * 1024, max_slots=16):
+        """
+        Args:
+            root: 配置目录的根目录
+            max_bytes: 所有配置目录合计的大小上限
+            disk_cache_bytes: 每个配置的Chrome磁盘缓存上限
+            max_slots: 同一网站最多同时使用的配置数
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.disk_cache_bytes = disk_cache_bytes
+        self.max_slots = max_slots
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._cleaned = False
+        os.makedirs(root, exist_ok=True)
+
+    def acquire(self, site):
+        """
+        取得一个未被使用的配置目录(加锁,用完调用release)
+        Args:
+            site: 网站(如zhaopin.com)
+        Returns:
+            str: 配置目录路径,所有槽位都被占用时返回None(使用临时配置)
+        """
+        if not self._cleaned:
+            self._cleaned = True
+            try:
+                self.cleanup()
+            except Exception as e:
+                print(f"清理浏览器配置目录失败: {e}")
+
+        name = re.sub(r'[^\w.-]+', '_', site or 'default')
+        for slot in range(self.max_slots):
+            slot_name = name if slot == 0 else f"{name}-{slot}"
+            path = os.path.join(self.root, slot_name)
+            handle = open(path + '.lock', 'a+')
+            if not _try_lock(handle):
+                handle.close()
+                continue
+            os.makedirs(path, exist_ok=True)
+            # 锁文件的修改时间记录最近使用时间,清理时按它排序
+            os.utime(path + '.lock')
+            with self._lock:
+                self._locks[path] = handle
+            return path
+
+        print(f"{site} 的浏览器配置槽位都在使用中,本次使用临时配置")
+        return None
+
+    def release(self, path):
+        """释放配置目录"""
+        with self._lock:
+            handle = self._locks.pop(path, None)
+        if handle:
+            _unlock(handle)
+            handle.close()
+
+    def chrome_arguments(self, path):
+        """使用该配置目录的Chrome启动参数"""
+        return [f'--user-data-dir={path}', f'--disk-cache-size={self.disk_cache_bytes}']
+
+    def cleanup(self):
+        """
+        总大小超过上限时清理: 先删最久未用配置的缓存目录,仍超出再删除整个配置(正在使用的跳过)
+        Returns:
+            int: 释放的字节数
+        """
+        profiles = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if os.path.isdir(path):
+                lock_path = path + '.lock'
+                used_at = os.path.getmtime(lock_path) if os.path.exists(lock_path) else 0
+                profiles.append((used_at, path, _dir_size(path)))
+
+        total = sum(size for _, _, size in profiles)
+        if total <= self.max_bytes:
+            return 0
+
+        target = self.max_bytes * 0.9
+        freed = 0
+        profiles.sort()
+        for remove_profile in (False, True):
+            for _, path, _ in profiles:
+                if total - freed <= target:
+                    break
+                freed += self._clean_profile(path, remove_profile)
+
+        print(f"浏览器配置目录超过 {self.max_bytes // 1024 // 1024}MB,已清理 {freed // 1024 // 1024}MB")
+        return freed
+
+    def _clean_profile(self, path, remove_profile):
+        """清理一个未被使用的配置,返回释放的字节数"""
+        with open(path + '.lock', 'a+') as handle:
+            if not _try_lock(handle):
+                return 0
+            try:
+                targets = [path] if remove_profile else [os.path.join(path, d) for d in CACHE_DIRS]
+                freed = 0
+                for target in targets:
+                    if os.path.isdir(target):
+                        size = _dir_size(target)
+                        shutil.rmtree(target, ignore_errors=True)
+                        freed += size - (_dir_size(target) if os.path.exists(target) else 0)
+                return freed
+            finally:
+                _unlock(handle)
+
+    def close(self):
+        """释放本进程持有的所有配置目录"""
+        for path in list(self._locks):
+            self.release(path)
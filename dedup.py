@@ -0,0 +1,294 @@
+"""
+近似重复职位检测 - MinHash + LSH
+
+功能:
+- 标题规范化: 去掉括号内的福利说明、全角转半角、去标点
+- 按标题字符二元组计算MinHash签名,LSH分桶,只比较同桶的候选职位
+- 公司已知且不同的职位不算重复(智联URL中带有公司ID)
+- 重复职位归为同一组(cluster),不删除
+- 索引保存在SQLite中,既可用于单次抓取,也可与历史数据比较,查询开销不随数据量线性增长
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import struct
+import threading
+import unicodedata
+
+from url_tools import company_id, job_id
+
+
+DEFAULT_INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'dedup.db')
+
+# 括号内通常是福利、地点等附加说明,如 "AI自动评估（六险双休）"
+BRACKET_RE = re.compile(r'[\(\[【（〔<《][^\)\]】）〕>》]*[\)\]】）〕>》]')
+# 非文字字符
+PUNCT_RE = re.compile(r'[\W_]+', re.UNICODE)
+
+# 签名长度 = 分段数 × 每段行数
+NUM_BANDS = 16
+ROWS_PER_BAND = 4
+NUM_PERM = NUM_BANDS * ROWS_PER_BAND
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def _permutations(num_perm, seed=1):
+    """固定种子生成MinHash置换参数(a, b),保证不同进程、不同运行的签名一致"""
+    params = []
+    counter = 0
+    while len(params) < num_perm:
+        digest = hashlib.blake2b(f"{seed}:{counter}".encode(), digest_size=16).digest()
+        a, b = struct.unpack('<QQ', digest)
+        counter += 1
+        a %= _MERSENNE_PRIME
+        if a == 0:
+            continue
+        params.append((a, b % _MERSENNE_PRIME))
+    return params
+
+
+_PERMUTATIONS = _permutations(NUM_PERM)
+
+
+def normalize_title(title):
+    """
+    规范化职位标题
+    Args:
+        title: 原始标题(猎聘的标题是多行卡片文本,只取第一行)
+    Returns:
+        str: 规范化后的标题
+    """
+    lines = [line.strip() for line in (title or '').splitlines() if line.strip()]
+    text = unicodedata.normalize('NFKC', lines[0] if lines else '').lower()
+    without_brackets = BRACKET_RE.sub('', text)
+    # 整个标题都在括号里时保留原文
+    if PUNCT_RE.sub('', without_brackets):
+        text = without_brackets
+    return PUNCT_RE.sub('', text)
+
+
+def shingles(text):
+    """字符二元组(中文没有空格分词,二元组比较稳定)"""
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def minhash(items):
+    """
+    计算MinHash签名
+    Returns:
+        tuple: NUM_PERM个整数
+    """
+    hashes = [
+        struct.unpack('<I', hashlib.blake2b(item.encode('utf-8'), digest_size=4).digest())[0]
+        for item in items
+    ]
+    if not hashes:
+        return (_MAX_HASH,) * NUM_PERM
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def similarity(sig1, sig2):
+    """由签名估计Jaccard相似度"""
+    return sum(1 for x, y in zip(sig1, sig2) if x == y) / NUM_PERM
+
+
+def _band_keys(signature):
+    """签名分段后每段的桶键(64位有符号整数,便于SQLite索引)"""
+    keys = []
+    for band in range(NUM_BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(struct.pack(f'<I{ROWS_PER_BAND}I', band, *rows), digest_size=8).digest()
+        keys.append(struct.unpack('<q', digest)[0])
+    return keys
+
+
+class NearDuplicateIndex:
+    """近似重复职位索引"""
+
+    def __init__(self, path=DEFAULT_INDEX_FILE, threshold=0.6):
+        """
+        Args:
+            path: 索引文件路径,None表示只在内存中(单次抓取)
+            threshold: 估计的Jaccard相似度达到该值视为重复
+        """
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+
+        if path:
+            dir_path = os.path.dirname(path)
+            if dir_path:
+                os.makedirs(dir_path, exist_ok=True)
+        self._conn = sqlite3.connect(path or ':memory:', timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS items ("
+                " id INTEGER PRIMARY KEY,"
+                " job_id TEXT UNIQUE NOT NULL,"
+                " title TEXT NOT NULL,"
+                " norm_title TEXT NOT NULL,"
+                " company TEXT,"
+                " url TEXT NOT NULL,"
+                " cluster INTEGER NOT NULL,"
+                " signature BLOB NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS items_norm ON items (norm_title)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS items_cluster ON items (cluster)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS bands (key INTEGER NOT NULL, item INTEGER NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS bands_key ON bands (key)")
+
+    def add(self, job):
+        """
+        加入一个职位,返回所在的重复组
+        Args:
+            job: {'title': ..., 'url': ..., 'company': 可选}
+        Returns:
+            int: 重复组ID(组内最早加入的职位ID)
+        """
+        with self._lock, self._conn:
+            return self._add(job)
+
+    def add_many(self, jobs):
+        """
+        批量加入职位(一个事务)
+        Returns:
+            list: 每个职位的重复组ID
+        """
+        with self._lock, self._conn:
+            for job in jobs:
+                self._add(job)
+            # 后加入的职位可能把之前的两个组合并,组ID在全部加入后重新读取
+            return [
+                self._conn.execute(
+                    "SELECT cluster FROM items WHERE job_id = ?", (job_id(job.get('url', '')),)
+                ).fetchone()[0]
+                for job in jobs
+            ]
+
+    def _add(self, job):
+        url = job.get('url', '')
+        key = job_id(url)
+
+        # 同一职位再次出现: 沿用原来的分组
+        row = self._conn.execute("SELECT cluster FROM items WHERE job_id = ?", (key,)).fetchone()
+        if row:
+            return row[0]
+
+        title = job.get('title', '')
+        norm = normalize_title(title)
+        company = job.get('company') or company_id(url)
+        signature = minhash(shingles(norm))
+        bands = _band_keys(signature)
+
+        matches = self._find_matches(norm, company, signature, bands)
+
+        cur = self._conn.execute(
+            "INSERT INTO items (job_id, title, norm_title, company, url, cluster, signature)"
+            " VALUES (?, ?, ?, ?, ?, 0, ?)",
+            (key, title, norm, company, url, struct.pack(f'<{NUM_PERM}I', *signature))
+        )
+        item_id = cur.lastrowid
+
+        # 与多个组相似时合并为一组(取最小的组ID)
+        clusters = {cluster for _, cluster in matches}
+        cluster = min(clusters | {item_id})
+        self._conn.execute("UPDATE items SET cluster = ? WHERE id = ?", (cluster, item_id))
+        for other in clusters - {cluster}:
+            self._conn.execute("UPDATE items SET cluster = ? WHERE cluster = ?", (cluster, other))
+
+        self._conn.executemany(
+            "INSERT INTO bands (key, item) VALUES (?, ?)", [(band, item_id) for band in bands]
+        )
+        return cluster
+
+    def _find_matches(self, norm, company, signature, bands):
+        """
+        查找相似的已有职位: 规范化标题相同,或同桶且签名相似度达到阈值
+        Returns:
+            list: [(职位ID, 重复组ID), ...]
+        """
+        placeholders = ','.join('?' * len(bands))
+        ids = {row[0] for row in self._conn.execute(
+            f"SELECT item FROM bands WHERE key IN ({placeholders})", bands
+        )}
+        ids.update(row[0] for row in self._conn.execute(
+            "SELECT id FROM items WHERE norm_title = ?", (norm,)
+        ))
+        if not ids:
+            return []
+
+        # 分批查询,避免超出SQLite的参数个数限制
+        ids = list(ids)
+        rows = []
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows.extend(self._conn.execute(
+                "SELECT id, norm_title, company, cluster, signature FROM items"
+                f" WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk
+            ))
+
+        matches = []
+        for item_id, other_norm, other_company, cluster, blob in rows:
+            # 两边都知道公司且公司不同: 不是同一职位
+            if company and other_company and company != other_company:
+                continue
+            if other_norm != norm:
+                other_signature = struct.unpack(f'<{NUM_PERM}I', blob)
+                if similarity(signature, other_signature) < self.threshold:
+                    continue
+            matches.append((item_id, cluster))
+        return matches
+
+    def cluster_size(self, cluster):
+        """重复组中的职位数"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM items WHERE cluster = ?", (cluster,)
+            ).fetchone()[0]
+
+    def close(self):
+        """关闭索引"""
+        with self._lock:
+            self._conn.close()
+
+
+def cluster_jobs(jobs, index=None):
+    """
+    为职位标记重复组: job['cluster'] 为组ID, job['duplicates'] 为组内其他职位数(含历史数据)
+    Args:
+        jobs: 职位列表(原地修改,不删除任何职位)
+        index: NearDuplicateIndex,None表示只在本批职位内检测
+    Returns:
+        int: 有重复的职位数
+    """
+    own_index = index is None
+    if own_index:
+        index = NearDuplicateIndex(path=None)
+
+    try:
+        clusters = index.add_many(jobs)
+        sizes = {}
+        for cluster in set(clusters):
+            sizes[cluster] = index.cluster_size(cluster)
+
+        duplicated = 0
+        for job, cluster in zip(jobs, clusters):
+            job['cluster'] = cluster
+            job['duplicates'] = sizes[cluster] - 1
+            if job['duplicates']:
+                duplicated += 1
+        return duplicated
+    finally:
+        if own_index:
+            index.close()
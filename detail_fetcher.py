@@ -0,0 +1,376 @@
+"""
+职位详情抓取 - 按职位描述匹配关键字
+
+功能:
+- 通过连接池HTTP客户端并发抓取职位详情页(jobdetail),并发数有上限
+- 按域名限速,遇到拦截页自动降速
+- 可选的代理出口池: 每个工作线程粘性使用一个出口,各出口单独限速,多次被拦截的出口换掉
+- 提取职位描述和任职要求
+- 按规范职位ID缓存,同一职位只抓取一次
+- 缓存过期后带ETag/Last-Modified条件请求,页面未变化(304)时沿用缓存的描述
+"""
+
+import contextvars
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+
+from throttle import ThrottleRegistry, detect_block
+from url_tools import domain_of, job_id
+
+
+DEFAULT_DETAIL_CACHE_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '.cache', 'details.db'
+)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# 各网站职位描述所在元素的class特征
+DESCRIPTION_MARKERS = {
+    'zhaopin.com': ['describtion__detail-content', 'describtion', 'job-detail'],
+    'liepin.com': ['job-intro-container', 'job-intro-content', 'job-description'],
+}
+
+# 描述最大保存长度
+MAX_DESCRIPTION_LENGTH = 5000
+
+
+class _TextExtractor(HTMLParser):
+    """提取页面文本;指定class特征时只提取这些元素内的文本"""
+
+    SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg'}
+    BLOCK_TAGS = {'p', 'div', 'br', 'li', 'dd', 'dt', 'tr', 'h1', 'h2', 'h3', 'h4', 'section'}
+    VOID_TAGS = {'br', 'img', 'input', 'meta', 'link', 'hr', 'area', 'base', 'col', 'source', 'wbr'}
+
+    def __init__(self, markers=None):
+        super().__init__(convert_charrefs=True)
+        self.markers = markers or []
+        self.parts = []
+        self._skip_depth = 0
+        self._capture_depth = 0
+        self._depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.VOID_TAGS:
+            if tag == 'br':
+                self.parts.append('\n')
+            return
+        self._depth += 1
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        if self.markers and not self._capture_depth:
+            attr_text = ' '.join(value or '' for name, value in attrs if name in ('class', 'data-selector'))
+            if any(marker in attr_text for marker in self.markers):
+                self._capture_depth = self._depth
+        if tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in self.VOID_TAGS:
+            return
+        if tag in self.SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        if self._capture_depth and self._depth <= self._capture_depth:
+            self._capture_depth = 0
+        self._depth = max(0, self._depth - 1)
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self.markers and not self._capture_depth:
+            return
+        self.parts.append(data)
+
+    def text(self):
+        text = ''.join(self.parts)
+        lines = [re.sub(r'\s+', ' ', line).strip() for line in text.splitlines()]
+        return '\n'.join(line for line in lines if line)
+
+
+def extract_description(page_html, url):
+    """
+    从详情页HTML中提取职位描述
+    Args:
+        page_html: 详情页HTML
+        url: 详情页URL(用于选择网站对应的提取规则)
+    Returns:
+        str: 职位描述文本
+    """
+    domain = domain_of(url)
+    markers = next((m for site, m in DESCRIPTION_MARKERS.items() if domain.endswith(site)), None)
+
+    text = ''
+    if markers:
+        extractor = _TextExtractor(markers)
+        extractor.feed(page_html)
+        text = extractor.text()
+
+    # 没有识别出描述区域时,退回到整页文本
+    if not text:
+        extractor = _TextExtractor()
+        extractor.feed(page_html)
+        text = extractor.text()
+
+    return text[:MAX_DESCRIPTION_LENGTH]
+
+
+class DetailCache:
+    """职位详情缓存(按规范职位ID)"""
+
+    def __init__(self, path=DEFAULT_DETAIL_CACHE_FILE, ttl=7 * 24 * 3600):
+        """
+        Args:
+            path: 缓存文件路径
+            ttl: 有效期(秒)
+        """
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        dir_path = os.path.dirname(path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS details ("
+                " job_id TEXT PRIMARY KEY,"
+                " url TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL,"
+                " description TEXT NOT NULL,"
+                " etag TEXT,"
+                " last_modified TEXT)"
+            )
+            # 旧版本的缓存文件没有条件请求所需的列
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(details)")}
+            for column in ('etag', 'last_modified'):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE details ADD COLUMN {column} TEXT")
+            # 旧版本中其他网站的职位ID不含查询参数(view.php?id=1和?id=2共用一行),按保存的URL重新计算
+            legacy = self._conn.execute(
+                "SELECT job_id, url FROM details WHERE url LIKE '%?%' AND job_id NOT LIKE '%?%'"
+                " AND job_id NOT LIKE 'zhaopin:%' AND job_id NOT LIKE 'liepin:%'"
+            ).fetchall()
+            for old_id, url in legacy:
+                new_id = job_id(url)
+                if new_id != old_id:
+                    self._conn.execute("UPDATE OR REPLACE details SET job_id = ? WHERE job_id = ?", (new_id, old_id))
+
+    def get(self, url):
+        """读取描述,未缓存或已过期返回None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at, description FROM details WHERE job_id = ?", (job_id(url),)
+            ).fetchone()
+        if row is None or (self.ttl and time.time() - row[0] > self.ttl):
+            return None
+        return row[1]
+
+    def validators(self, url):
+        """
+        已过期缓存的条件请求信息
+        Returns:
+            tuple: (描述, ETag, Last-Modified),没有缓存或服务器未提供验证信息时返回None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT description, etag, last_modified FROM details WHERE job_id = ?", (job_id(url),)
+            ).fetchone()
+        if row is None or not (row[1] or row[2]):
+            return None
+        return row
+
+    def put(self, url, description, etag=None, last_modified=None):
+        """保存描述"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO details (job_id, url, fetched_at, description, etag, last_modified)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id(url), url, time.time(), description, etag, last_modified)
+            )
+
+    def touch(self, url):
+        """页面未变化: 刷新缓存时间"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE details SET fetched_at = ? WHERE job_id = ?", (time.time(), job_id(url)))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class DetailFetcher:
+    """职位详情并发抓取器"""
+
+    def __init__(self, max_workers=4, cache=None, throttles=None, timeout=15, proxies=None):
+        """
+        Args:
+            max_workers: 最大并发请求数
+            cache: DetailCache,默认使用项目目录下的.cache/details.db
+            throttles: 按域名限速的ThrottleRegistry,默认新建(详情页请求比列表页轻,起始速率更高)
+            timeout: 单次请求超时(秒)
+            proxies: ProxyPool,提供时请求通过代理出口发送(每个工作线程一个出口)
+        """
+        self.max_workers = max_workers
+        self.cache = cache if cache is not None else DetailCache()
+        self.throttles = throttles or ThrottleRegistry(concurrency=max_workers, max_concurrency=max_workers,
+                                                       rate=2.0, max_rate=5.0)
+        self.timeout = timeout
+        self.proxies = proxies
+        self.fetched = 0
+        self.cache_hits = 0
+        self.not_modified = 0
+        self.failures = 0
+        self._cookies = {}
+        self._http = None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='detail')
+
+    def use_browser_cookies(self, driver):
+        """沿用浏览器的Cookie(减少被拦截的概率)"""
+        try:
+            for cookie in driver.get_cookies():
+                domain = cookie.get('domain', '').lstrip('.')
+                self._cookies.setdefault(domain, {})[cookie['name']] = cookie['value']
+        except Exception:
+            pass
+
+    def fetch_many(self, urls):
+        """
+        并发抓取多个职位的描述
+        Args:
+            urls: 职位详情页URL列表
+        Returns:
+            dict: {url: 描述},失败的职位不在结果中
+        """
+        urls = list(dict.fromkeys(urls))
+        descriptions = {}
+        pending = []
+
+        for url in urls:
+            description = self.cache.get(url)
+            if description is not None:
+                self.cache_hits += 1
+                descriptions[url] = description
+            else:
+                pending.append(url)
+
+        if pending:
+            print(f"正在抓取 {len(pending)} 个职位详情(缓存命中 {len(urls) - len(pending)} 个)...")
+            # 工作线程沿用调用方的上下文(输出进入发起搜索的日志)
+            context = contextvars.copy_context()
+            fetched = self._executor.map(lambda url: context.copy().run(self._fetch_one, url), pending)
+            for url, description in zip(pending, fetched):
+                if description is not None:
+                    descriptions[url] = description
+
+        return descriptions
+
+    def _fetch_one(self, url):
+        """抓取单个职位详情(在工作线程中执行)"""
+        proxy = self.proxies.assign(f"detail-{id(self)}-{threading.current_thread().name}") if self.proxies else None
+        throttle = self.throttles.get(url, proxy.name if proxy and proxy.url else None)
+        cached = self.cache.validators(url)
+        try:
+            with throttle.slot():
+                page_html, headers = self._get(url, *(cached[1:] if cached else ()), proxy=proxy)
+        except Exception as e:
+            self.failures += 1
+            if proxy:
+                self.proxies.on_failure(proxy)
+            print(f"✗ 职位详情抓取失败: {url[:80]} ({type(e).__name__}: {e})")
+            return None
+
+        if page_html is None:
+            # 304: 页面未变化
+            self._on_success(throttle, proxy)
+            self.not_modified += 1
+            self.cache.touch(url)
+            return cached[0]
+
+        marker = detect_block(page_html[:20000])
+        description = extract_description(page_html, url)
+        if marker and len(description) < 200:
+            throttle.on_block()
+            if proxy:
+                self.proxies.on_block(proxy)
+            self.failures += 1
+            return None
+
+        self._on_success(throttle, proxy)
+        self.fetched += 1
+        self.cache.put(url, description, headers.get('ETag'), headers.get('Last-Modified'))
+        return description
+
+    def _on_success(self, throttle, proxy):
+        throttle.on_success()
+        if proxy:
+            self.proxies.on_success(proxy)
+
+    def _get(self, url, etag=None, last_modified=None, proxy=None):
+        """
+        发送GET请求(有ETag/Last-Modified时为条件请求,提供proxy时通过该出口发送)
+        Returns:
+            tuple: (页面HTML, 响应头),页面未变化(304)时HTML为None
+        """
+        headers = {'User-Agent': USER_AGENT, 'Accept-Language': 'zh-CN,zh;q=0.9'}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        domain = domain_of(url)
+        cookies = {}
+        for cookie_domain, values in self._cookies.items():
+            if domain.endswith(cookie_domain.replace('www.', '', 1)):
+                cookies.update(values)
+        if cookies:
+            headers['Cookie'] = '; '.join(f"{name}={value}" for name, value in cookies.items())
+
+        http = self.proxies.http_manager(proxy) if proxy else self._get_http()
+        if http is not None:
+            response = http.request('GET', url, headers=headers, timeout=self.timeout, retries=2)
+            if response.status == 304:
+                return None, response.headers
+            if response.status >= 400:
+                raise IOError(f"HTTP {response.status}")
+            return self._decode(response.data, response.headers.get('Content-Type', '')), response.headers
+
+        import urllib.error
+        import urllib.request
+        request = urllib.request.Request(url, headers=headers)
+        opener = self.proxies.urllib_opener(proxy) if proxy else urllib.request.build_opener()
+        try:
+            with opener.open(request, timeout=self.timeout) as response:
+                return self._decode(response.read(), response.headers.get('Content-Type', '')), response.headers
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return None, e.headers
+            raise
+
+    def _get_http(self):
+        """连接池(urllib3随Selenium安装;不可用时退回urllib)"""
+        if self._http is None:
+            try:
+                import urllib3
+                self._http = urllib3.PoolManager(maxsize=self.max_workers, block=True)
+            except ImportError:
+                self._http = False
+        return self._http or None
+
+    def _decode(self, data, content_type):
+        """按Content-Type中的编码解码,默认UTF-8"""
+        match = re.search(r'charset=([\w-]+)', content_type or '', re.I)
+        encoding = match.group(1) if match else 'utf-8'
+        try:
+            return data.decode(encoding, errors='replace')
+        except LookupError:
+            return data.decode('utf-8', errors='replace')
+
+    def close(self):
+        """关闭线程池和缓存"""
+        self._executor.shutdown(wait=True)
+        if self._http:
+            self._http.clear()
+        self.cache.close()
@@ -0,0 +1,232 @@
+"""
+假浏览器和合成列表页 - 不启动Chrome即可运行链接过滤流程
+
+功能:
+- FakeWebDriver/FakeWebElement: 实现抓取器用到的WebDriver接口(打开页面、执行提取链接和翻页识别的脚本、查找元素)
+- synthetic_links/synthetic_pages: 生成带真实感中文标题和嘈杂URL的列表页链接
+  (导航/图片/脚本链接、同一职位不同追踪参数、重复标题、公司主页等)
+- 结果只由随机种子决定,便于对比不同版本的性能
+"""
+
+import random
+import re
+
+
+# 标题组成部分
+TITLE_PREFIXES = ['', '', '', '高级', '资深', '初级', '中级', '急招', '【急聘】', '（双休）', '实习']
+TITLE_FIELDS = [
+    'AI', '大模型', '算法', '机器学习', '深度学习', 'NLP', '计算机视觉', '推荐系统', '数据分析', '数据挖掘',
+    'Java', 'Python', 'Go', 'C++', '前端', '后端', '全栈', '测试', '运维', '嵌入式',
+    '产品', '运营', '销售', '客服', '行政', '财务', '人力资源', '市场', '新媒体', '电商',
+]
+TITLE_ROLES = ['工程师', '开发工程师', '研发工程师', '专家', '经理', '专员', '主管', '助理', '架构师', '负责人']
+TITLE_SUFFIXES = [
+    '', '', '', '（六险双休）', '（五险一金）', '-北京', '-上海', '-深圳', '（可远程）', ' 15-25K',
+    '（应届生可投）', '【周末双休】', '（带薪年假）', ' 20-40K·14薪', '（包吃住）',
+]
+
+# 非职位链接(导航、资源、脚本等)
+NOISE_LINKS = [
+    ('https://www.zhaopin.com/', '首页'),
+    ('https://passport.zhaopin.com/login', '登录'),
+    ('https://passport.zhaopin.com/register', '注册'),
+    ('https://www.zhaopin.com/about/', '关于我们'),
+    ('https://www.zhaopin.com/help/faq', '帮助中心'),
+    ('javascript:void(0)', '更多'),
+    ('https://img.zhaopin.cn/logo.png', '智联招聘'),
+    ('https://www.zhaopin.com/sou/jl530/p2', '2'),
+    ('https://www.zhaopin.com/sou/jl530/p3', '3'),
+    ('https://www.zhaopin.com/sitemap', '网站地图'),
+    ('mailto:service@zhaopin.com', '联系客服'),
+    ('https://www.zhaopin.com/download', '下载APP'),
+    ('', ''),
+]
+
+
+def _zhaopin_url(rng, number):
+    """智联职位链接(带追踪参数)"""
+    return (f"https://www.zhaopin.com/jobdetail/CC{rng.randrange(10 ** 9):09d}J{number:011d}.htm"
+            f"?refcode=4019&srccode=401903&preactionid={rng.getrandbits(128):032x}")
+
+
+def _liepin_url(rng, number):
+    """猎聘职位链接(带追踪参数)"""
+    return (f"https://www.liepin.com/job/{19 * 10 ** 8 + number}.shtml"
+            f"?d_sfrom=search_prime&d_ckId={rng.getrandbits(128):032x}&d_curPage=0&d_pageSize=40"
+            f"&d_headId={rng.getrandbits(128):032x}")
+
+
+def synthetic_title(rng):
+    """随机职位标题"""
+    return (rng.choice(TITLE_PREFIXES) + rng.choice(TITLE_FIELDS) + rng.choice(TITLE_ROLES)
+            + rng.choice(TITLE_SUFFIXES))
+
+
+def synthetic_links(count, seed=0, site='zhaopin', noise=0.3, duplicates=0.05):
+    """
+    生成列表页链接
+    Args:
+        count: 链接总数
+        seed: 随机种子
+        site: 'zhaopin' 或 'liepin'(职位链接的URL格式)
+        noise: 非职位链接(导航、资源等)的比例
+        duplicates: 重复职位链接(同一职位不同追踪参数/相同标题)的比例
+    Returns:
+        list: [(href, text), ...]
+    """
+    rng = random.Random(seed)
+    make_url = _liepin_url if site == 'liepin' else _zhaopin_url
+    links = []
+    recent = []
+    number = 0
+
+    for _ in range(count):
+        roll = rng.random()
+        if roll < noise:
+            links.append(rng.choice(NOISE_LINKS))
+        elif roll < noise + duplicates and recent:
+            # 同一职位再次出现: 追踪参数不同,或标题相同
+            job_number, title = rng.choice(recent)
+            links.append((make_url(rng, job_number), title))
+        elif roll < noise + duplicates * 2:
+            # 公司主页/职位数字等短链接文本
+            links.append((f"https://company.zhaopin.com/CZ{rng.randrange(10 ** 8)}.htm", str(rng.randrange(1000))))
+        else:
+            number += 1
+            title = synthetic_title(rng)
+            links.append((make_url(rng, number), title))
+            recent.append((number, title))
+            if len(recent) > 50:
+                recent.pop(0)
+    return links
+
+
+def synthetic_pages(total_links, page_size=100, seed=0, site='zhaopin', **options):
+    """
+    把合成链接按页切分
+    Returns:
+        list: [[(href, text), ...], ...]
+    """
+    links = synthetic_links(total_links, seed, site, **options)
+    return [links[i:i + page_size] for i in range(0, len(links), page_size)]
+
+
+class FakeWebElement:
+    """假的链接元素"""
+
+    def __init__(self, href, text):
+        self.href = href
+        self.text = text
+        self.tag_name = 'a'
+
+    def get_attribute(self, name):
+        return self.href if name == 'href' else None
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        pass
+
+
+class FakeWebDriver:
+    """
+    假的WebDriver: 页面URL中的页码(/p2、curPage=1等)决定返回哪一页的链接
+
+    JobScraper(driver=FakeWebDriver(pages))即可在没有浏览器的环境中运行抓取和过滤流程。
+    scroll=True时模拟无限滚动的网站: 没有翻页按钮,每次滚动到底部多加载一页,之前的职位仍在页面上。
+    """
+
+    def __init__(self, pages, url='https://www.zhaopin.com/sou/jl530/kw010G0I8/p1', scroll=False):
+        """
+        Args:
+            pages: 每页的链接列表 [[(href, text), ...], ...]
+            url: 初始页面URL
+            scroll: 是否为无限滚动
+        """
+        self.pages = pages
+        self.scroll = scroll
+        # 无限滚动时已加载的页数
+        self.loaded = 1
+        self.current_url = url
+        self.window_handles = ['main']
+        self.title = ''
+        self.gets = 0
+        self._cookies = []
+
+    def _page_index(self):
+        match = re.search(r'/p(\d+)(?:[/?#]|$)', self.current_url)
+        if match:
+            return int(match.group(1)) - 1
+        match = re.search(r'curPage=(\d+)', self.current_url)
+        return int(match.group(1)) if match else 0
+
+    @property
+    def links(self):
+        """当前页的链接"""
+        if self.scroll:
+            return [link for page in self.pages[:self.loaded] for link in page]
+        index = self._page_index()
+        return self.pages[index] if 0 <= index < len(self.pages) else []
+
+    def _next_url(self):
+        """下一页链接(页面上的"下一页"按钮),已是最后一页时返回None"""
+        if self.scroll or self._page_index() + 1 >= len(self.pages):
+            return None
+        url = self.current_url
+        match = re.search(r'/p(\d+)(?:[/?#]|$)', url)
+        if match:
+            return url[:match.start(1)] + str(int(match.group(1)) + 1) + url[match.end(1):]
+        match = re.search(r'curPage=(\d+)', url)
+        if match:
+            return url[:match.start(1)] + str(int(match.group(1)) + 1) + url[match.end(1):]
+        return url + ('&' if '?' in url else '?') + 'curPage=1'
+
+    def get(self, url):
+        self.gets += 1
+        self.current_url = url
+        self.loaded = 1
+
+    def execute_script(self, script, *args):
+        if 'scrollHeight' in script:
+            # 滚动到底部: 无限滚动时加载下一页
+            if self.scroll:
+                self.loaded = min(self.loaded + 1, len(self.pages))
+            return None
+        if 'findNext' in script:
+            # 翻页识别: 下一页按钮为 <a rel="next" href=...>
+            next_url = self._next_url()
+            if 'found.push' not in script:
+                return False
+            return {'next': [['rel', next_url]] if next_url else [], 'number': next_url or ''}
+        if "querySelectorAll('a').length" in script:
+            return len(self.links)
+        if 'querySelectorAll' in script:
+            return [[href, text] for href, text in self.links]
+        if 'innerText' in script or 'textContent' in script:
+            return ' '.join(text for _, text in self.links[:20])
+        return None
+
+    def find_elements(self, by=None, value=None):
+        if value in ('a', 'A'):
+            return [FakeWebElement(href, text) for href, text in self.links]
+        return []
+
+    def find_element(self, by=None, value=None):
+        from selenium.common.exceptions import NoSuchElementException
+        raise NoSuchElementException(f"{by}={value}")
+
+    def get_cookies(self):
+        return list(self._cookies)
+
+    def add_cookie(self, cookie):
+        self._cookies.append(dict(cookie))
+
+    def delete_all_cookies(self):
+        self._cookies = []
+
+    def quit(self):
+        pass
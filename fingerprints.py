@@ -0,0 +1,128 @@
+"""
+内容指纹 - 判断列表页和搜索结果自上次以来是否变化
+
+功能:
+- 列表页指纹: 页面中候选职位ID集合的哈希(与顺序、追踪参数无关)
+- 按键(列表页URL、输出文件)保存最近一次的指纹,重复搜索时未变化的页面/结果可以直接复用
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from job_filter import page_candidates
+from url_tools import canonical_url, job_id
+
+
+DEFAULT_FINGERPRINT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'fingerprints.db')
+
+
+def listing_fingerprint(links):
+    """
+    列表页指纹
+    Args:
+        links: [(href, text), ...]
+    Returns:
+        tuple: (指纹, 不同的职位ID数, 候选职位数),没有候选职位时指纹为None
+            职位ID数少于候选职位数时,说明有候选职位无法用职位ID区分,指纹不能完整代表页面内容
+    """
+    candidates = page_candidates(links)
+    ids = sorted({job_id(href) for href, _ in candidates})
+    if not ids:
+        return None, 0, 0
+    return hashlib.sha1('\n'.join(ids).encode('utf-8')).hexdigest(), len(ids), len(candidates)
+
+
+def jobs_fingerprint(jobs, ordered=False):
+    """
+    搜索结果指纹(职位ID和标题)
+    Args:
+        ordered: 顺序是否有意义(按相关度排序的结果,顺序不同时指纹不同)
+    """
+    rows = [f"{job_id(job['url'])}\t{job['title']}" for job in jobs]
+    if not ordered:
+        rows.sort()
+    digest = hashlib.sha1('\n'.join(rows).encode('utf-8')).hexdigest()
+    return 'ranked:' + digest if ordered else digest
+
+
+class FingerprintStore:
+    """指纹存储(SQLite文件)"""
+
+    def __init__(self, path=DEFAULT_FINGERPRINT_FILE):
+        """
+        Args:
+            path: 数据库文件路径
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        """打开数据库(首次使用时创建)"""
+        if self._conn is None:
+            dir_path = os.path.dirname(self.path)
+            if dir_path:
+                os.makedirs(dir_path, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS fingerprints ("
+                " key TEXT PRIMARY KEY,"
+                " fingerprint TEXT NOT NULL,"
+                " count INTEGER NOT NULL,"
+                " checked_at REAL NOT NULL,"
+                " changed_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def page_key(page_url):
+        return canonical_url(page_url)
+
+    @staticmethod
+    def output_key(output_file):
+        return 'output:' + os.path.abspath(output_file)
+
+    def get(self, key):
+        """
+        最近一次的指纹
+        Returns:
+            str: 指纹,没有记录时返回None
+        """
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT fingerprint FROM fingerprints WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def update(self, key, fingerprint, count=0):
+        """
+        记录新的指纹
+        Returns:
+            bool: 与上次相比是否变化(第一次记录视为变化)
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT fingerprint FROM fingerprints WHERE key = ?", (key,)).fetchone()
+            changed = row is None or row[0] != fingerprint
+            if changed:
+                conn.execute(
+                    "INSERT OR REPLACE INTO fingerprints (key, fingerprint, count, checked_at, changed_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, fingerprint, count, now, now)
+                )
+            else:
+                conn.execute("UPDATE fingerprints SET checked_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+        return changed
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,352 @@
+"""
+分片并行抓取 - 城市 × 关键字 搜索网格
+
+智联的列表页URL中, jl530 为城市代码, kw010G0I8 为搜索关键字代码(从网站搜索后的地址栏复制)。
+本模块:
+- 把 城市 × 关键字 展开为多个列表页分片,每个分片由一个工作进程完整翻页
+- 每个工作进程有自己的浏览器;分片先平均分给各进程,空闲的进程从最忙的进程队尾"偷"分片
+- 同一网站的总请求速率按进程数分摊,所有进程加起来不超过设定的速率;
+  使用代理出口时各进程错开使用不同出口,速率上限按出口计算,总吞吐量随出口数增加
+- 结果汇总到协调进程,按规范职位ID去重后写入一个输出文件
+- 各工作进程的监控指标随结果发回,由协调进程统一导出
+"""
+
+import multiprocessing
+import os
+import queue
+import re
+import time
+
+from metrics import default_metrics
+from url_tools import domain_of
+
+
+def grid_url(template_url, city=None, keyword_code=None):
+    """
+    替换列表页URL中的城市和关键字代码,页码重置为第1页
+    Args:
+        template_url: 智联列表页URL,如 https://www.zhaopin.com/sou/jl530/kw010G0I8/p1
+        city: 城市代码(如530,可带jl前缀)
+        keyword_code: 关键字代码(如010G0I8,可带kw前缀)
+    Returns:
+        str: 分片的起始URL
+    """
+    url = template_url
+    if city is not None:
+        city = str(city)
+        city = city if city.startswith('jl') else f"jl{city}"
+        url = re.sub(r'/jl[^/?#]+', f'/{city}', url)
+    if keyword_code is not None:
+        keyword_code = keyword_code if keyword_code.startswith('kw') else f"kw{keyword_code}"
+        url = re.sub(r'/kw[^/?#]+', f'/{keyword_code}', url)
+    return re.sub(r'/p\d+', '/p1', url)
+
+
+def expand_grid(template_url, cities=None, keyword_codes=None):
+    """
+    展开搜索网格
+    Args:
+        template_url: 列表页URL模板
+        cities: 城市代码列表,None表示使用模板中的城市
+        keyword_codes: 关键字代码列表,None表示使用模板中的关键字
+    Returns:
+        list: 去重后的分片URL列表
+    """
+    urls = []
+    for city in cities or [None]:
+        for keyword_code in keyword_codes or [None]:
+            url = grid_url(template_url, city, keyword_code)
+            if url not in urls:
+                urls.append(url)
+    return urls
+
+
+def _take_shard(worker_id, deques, lock):
+    """
+    取一个分片: 先从自己的队列头部取,空了再从剩余最多的队列尾部偷
+    Returns:
+        str: 分片URL,全部完成时返回None
+    """
+    with lock:
+        own = deques[worker_id]
+        if len(own):
+            return own.pop(0)
+
+        victim = max(range(len(deques)), key=lambda i: len(deques[i]))
+        if len(deques[victim]):
+            return deques[victim].pop()
+    return None
+
+
+def _worker_main(worker_id, deques, lock, results, settings):
+    """工作进程: 启动自己的浏览器,不断取分片抓取,结果按分片发回协调进程"""
+    from metrics import CrawlMetrics
+    from throttle import ThrottleRegistry
+    from web_scraper import JobScraper
+
+    # 每个进程分到总速率的1/N(使用代理时为同一出口上的进程数),AIMD也只在这个范围内调整
+    share = settings['workers']
+    proxies = None
+    if settings['proxies']:
+        from proxy_pool import ProxyPool
+        # 各进程的代理池独立(健康检查已由协调进程完成),按进程编号错开出口
+        proxies = ProxyPool(settings['proxies'], check_url=settings['proxy_check_url'])
+        share = -(-settings['workers'] // len(proxies))
+    throttles = ThrottleRegistry(
+        concurrency=1, max_concurrency=1,
+        rate=settings['rate'] / share, max_rate=settings['rate'] / share
+    )
+
+    profiles = None
+    if settings['persistent_profile']:
+        from browser_profile import ProfileManager
+        # 各进程的配置目录由文件锁区分,同一网站依次使用不同槽位
+        profiles = ProfileManager()
+
+    try:
+        scraper = JobScraper(headless=settings['headless'], throttles=throttles, profiles=profiles,
+                             profile_site=domain_of(settings['template_url']) if profiles else None,
+                             metrics=CrawlMetrics(throttles=throttles), proxies=proxies, proxy_key=worker_id)
+    except Exception as e:
+        results.put(('error', worker_id, None, f"浏览器启动失败: {e}"))
+        results.put(('done', worker_id, None, None))
+        return
+
+    try:
+        while True:
+            shard = _take_shard(worker_id, deques, lock)
+            if shard is None:
+                break
+            results.put(('start', worker_id, shard, None))
+            failed_pages = []
+            batch = []
+            failed = False
+            try:
+                for job in scraper.iter_jobs(shard, settings['keywords'], settings['max_jobs'],
+                                             exclude_keywords=settings['exclude_keywords'],
+                                             failed_pages=failed_pages):
+                    batch.append(job)
+                    if len(batch) >= 50:
+                        results.put(('jobs', worker_id, shard, batch))
+                        results.put(('metrics', worker_id, shard, scraper.metrics.snapshot()))
+                        batch = []
+            except Exception as e:
+                failed = True
+                results.put(('error', worker_id, shard, str(e)))
+            if batch:
+                results.put(('jobs', worker_id, shard, batch))
+            results.put(('metrics', worker_id, shard, scraper.metrics.snapshot()))
+            # 出错的分片已由error计为失败,不再计为完成
+            if not failed:
+                results.put(('shard_done', worker_id, shard, len(failed_pages)))
+    finally:
+        scraper.close()
+        results.put(('done', worker_id, None, None))
+
+
+class GridCrawl:
+    """城市 × 关键字 网格的多进程抓取"""
+
+    def __init__(self, template_url, keywords, cities=None, keyword_codes=None, exclude_keywords=None,
+                 workers=None, max_jobs_per_shard=None, rate=1.0, headless=True, dedup_index=None,
+                 persistent_profile=False, metrics=None, proxies=None, proxy_check_url=None):
+        """
+        Args:
+            template_url: 列表页URL模板(智联 /sou/jl<城市>/kw<关键字>/p1)
+            keywords: 匹配关键字列表
+            cities: 城市代码列表
+            keyword_codes: 搜索关键字代码列表
+            exclude_keywords: 排除关键字列表
+            workers: 工作进程数(每个一个浏览器),默认为CPU核数(不超过分片数)
+            max_jobs_per_shard: 每个分片最多抓取的职位数,None表示由翻页预算决定
+            rate: 同一网站所有进程合计的请求速率上限(页/秒),使用代理时为每个出口的上限
+            headless: 是否使用无头浏览器
+            dedup_index: NearDuplicateIndex,写入前标记近似重复职位,None表示只按职位ID去重
+            persistent_profile: 浏览器是否使用持久化配置目录(跨运行保留Cookie和缓存)
+            metrics: CrawlMetrics,汇总各工作进程的监控指标,默认使用进程内共享的指标
+            proxies: 代理URL列表('direct'表示本机直连),各进程按编号错开使用不同出口
+            proxy_check_url: 代理健康检查访问的页面,None表示使用proxy_pool.DEFAULT_CHECK_URL
+        """
+        self.template_url = template_url
+        self.shards = expand_grid(template_url, cities, keyword_codes)
+        self.keywords = list(keywords)
+        self.exclude_keywords = list(exclude_keywords or [])
+        self.workers = max(1, min(workers or os.cpu_count() or 1, len(self.shards)))
+        self.max_jobs_per_shard = max_jobs_per_shard
+        self.rate = rate
+        self.headless = headless
+        self.dedup_index = dedup_index
+        self.persistent_profile = persistent_profile
+        self.metrics = metrics or default_metrics
+        self.proxies = list(proxies or [])
+        self.proxy_check_url = proxy_check_url
+
+    def _healthy_proxies(self):
+        """检查代理出口,返回可用的(都不可用时仍使用全部,由各进程在遇到拦截时轮换)"""
+        if not self.proxies:
+            return []
+        from proxy_pool import ProxyPool
+        pool = ProxyPool(self.proxies, check_url=self._proxy_check_url())
+        healthy = pool.check_all()
+        urls = pool.healthy_urls() if healthy else list(self.proxies)
+        pool.close()
+        return urls
+
+    def _proxy_check_url(self):
+        """代理健康检查访问的页面"""
+        from proxy_pool import DEFAULT_CHECK_URL
+        return self.proxy_check_url or DEFAULT_CHECK_URL
+
+    def run(self, sink):
+        """
+        抓取所有分片,去重后写入sink
+        Args:
+            sink: ResultSink(如open_sink('grid.db', append=True))
+        Returns:
+            dict: 统计 {'shards', 'jobs', 'duplicates', 'failed_shards', 'seconds'}
+        """
+        start = time.monotonic()
+        proxies = self._healthy_proxies()
+        manager = multiprocessing.Manager()
+        lock = manager.Lock()
+        # 分片轮流分给各进程,同一城市的分片分散到不同进程
+        deques = [manager.list(self.shards[i::self.workers]) for i in range(self.workers)]
+        results = multiprocessing.Queue()
+        settings = {
+            'workers': self.workers,
+            'rate': self.rate,
+            'headless': self.headless,
+            'keywords': self.keywords,
+            'exclude_keywords': self.exclude_keywords,
+            'max_jobs': self.max_jobs_per_shard,
+            'template_url': self.template_url,
+            'persistent_profile': self.persistent_profile,
+            'proxies': proxies,
+            'proxy_check_url': self._proxy_check_url(),
+        }
+
+        print(f"网格抓取: {len(self.shards)} 个分片, {self.workers} 个进程, 合计速率上限 {self.rate} 页/秒")
+        processes = [
+            multiprocessing.Process(
+                target=_worker_main, args=(i, deques, lock, results, settings),
+                name=f"grid-worker-{i}", daemon=True
+            )
+            for i in range(self.workers)
+        ]
+        for process in processes:
+            process.start()
+
+        seen_ids = set()
+        stats = {'shards': 0, 'jobs': 0, 'duplicates': 0, 'failed_shards': []}
+        running = set(range(self.workers))
+
+        try:
+            while running:
+                try:
+                    kind, worker_id, shard, payload = results.get(timeout=1)
+                except queue.Empty:
+                    # 进程异常退出(没有发送done)时不再等待它
+                    for i in list(running):
+                        if not processes[i].is_alive():
+                            print(f"✗ 进程 {i} 异常退出")
+                            running.discard(i)
+                    continue
+
+                if kind == 'jobs':
+                    self._merge(payload, sink, seen_ids, stats)
+                elif kind == 'metrics':
+                    self.metrics.set_source(worker_id, payload)
+                elif kind == 'start':
+                    print(f"[进程{worker_id}] 开始: {shard}")
+                elif kind == 'shard_done':
+                    stats['shards'] += 1
+                    self.metrics.inc('searchjob_grid_shards_total', status='done')
+                    print(f"[进程{worker_id}] 完成 ({stats['shards']}/{len(self.shards)}): {shard}")
+                elif kind == 'error':
+                    print(f"✗ [进程{worker_id}] {payload}")
+                    if shard:
+                        stats['failed_shards'].append(shard)
+                        self.metrics.inc('searchjob_grid_shards_total', status='failed')
+                elif kind == 'done':
+                    running.discard(worker_id)
+        finally:
+            for process in processes:
+                process.join(timeout=30)
+            manager.shutdown()
+
+        stats['seconds'] = time.monotonic() - start
+        print(f"\n网格抓取完成: {stats['shards']} 个分片, {stats['jobs']} 个职位"
+              f"(另有 {stats['duplicates']} 个重复), 耗时 {stats['seconds']:.0f} 秒")
+        return stats
+
+    def _merge(self, jobs, sink, seen_ids, stats):
+        """按规范职位ID去重后写入sink(不同城市/关键字的分片常有相同职位)"""
+        new_jobs = []
+        for job in jobs:
+            key = job.job_id
+            if key in seen_ids:
+                stats['duplicates'] += 1
+                self.metrics.inc('searchjob_grid_duplicates_total')
+                continue
+            seen_ids.add(key)
+            new_jobs.append(job)
+
+        if not new_jobs:
+            return
+        if self.dedup_index is not None:
+            from dedup import cluster_jobs
+            cluster_jobs(new_jobs, self.dedup_index)
+        sink.write(new_jobs)
+        stats['jobs'] += len(new_jobs)
+        self.metrics.inc('searchjob_jobs_saved_total', len(new_jobs))
+
+
+def main():
+    """命令行入口: python grid_crawl.py --cities 530 538 --kw 010G0I8 --keywords AI -o grid.db"""
+    import argparse
+    from dedup import NearDuplicateIndex
+    from proxy_pool import DEFAULT_CHECK_URL, ProxyPool
+    from sinks import open_sink, output_path
+
+    parser = argparse.ArgumentParser(description="城市 × 关键字 网格的多进程抓取")
+    parser.add_argument("--url", default="https://www.zhaopin.com/sou/jl530/kw010G0I8/p1", help="列表页URL模板")
+    parser.add_argument("--cities", nargs="+", help="城市代码(如 530 538)")
+    parser.add_argument("--kw", nargs="+", dest="keyword_codes", help="搜索关键字代码(列表页URL中kw后面的部分)")
+    parser.add_argument("--keywords", nargs="+", required=True, help="匹配关键字")
+    parser.add_argument("--exclude", nargs="+", default=[], help="排除关键字")
+    parser.add_argument("--workers", type=int, help="工作进程数(默认CPU核数)")
+    parser.add_argument("--rate", type=float, default=1.0, help="同一网站合计请求速率上限(页/秒,使用代理时为每个出口)")
+    parser.add_argument("--max-jobs", type=int, help="每个分片最大职位数")
+    parser.add_argument("-o", "--output", default="grid_jobs.db", help="输出文件(扩展名决定格式)")
+    parser.add_argument("--show-browser", action="store_true", help="显示浏览器窗口")
+    parser.add_argument("--persistent-profile", action="store_true", help="浏览器使用持久化配置目录(跨运行保留Cookie和缓存)")
+    parser.add_argument("--proxies", help="代理列表文件(每行一个 http://、socks5:// 或 direct),各进程错开使用")
+    parser.add_argument("--proxy-check-url", default=DEFAULT_CHECK_URL,
+                        help="代理健康检查访问的页面(默认 %(default)s)")
+    parser.add_argument("--metrics-port", type=int, help="在该端口提供Prometheus格式的监控指标(/metrics)")
+    parser.add_argument("--metrics-file", help="定期写入监控指标的文件(.prom为Prometheus文本格式,.json为JSON)")
+    args = parser.parse_args()
+
+    if args.metrics_port:
+        default_metrics.serve(args.metrics_port)
+    if args.metrics_file:
+        default_metrics.dump_periodically(args.metrics_file)
+
+    crawl = GridCrawl(
+        args.url, args.keywords, cities=args.cities, keyword_codes=args.keyword_codes,
+        exclude_keywords=args.exclude, workers=args.workers, max_jobs_per_shard=args.max_jobs,
+        rate=args.rate, headless=not args.show_browser, dedup_index=NearDuplicateIndex(),
+        persistent_profile=args.persistent_profile,
+        proxies=ProxyPool.from_file(args.proxies).healthy_urls() if args.proxies else None,
+        proxy_check_url=args.proxy_check_url
+    )
+    try:
+        with open_sink(output_path(args.output)) as sink:
+            crawl.run(sink)
+    finally:
+        default_metrics.close()
+    print(f"结果已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
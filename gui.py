@@ -1,13 +1,18 @@
 """
 简洁的图形化用户界面 - 带进度条和错误提示
+
+可以同时运行多个搜索(不同网站、关键字): 每个搜索在搜索队列中占一行,有自己的进度条、日志和结果。
+搜索在工作进程中运行(search_worker.py),每个工作进程一个浏览器,最多max_browsers个,
+超出时排队等待空闲的工作进程;界面进程只负责显示,抓取卡住时界面不受影响。
 """
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-from job_finder import JobFinder
-import threading
+import collections
+import itertools
 import os
-import sys
+
+from url_tools import domain_of
 
 try:
     from ctypes import windll
@@ -36,11 +41,211 @@ THEME = {
 }
 
 
+class ResultsTable:
+    """
+    职位结果表格 - 只渲染可见的几行(虚拟滚动),排序和筛选在内存中进行
+
+    Treeview插入上万行会明显卡顿,这里Treeview只保留一屏的行,滚动时替换内容。
+    """
+
+    COLUMNS = (("index", "#", 40), ("title", "职位标题", 280), ("url", "职位链接", 220))
+
+    def __init__(self, parent, height=8):
+        self.rows = []           # 所有职位(按找到的顺序): (序号, 标题, 链接)
+        self.view = []           # 筛选、排序后的职位
+        self.offset = 0
+        self.height = height
+        self.sort_column = None
+        self.sort_reverse = False
+        self.filter_text = ''
+
+        self.frame = ttk.Frame(parent)
+
+        filter_bar = ttk.Frame(self.frame)
+        filter_bar.pack(fill=tk.X, pady=(0, 4))
+        ttk.Label(filter_bar, text="筛选:").pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add("write", lambda *args: self.set_filter(self.filter_var.get()))
+        ttk.Entry(filter_bar, textvariable=self.filter_var).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.count_label = ttk.Label(filter_bar, text="共 0 个职位", foreground=THEME['text_light'])
+        self.count_label.pack(side=tk.LEFT)
+
+        table = ttk.Frame(self.frame)
+        table.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(table, columns=[c[0] for c in self.COLUMNS], show="headings",
+                                 height=height, selectmode="browse")
+        for name, text, width in self.COLUMNS:
+            self.tree.heading(name, text=text, command=lambda n=name: self.sort_by(n))
+            self.tree.column(name, width=width, stretch=(name != "index"))
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.scrollbar = ttk.Scrollbar(table, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        self.tree.bind("<Double-1>", self._open_selected)
+        self._render()
+
+    def clear(self):
+        """清空结果"""
+        self.rows = []
+        self.view = []
+        self.offset = 0
+        self._render()
+
+    def add_jobs(self, jobs):
+        """追加一批职位"""
+        start = len(self.rows)
+        new_rows = [
+            (start + i + 1, (job.get('title') or '').splitlines()[0] if job.get('title') else '', job.get('url', ''))
+            for i, job in enumerate(jobs)
+        ]
+        self.rows.extend(new_rows)
+
+        matched = [row for row in new_rows if self._matches(row)]
+        if self.sort_column is None:
+            self.view.extend(matched)
+        elif matched:
+            self._rebuild_view()
+        self._render()
+
+    def set_filter(self, text):
+        """按标题或链接筛选(不区分大小写)"""
+        self.filter_text = text.strip().lower()
+        self.offset = 0
+        self._rebuild_view()
+        self._render()
+
+    def sort_by(self, column):
+        """按列排序,再次点击反向"""
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            self.sort_reverse = False
+        self._rebuild_view()
+        self._render()
+
+    def _matches(self, row):
+        if not self.filter_text:
+            return True
+        return self.filter_text in row[1].lower() or self.filter_text in row[2].lower()
+
+    def _rebuild_view(self):
+        view = [row for row in self.rows if self._matches(row)] if self.filter_text else list(self.rows)
+        if self.sort_column is not None:
+            key = [c[0] for c in self.COLUMNS].index(self.sort_column)
+            view.sort(key=lambda row: row[key], reverse=self.sort_reverse)
+        self.view = view
+
+    def scroll(self, lines):
+        """滚动若干行"""
+        self.offset += lines
+        self._render()
+
+    def _on_mousewheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == tk.MOVETO:
+            self.offset = int(float(value) * len(self.view))
+        elif action == tk.SCROLL:
+            step = self.height if unit == tk.PAGES else 1
+            self.offset += int(value) * step
+        self._render()
+
+    def _render(self):
+        """只把可见的行放进Treeview"""
+        total = len(self.view)
+        self.offset = max(0, min(self.offset, total - self.height))
+
+        self.tree.delete(*self.tree.get_children())
+        for row in self.view[self.offset:self.offset + self.height]:
+            self.tree.insert("", tk.END, values=row)
+
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.height) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+        if len(self.view) == len(self.rows):
+            self.count_label.config(text=f"共 {len(self.rows)} 个职位")
+        else:
+            self.count_label.config(text=f"显示 {len(self.view)}/{len(self.rows)} 个职位")
+
+    def _open_selected(self, event=None):
+        """在浏览器中打开选中的职位"""
+        import webbrowser
+
+        selection = self.tree.selection()
+        if selection:
+            webbrowser.open(self.tree.item(selection[0], "values")[2])
+
+
+class SearchTask:
+    """
+    搜索队列中的一个搜索(界面进程中的状态)
+
+    搜索本身在工作进程中运行,日志、进度和职位由界面线程从工作进程的管道中取出后记录在这里。
+    """
+
+    MAX_LOG_LINES = 5000
+    _ids = itertools.count(1)
+
+    def __init__(self, url, keywords, output_file, max_jobs, exclude_keywords, offline, fetch_details):
+        self.id = next(self._ids)
+        self.url = url
+        self.keywords = keywords
+        self.output_file = output_file
+        self.max_jobs = max_jobs
+        self.exclude_keywords = exclude_keywords
+        self.offline = offline
+        self.fetch_details = fetch_details
+
+        # 状态: queued(等待空闲的工作进程)、running、done、cancelled、failed
+        self.status = 'queued'
+        self.progress = 0
+        self.progress_text = "排队中..."
+        self.log_lines = collections.deque(maxlen=self.MAX_LOG_LINES)  # (内容, 级别)
+        self.jobs = []
+        self.worker = None
+        self.widgets = {}
+
+    @property
+    def label(self):
+        """队列中显示的名称"""
+        return f"#{self.id} {' '.join(self.keywords)} @ {domain_of(self.url) or self.url}"
+
+    @property
+    def active(self):
+        return self.status in ('queued', 'running')
+
+    def params(self):
+        """发给工作进程的find_jobs参数"""
+        return {
+            'url': self.url,
+            'keywords': self.keywords,
+            'output_file': self.output_file,
+            'max_jobs': self.max_jobs,
+            'exclude_keywords': self.exclude_keywords,
+            'offline': self.offline,
+            'fetch_details': self.fetch_details,
+        }
+
+
 class JobFinderGUI:
-    def __init__(self, root):
+    # 同时运行的搜索数上限(每个搜索工作进程一个浏览器)
+    max_browsers = 2
+    # 停止搜索后多少秒仍未结束时强制结束工作进程
+    stop_grace = 5
+
+    def __init__(self, root, prewarm=True):
         self.root = root
         self.root.title("职位搜索 v1.0")
-        self.root.geometry("600x620")
+        self.root.geometry("600x720")
         self.root.resizable(False, False)
 
         # 设置窗口背景色
@@ -49,14 +254,52 @@ class JobFinderGUI:
         # 设置窗口标题栏为蓝色 (Windows)
         self.set_titlebar_color()
 
-        self.finder = JobFinder()
-        self.is_running = False
+        # 搜索工作进程(需要时启动),Selenium只在工作进程中导入,窗口可以立即显示
+        self.workers = []
+        # 搜索队列(按加入顺序),当前在日志和结果中显示的搜索
+        self.tasks = []
+        self.selected_task = None
+        self.search_index = None
+        self.search_window = None
 
         # 配置样式
         self.setup_styles()
 
         self.create_widgets()
 
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # 定期取出各工作进程的消息(日志、进度、职位)显示
+        self.root.after(100, self._poll_tasks)
+
+        # 窗口显示后,在后台预热浏览器,用户填写表单期间完成启动
+        if prewarm:
+            self.root.after(200, self._start_prewarm)
+
+    def _start_worker(self):
+        """启动一个搜索工作进程"""
+        from search_worker import SearchWorker
+        worker = SearchWorker(name=f"search-worker-{len(self.workers) + 1}")
+        self.workers.append(worker)
+        return worker
+
+    def _start_prewarm(self):
+        """启动第一个工作进程并预热浏览器(Selenium的导入和Chrome启动都在工作进程中进行)"""
+        if not self.workers:
+            self._start_worker().prewarm()
+
+    def on_close(self):
+        """关闭窗口,停止所有搜索,关闭工作进程和浏览器"""
+        self.root.withdraw()
+        for worker in self.workers:
+            if worker.busy:
+                worker.kill()
+            else:
+                worker.close()
+        if self.search_index is not None:
+            self.search_index.close()
+        self.root.destroy()
+
     def set_titlebar_color(self):
         """设置Windows窗口标题栏颜色为蓝色"""
         try:
@@ -133,6 +376,12 @@ class JobFinderGUI:
                  foreground=[('active', 'black'),
                            ('pressed', 'black')])
 
+        # 设置Checkbutton样式
+        style.configure('TCheckbutton',
+                       background=THEME['bg'],
+                       foreground=THEME['text'],
+                       font=('Microsoft YaHei', 9))
+
         # 设置LabelFrame样式
         style.configure('TLabelframe',
                        background=THEME['bg'],
@@ -201,6 +450,24 @@ class JobFinderGUI:
         self.max_jobs_entry.grid(row=5, column=1, sticky=tk.W, pady=6)
         self.max_jobs_entry.insert(0, "30")  # 默认30个
 
+        # 离线模式: 修改关键字后直接过滤缓存的列表页,不启动浏览器
+        self.offline_var = tk.BooleanVar(value=False)
+        offline_check = ttk.Checkbutton(
+            main_frame,
+            text="仅用缓存重新过滤",
+            variable=self.offline_var
+        )
+        offline_check.grid(row=5, column=2, sticky=tk.W, pady=6)
+
+        # 按职位描述匹配: 逐个抓取职位详情页,较慢
+        self.details_var = tk.BooleanVar(value=False)
+        details_check = ttk.Checkbutton(
+            main_frame,
+            text="匹配职位描述(较慢)",
+            variable=self.details_var
+        )
+        details_check.grid(row=6, column=2, sticky=tk.W, pady=(0, 6))
+
         # 最大职位数提示
         max_hint_label = ttk.Label(
             main_frame,
@@ -211,7 +478,7 @@ class JobFinderGUI:
         max_hint_label.grid(row=6, column=1, sticky=tk.W, pady=(0, 6))
 
         # 5. 输出文件名(CSV)
-        ttk.Label(main_frame, text="输出文件(CSV):").grid(row=7, column=0, sticky=tk.W, pady=6)
+        ttk.Label(main_frame, text="输出文件:").grid(row=7, column=0, sticky=tk.W, pady=6)
         self.output_entry = ttk.Entry(main_frame, width=40)
         self.output_entry.grid(row=7, column=1, pady=6, sticky=tk.EW)
 
@@ -228,26 +495,41 @@ class JobFinderGUI:
         )
         browse_button.grid(row=7, column=2, padx=(5, 0), pady=6)
 
-        # 进度条
-        progress_frame = ttk.LabelFrame(main_frame, text="搜索进度", padding="8")
-        progress_frame.grid(row=8, column=0, columnspan=3, sticky=tk.EW, pady=(8, 8))
-
-        self.progress_var = tk.DoubleVar(value=0)
-        self.progress_bar = ttk.Progressbar(
-            progress_frame,
-            variable=self.progress_var,
-            maximum=100,
-            length=500,
-            mode='determinate'
+        # 搜索队列: 每个搜索一行(进度条、状态、停止按钮),点击一行查看它的日志和结果
+        queue_frame = ttk.LabelFrame(main_frame, text="搜索队列", padding="8")
+        queue_frame.grid(row=8, column=0, columnspan=3, sticky=tk.EW, pady=(8, 8))
+
+        self.queue_canvas = tk.Canvas(queue_frame, height=96, bg=THEME['bg'], highlightthickness=0)
+        queue_scrollbar = ttk.Scrollbar(queue_frame, orient=tk.VERTICAL, command=self.queue_canvas.yview)
+        self.queue_canvas.configure(yscrollcommand=queue_scrollbar.set)
+        queue_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.queue_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.queue_rows = ttk.Frame(self.queue_canvas)
+        self.queue_canvas.create_window((0, 0), window=self.queue_rows, anchor=tk.NW, tags="rows")
+        self.queue_rows.bind(
+            "<Configure>",
+            lambda e: self.queue_canvas.configure(scrollregion=self.queue_canvas.bbox("all"))
         )
-        self.progress_bar.pack(fill=tk.X, pady=5)
+        self.queue_canvas.bind("<Configure>", lambda e: self.queue_canvas.itemconfigure("rows", width=e.width))
 
-        self.progress_label = ttk.Label(progress_frame, text="就绪", foreground=THEME['text_light'])
-        self.progress_label.pack()
+        self.queue_hint = ttk.Label(
+            self.queue_rows,
+            text="点击\"开始查找\"加入搜索,可以同时运行多个搜索",
+            foreground=THEME['text_light']
+        )
+        self.queue_hint.pack(anchor=tk.W)
+
+        # 日志和结果(两个标签页)
+        self.notebook = ttk.Notebook(main_frame)
+        self.notebook.grid(row=9, column=0, columnspan=3, sticky=tk.EW, pady=(0, 8))
+
+        log_frame = ttk.Frame(self.notebook, padding="8")
+        self.notebook.add(log_frame, text="运行日志")
 
-        # 日志输出区域
-        log_frame = ttk.LabelFrame(main_frame, text="运行日志", padding="8")
-        log_frame.grid(row=9, column=0, columnspan=3, sticky=tk.EW, pady=(0, 8))
+        self.results_table = ResultsTable(self.notebook, height=7)
+        self.results_table.frame.configure(padding="8")
+        self.notebook.add(self.results_table.frame, text="搜索结果")
 
         self.log_text = scrolledtext.ScrolledText(
             log_frame,
@@ -276,17 +558,17 @@ class JobFinderGUI:
             button_frame,
             text="开始查找",
             command=self.start_search,
-            width=20
+            width=14
         )
         self.start_button.pack(side=tk.LEFT, padx=5)
 
-        # 停止按钮
+        # 停止按钮(停止当前显示的搜索)
         self.stop_button = ttk.Button(
             button_frame,
             text="停止",
             command=self.stop_search,
             state=tk.DISABLED,
-            width=20
+            width=14
         )
         self.stop_button.pack(side=tk.LEFT, padx=5)
 
@@ -295,10 +577,19 @@ class JobFinderGUI:
             button_frame,
             text="清空日志",
             command=self.clear_log,
-            width=20
+            width=14
         )
         clear_button.pack(side=tk.LEFT, padx=5)
 
+        # 搜索已抓取职位按钮
+        history_button = ttk.Button(
+            button_frame,
+            text="搜索已有职位",
+            command=self.open_search_window,
+            width=14
+        )
+        history_button.pack(side=tk.LEFT, padx=5)
+
         # 状态栏
         self.status_var = tk.StringVar(value="就绪")
         status_bar = ttk.Label(
@@ -316,36 +607,39 @@ class JobFinderGUI:
         file_path = filedialog.asksaveasfilename(
             title="选择输出文件",
             defaultextension=".csv",
-            filetypes=[("CSV文件", "*.csv"), ("所有文件", "*.*")]
+            filetypes=[
+                ("CSV文件", "*.csv"),
+                ("JSON Lines", "*.jsonl"),
+                ("SQLite数据库", "*.db"),
+                ("Parquet数据集", "*.parquet"),
+                ("所有文件", "*.*")
+            ]
         )
         if file_path:
             self.output_entry.delete(0, tk.END)
             self.output_entry.insert(0, file_path)
 
     def log(self, message, level="INFO"):
-        """添加日志信息"""
+        """在日志框中添加一行(界面线程中调用)"""
         self.log_text.insert(tk.END, message + "\n", level)
         self.log_text.see(tk.END)
-        self.root.update_idletasks()
 
     def clear_log(self):
-        """清空日志"""
+        """清空日志(当前显示的搜索)"""
         self.log_text.delete(1.0, tk.END)
-
-    def update_progress(self, value, text):
-        """更新进度条"""
-        self.progress_var.set(value)
-        self.progress_label.config(text=text)
-        self.root.update_idletasks()
+        if self.selected_task is not None:
+            self.selected_task.log_lines.clear()
 
     def start_search(self):
-        """开始搜索"""
+        """把搜索加入队列并立即开始(与其他搜索同时运行)"""
         # 获取参数
         url = self.url_entry.get().strip()
         keywords_str = self.keywords_entry.get().strip()
         exclude_str = self.exclude_entry.get().strip()
         max_jobs_str = self.max_jobs_entry.get().strip()
         output_file = self.output_entry.get().strip()
+        offline = self.offline_var.get()
+        fetch_details = self.details_var.get()
 
         # 验证输入
         if not url:
@@ -360,6 +654,13 @@ class JobFinderGUI:
             messagebox.showerror("错误", "请指定输出文件")
             return
 
+        from sinks import output_path
+        output_file = output_path(output_file)
+        if any(task.active and os.path.abspath(task.output_file) == os.path.abspath(output_file)
+               for task in self.tasks):
+            messagebox.showerror("错误", "该输出文件正被另一个搜索使用,请换一个输出文件")
+            return
+
         # 解析关键字
         keywords = [k.strip() for k in keywords_str.split() if k.strip()]
 
@@ -377,143 +678,268 @@ class JobFinderGUI:
                 messagebox.showerror("错误", "最大职位数必须是正整数")
                 return
 
-        # 清空并准备日志
-        self.clear_log()
-        self.update_progress(0, "准备中...")
-
-        # 禁用开始按钮
-        self.start_button.config(state=tk.DISABLED)
-        self.stop_button.config(state=tk.NORMAL)
-        self.is_running = True
-
-        # 重定向print输出到日志框
-        self._redirect_print()
+        task = SearchTask(url, keywords, output_file, max_jobs, exclude_keywords, offline, fetch_details)
+        self.tasks.append(task)
+        self._add_task_row(task)
+        self.select_task(task)
+        self._dispatch()
+        self._update_status()
+
+    def _add_task_row(self, task):
+        """在搜索队列中添加一行"""
+        self.queue_hint.pack_forget()
+        row = ttk.Frame(self.queue_rows)
+        row.pack(fill=tk.X, pady=1)
+
+        label = ttk.Label(row, text=task.label, width=24, cursor="hand2")
+        label.pack(side=tk.LEFT)
+        bar = ttk.Progressbar(row, maximum=100, length=140, mode='determinate')
+        bar.pack(side=tk.LEFT, padx=5)
+        status = ttk.Label(row, text=task.progress_text, foreground=THEME['text_light'], cursor="hand2")
+        status.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        button = ttk.Button(row, text="停止", width=6, command=lambda: self._on_task_button(task))
+        button.pack(side=tk.RIGHT)
+
+        for widget in (row, label, status):
+            widget.bind("<Button-1>", lambda e: self.select_task(task))
+        task.widgets = {'row': row, 'label': label, 'bar': bar, 'status': status, 'button': button}
+        self.queue_canvas.update_idletasks()
+        self.queue_canvas.yview_moveto(1.0)
+
+    def _on_task_button(self, task):
+        """运行中的搜索: 停止;已结束的搜索: 从队列中移除"""
+        if task.active:
+            self.stop_task(task)
+            return
+        task.widgets['row'].destroy()
+        self.tasks.remove(task)
+        if self.selected_task is task:
+            self.selected_task = None
+            self.log_text.delete(1.0, tk.END)
+            self.results_table.clear()
+            if self.tasks:
+                self.select_task(self.tasks[-1])
+        if not self.tasks:
+            self.queue_hint.pack(anchor=tk.W)
+        self._update_status()
+
+    def select_task(self, task):
+        """在日志和结果中显示该搜索"""
+        if self.selected_task is not None and self.selected_task.widgets:
+            self.selected_task.widgets['label'].configure(font=('Microsoft YaHei', 9))
+        self.selected_task = task
+        task.widgets['label'].configure(font=('Microsoft YaHei', 9, 'bold'))
 
-        # 在新线程中执行搜索 - 始终使用无头模式
-        thread = threading.Thread(
-            target=self._run_search,
-            args=(url, keywords, output_file, max_jobs, exclude_keywords),
-            daemon=True
-        )
-        thread.start()
-
-    def _redirect_print(self):
-        """重定向print输出到日志框"""
-        class TextRedirector:
-            def __init__(self, widget, tag="INFO"):
-                self.widget = widget
-                self.tag = tag
-
-            def write(self, text):
-                if text.strip():
-                    self.widget.insert(tk.END, text.strip(), self.tag)
-                    self.widget.see(tk.END)
-                    self.widget.update_idletasks()
-
-            def flush(self):
-                pass
-
-        # 重定向stdout
-        sys.stdout = TextRedirector(self.log_text, "INFO")
-        sys.stderr = TextRedirector(self.log_text, "ERROR")
-
-    def _restore_print(self):
-        """恢复print输出"""
-        sys.stdout = sys.__stdout__
-        sys.stderr = sys.__stderr__
-
-    def _run_search(self, url, keywords, output_file, max_jobs, exclude_keywords):
-        """在后台线程中运行搜索"""
-        try:
-            self.status_var.set("正在搜索...")
-            self.log("===== 开始搜索 =====", "INFO")
-            self.log(f"目标网站: {url}", "INFO")
-            self.log(f"关键字: {', '.join(keywords)}", "INFO")
-            if exclude_keywords:
-                self.log(f"排除关键字: {', '.join(exclude_keywords)}", "WARNING")
-            self.log(f"输出文件: {output_file}", "INFO")
-
-            # 更新进度: 10%
-            self.update_progress(10, "正在初始化浏览器...")
-
-            # 定义进度回调函数
-            def progress_callback(current, total, percent):
-                """进度回调"""
-                if max_jobs:
+        self.log_text.delete(1.0, tk.END)
+        for message, level in task.log_lines:
+            self.log_text.insert(tk.END, message + "\n", level)
+        self.log_text.see(tk.END)
+        self.results_table.clear()
+        self.results_table.add_jobs(task.jobs)
+        self.stop_button.config(state=tk.NORMAL if task.active else tk.DISABLED)
+
+    def _dispatch(self):
+        """把排队的搜索交给空闲的工作进程(不足max_browsers个时启动新的)"""
+        for task in self.tasks:
+            if task.status != 'queued':
+                continue
+            worker = next((w for w in self.workers if w.alive and not w.busy), None)
+            if worker is None:
+                if len(self.workers) >= self.max_browsers:
+                    return
+                worker = self._start_worker()
+            task.status = 'running'
+            task.worker = worker
+            worker.start_search(task, task.id, task.params())
+            self._set_progress(task, 5, "等待浏览器..." if not task.offline else "正在读取缓存...")
+
+    def _poll_tasks(self):
+        """取出各工作进程的消息并更新界面(在界面线程中执行)"""
+        for worker in list(self.workers):
+            self._drain_worker(worker)
+        self._dispatch()
+        self.root.after(100, self._poll_tasks)
+
+    def _drain_worker(self, worker):
+        """处理一个工作进程的消息;停止超时或进程意外退出时结束它"""
+        for message in worker.poll():
+            task = worker.task
+            kind = message[0]
+            if task is None:
+                # 预热等不属于任何搜索的输出
+                if kind == 'L':
+                    print(message[2])
+                continue
+
+            if kind == 'L':
+                self._add_log(task, message[2], message[1])
+            elif kind == 'P':
+                current, total, percent = message[1:]
+                if task.max_jobs:
                     # 有最大数量限制时,显示 找到的数量/目标数量
                     progress_text = f"已找到: {current}/{total} 个职位"
                 else:
                     # 没有最大数量限制时,显示 已找到数量
                     progress_text = f"已找到: {current} 个职位 (搜索中...)"
+                self._set_progress(task, percent, progress_text)
+            elif kind == 'J':
+                jobs = [{'title': title, 'url': url} for title, url in message[1]]
+                task.jobs.extend(jobs)
+                if task is self.selected_task:
+                    self.results_table.add_jobs(jobs)
+            elif kind == 'D':
+                worker.task = None
+                self._finish_task(task, *message[1:])
+
+        if worker.overdue:
+            task = worker.task
+            worker.kill()
+            self._add_log(task, "搜索未能及时停止,已强制结束工作进程", "WARNING")
+            self._finish_task(task, 'cancelled', "已强制停止")
+        elif not worker.alive:
+            if worker.task is not None:
+                self._add_log(worker.task, "✗ 工作进程意外退出", "ERROR")
+                self._finish_task(worker.task, 'failed', "搜索失败")
+        else:
+            return
+        worker.task = None
+        worker.close()
+        self.workers.remove(worker)
+
+    def _add_log(self, task, message, level="INFO"):
+        task.log_lines.append((message, level))
+        if task is self.selected_task:
+            self.log(message, level)
+
+    def _set_progress(self, task, value, text):
+        task.progress, task.progress_text = value, text
+        task.widgets['bar']['value'] = value
+        task.widgets['status'].config(text=text)
+
+    def _finish_task(self, task, status, text):
+        """搜索结束: 更新队列中的一行和状态栏"""
+        task.status = status
+        task.worker = None
+        task.widgets['bar']['value'] = 100 if status == 'done' else task.progress
+        task.widgets['status'].config(
+            text=text,
+            foreground={'done': THEME['success'], 'failed': THEME['error']}.get(status, THEME['warning'])
+        )
+        task.widgets['button'].config(text="移除")
+        if task is self.selected_task:
+            self.stop_button.config(state=tk.DISABLED)
+            if status == 'done':
+                self.notebook.select(self.results_table.frame)
+        self._update_status(f"#{task.id} {text}")
+
+    def _update_status(self, message=None):
+        """状态栏: 运行中和排队的搜索数(及最近的消息)"""
+        running = sum(1 for task in self.tasks if task.status == 'running')
+        queued = sum(1 for task in self.tasks if task.status == 'queued')
+        summary = f"{running} 个搜索运行中" if running else "就绪"
+        if queued:
+            summary += f", {queued} 个排队"
+        self.status_var.set(f"{summary} | {message}" if message else summary)
+
+    def open_search_window(self):
+        """打开已有职位搜索窗口(查询本地全文索引,不重新抓取)"""
+        if self.search_window is not None and self.search_window.winfo_exists():
+            self.search_window.lift()
+            return
 
-                self.update_progress(percent, progress_text)
-
-            # 执行搜索 - 始终使用无头模式
-            self.finder.find_jobs(
-                url=url,
-                keywords=keywords,
-                output_file=output_file,
-                max_jobs=max_jobs,
-                headless=True,  # 固定为True,不再提供选项
-                progress_callback=progress_callback,
-                exclude_keywords=exclude_keywords
-            )
-
-            # 更新进度: 100%
-            self.update_progress(100, "搜索完成!")
-
-            self.log("===== 搜索完成 =====", "SUCCESS")
-            self.status_var.set("搜索完成")
-
-            # 检查文件是否生成
-            if os.path.exists(output_file):
-                file_size = os.path.getsize(output_file)
-                self.log(f"✓ CSV文件已生成: {output_file}", "SUCCESS")
-                self.log(f"✓ 文件大小: {file_size} 字节", "SUCCESS")
-
-                # 读取并显示找到的职位数量
-                with open(output_file, 'r', encoding='utf-8-sig') as f:
-                    lines = f.readlines()
-                    job_count = len(lines) - 1  # 减去表头
-                    self.log(f"✓ 共保存 {job_count} 个职位", "SUCCESS")
-
-                messagebox.showinfo(
-                    "完成",
-                    f"搜索完成!\n\n找到 {job_count} 个职位\n文件已保存到:\n{output_file}\n\n文件大小: {file_size} 字节"
-                )
-            else:
-                self.log(f"✗ 警告: 文件未生成: {output_file}", "ERROR")
-                messagebox.showwarning(
-                    "警告",
-                    f"搜索完成,但CSV文件未生成。\n\n请检查日志了解详情。"
-                )
+        window = tk.Toplevel(self.root)
+        window.title("搜索已有职位")
+        window.geometry("640x460")
+        window.configure(bg=THEME['bg'])
+        self.search_window = window
+
+        frame = ttk.Frame(window, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(frame, text="搜索:").grid(row=0, column=0, sticky=tk.W, pady=6)
+        self.index_query_var = tk.StringVar()
+        query_entry = ttk.Entry(frame, textvariable=self.index_query_var, width=50)
+        query_entry.grid(row=0, column=1, sticky=tk.EW, pady=6)
+        query_entry.focus_set()
+
+        columns = ("title", "url")
+        self.index_tree = ttk.Treeview(frame, columns=columns, show="headings", height=16)
+        self.index_tree.heading("title", text="职位标题")
+        self.index_tree.heading("url", text="职位链接")
+        self.index_tree.column("title", width=260)
+        self.index_tree.column("url", width=340)
+        self.index_tree.grid(row=1, column=0, columnspan=2, sticky=tk.NSEW)
+
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.index_tree.yview)
+        scrollbar.grid(row=1, column=2, sticky=tk.NS)
+        self.index_tree.configure(yscrollcommand=scrollbar.set)
+
+        self.index_status = ttk.Label(frame, text="输入关键字搜索(多个词用空格隔开),双击打开职位",
+                                      foreground=THEME['text_light'])
+        self.index_status.grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=(6, 0))
+
+        frame.columnconfigure(1, weight=1)
+        frame.rowconfigure(1, weight=1)
+
+        # 输入停顿后再查询,避免每个按键都查一次
+        self._index_search_job = None
+        self.index_query_var.trace_add("write", lambda *args: self._schedule_index_search())
+        self.index_tree.bind("<Double-1>", self._open_selected_job)
+
+    def _schedule_index_search(self):
+        """延迟查询(输入停顿150毫秒后执行)"""
+        if self._index_search_job is not None:
+            self.search_window.after_cancel(self._index_search_job)
+        self._index_search_job = self.search_window.after(150, self._run_index_search)
+
+    def _run_index_search(self):
+        """查询本地职位索引并显示结果"""
+        import time
+
+        self._index_search_job = None
+        query = self.index_query_var.get().strip()
+        self.index_tree.delete(*self.index_tree.get_children())
+        if not query:
+            return
 
+        try:
+            if self.search_index is None:
+                from search_index import JobSearchIndex
+                self.search_index = JobSearchIndex()
+            start = time.perf_counter()
+            results = self.search_index.search(query)
+            elapsed_ms = (time.perf_counter() - start) * 1000
         except Exception as e:
-            self.update_progress(0, "搜索失败")
-            self.log(f"✗ 错误: {str(e)}", "ERROR")
-            self.log("=" * 50, "ERROR")
-            self.status_var.set("搜索失败")
-            messagebox.showerror(
-                "错误",
-                f"搜索过程中发生错误:\n\n{str(e)}\n\n请查看日志了解详情。"
-            )
-
-        finally:
-            # 恢复print输出
-            self._restore_print()
-
-            # 恢复按钮状态
-            self.start_button.config(state=tk.NORMAL)
-            self.stop_button.config(state=tk.DISABLED)
-            self.is_running = False
+            self.index_status.config(text=f"搜索失败: {e}")
+            return
+
+        for job in results:
+            title = job['title'].splitlines()[0] if job['title'] else ''
+            self.index_tree.insert("", tk.END, values=(title, job['url']))
+        self.index_status.config(text=f"找到 {len(results)} 个职位,耗时 {elapsed_ms:.0f} 毫秒")
+
+    def _open_selected_job(self, event=None):
+        """在浏览器中打开选中的职位"""
+        import webbrowser
+
+        selection = self.index_tree.selection()
+        if selection:
+            webbrowser.open(self.index_tree.item(selection[0], "values")[1])
 
     def stop_search(self):
-        """停止搜索"""
-        if self.is_running:
-            self.is_running = False
-            self.update_progress(0, "正在停止...")
-            self.status_var.set("正在停止...")
-            self.log("正在停止搜索...", "WARNING")
+        """停止当前显示的搜索"""
+        if self.selected_task is not None:
+            self.stop_task(self.selected_task)
+
+    def stop_task(self, task):
+        """停止一个搜索(排队中的直接取消;运行中的通知工作进程,超时则强制结束)"""
+        if task.status == 'queued':
+            self._add_log(task, "搜索已取消", "WARNING")
+            self._finish_task(task, 'cancelled', "已取消")
+        elif task.status == 'running' and task.worker.kill_deadline is None:
+            task.worker.cancel(task.id, grace=self.stop_grace)
+            task.widgets['status'].config(text="正在停止...")
+            self._add_log(task, "正在停止搜索...", "WARNING")
 
 
 def main():
@@ -0,0 +1,183 @@
+"""
+职位过滤模块 - 从页面链接中筛选职位
+
+功能:
+- 过滤非职位链接
+- 本页去重
+- 排除关键字和匹配关键字过滤
+
+不依赖浏览器,在线抓取和离线(缓存)重新过滤共用同一套逻辑。
+"""
+
+from job_record import Job
+
+
+# 明显不是职位的链接特征
+EXCLUDE_PATTERNS = [
+    'login', 'register', 'home', 'sitemap', 'about', 'contact',
+    'help', 'faq', 'privacy', 'terms', 'javascript:', 'mailto:',
+    '.css', '.js', '.png', '.jpg', '.gif', '.svg', '.woff', '.ttf',
+    '#', 'tel:', 'weixin:', 'download'
+]
+
+
+class ScrapeResult(list):
+    """抓取结果 - 职位列表,附带失败页面记录"""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        # 失败页面: [{'page': 页码, 'url': 页面URL, 'error': 错误信息}, ...]
+        self.failed_pages = []
+
+
+class JobCounter:
+    """只计数不保存的职位列表 - 流式抓取时代替ScrapeResult,内存占用不随职位数增长"""
+
+    def __init__(self):
+        self.count = 0
+
+    def append(self, job):
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+
+def normalize_keywords(keywords):
+    """标准化关键字(转小写去空)"""
+    if not keywords:
+        return set()
+    return set(k.lower() for k in keywords if k.strip())
+
+
+def is_valid_job_link(href, text):
+    """判断是否为有效的职位链接"""
+    href_lower = href.lower()
+
+    # 检查排除模式
+    for pattern in EXCLUDE_PATTERNS:
+        if pattern in href_lower:
+            return False
+
+    # 排除纯域名链接
+    if href_lower.count('/') <= 2:
+        return False
+
+    # 文本长度检查
+    if not (3 <= len(text) <= 200):
+        return False
+
+    # 排除纯数字或特殊符号
+    if text.strip().isdigit():
+        return False
+
+    return True
+
+
+def is_unique_job(href, text, seen_urls, seen_titles):
+    """检查职位是否唯一"""
+    if href in seen_urls:
+        return False
+    if text.lower().strip() in seen_titles:
+        return False
+    return True
+
+
+def match_keywords(text, keywords):
+    """检查文本是否包含任一关键字"""
+    text_lower = text.lower()
+    return any(keyword in text_lower for keyword in keywords)
+
+
+def page_candidates(links):
+    """
+    从页面链接中找出候选职位(有效且本页唯一,尚未按关键字过滤)
+    Args:
+        links: [(href, text), ...]
+    Returns:
+        list: [(href, text), ...]
+    """
+    seen_urls = set()
+    seen_titles = set()
+    candidates = []
+
+    for href, text in links:
+        text = (text or '').strip()
+        if not href or not text:
+            continue
+
+        # 过滤非职位链接
+        if not is_valid_job_link(href, text):
+            continue
+
+        # 去重
+        if not is_unique_job(href, text, seen_urls, seen_titles):
+            continue
+
+        seen_urls.add(href)
+        seen_titles.add(text.lower().strip())
+        candidates.append((href, text))
+
+    return candidates
+
+
+class JobFilter:
+    """关键字过滤器 - 匹配任一关键字且不包含排除关键字"""
+
+    def __init__(self, keywords, exclude_keywords=None, name=None, max_jobs=None):
+        """
+        Args:
+            keywords: 匹配关键字列表(只要包含任一即匹配)
+            exclude_keywords: 排除关键字列表
+            name: 过滤器名称(一次抓取使用多组关键字时区分结果)
+            max_jobs: 本组最大职位数,None表示使用抓取时的设置
+        """
+        self.keyword_set = normalize_keywords(keywords)
+        self.exclude_set = normalize_keywords(exclude_keywords)
+        self.name = name
+        self.max_jobs = max_jobs
+
+    def apply(self, candidates, jobs, target_count=None, progress_callback=None, descriptions=None,
+              source_page=None):
+        """
+        过滤一页候选职位,匹配的追加到jobs
+        Args:
+            candidates: page_candidates()的结果
+            jobs: 累计的职位列表
+            target_count: 达到该数量后停止
+            progress_callback: 进度回调函数 callback(current, total, percent)
+            descriptions: {url: 职位描述},提供时标题和描述一起匹配
+            source_page: 候选职位所在的列表页URL(记录在职位中)
+        Returns:
+            list: 本页匹配的职位列表 [Job, ...]
+        """
+        page_jobs = []
+        label = f"{self.name} " if self.name else ""
+        descriptions = descriptions or {}
+
+        for href, text in candidates:
+            # 检查是否已达到最大数量
+            if target_count and len(jobs) >= target_count:
+                break
+
+            description = descriptions.get(href)
+            match_text = f"{text}\n{description}" if description else text
+
+            # 排除关键字过滤
+            if self.exclude_set and match_keywords(match_text, self.exclude_set):
+                print(f"⊗ [{label}跳过] {text[:60]}... (包含排除关键字)")
+                continue
+
+            # 匹配关键字
+            if match_keywords(match_text, self.keyword_set):
+                job_info = Job(text, href, description or None, source_page)
+                jobs.append(job_info)
+                page_jobs.append(job_info)
+                print(f"✓ [{label}总计:{len(jobs)}] {text[:60]}...")
+
+                # 更新进度
+                if progress_callback and target_count:
+                    percent = min(95, int((len(jobs) / target_count) * 100))
+                    progress_callback(len(jobs), target_count, percent)
+
+        return page_jobs
@@ -3,23 +3,153 @@
 
 功能:
 - 整合网页抓取和AI判断
-- 保存职位信息到CSV文件
+- 保存职位信息到CSV/JSONL/SQLite/Parquet
 """
 
-from web_scraper import JobScraper
 import os
+import threading
+import time
 from datetime import datetime
 
+from dedup import NearDuplicateIndex, cluster_jobs
+from fingerprints import FingerprintStore, jobs_fingerprint
+from job_filter import ScrapeResult, JobCounter, JobFilter, page_candidates
+from metrics import default_metrics
+from page_cache import PageCache
+from pagination import PaginationStrategies
+from sinks import open_sink, output_path, sink_class
+from streaming import iterate_in_thread
+from url_tools import domain_of, job_id
+
+
+# 一次搜索总耗时直方图的桶上限(秒)
+SEARCH_BUCKETS = (1, 10, 30, 60, 120, 300, 600, 1200, 3600)
+
 
 class JobFinder:
     """职位查找器 - 统一的职位搜索入口"""
 
-    def __init__(self):
-        """初始化职位查找器"""
-        pass
+    def __init__(self, page_cache=None, dedup_index=None, detail_fetcher=None, search_index=None,
+                 page_budget=None, profiles=None, metrics=None, fingerprints=None, pagination=None, proxies=None,
+                 browser_pool=None):
+        """
+        初始化职位查找器
+        Args:
+            page_cache: 列表页缓存,默认使用项目目录下的.cache/pages.db
+            dedup_index: 近似重复职位索引(含历史职位),默认使用项目目录下的.cache/dedup.db
+            detail_fetcher: 职位详情抓取器,默认在首次按描述匹配时创建
+            search_index: 本地职位全文索引,默认使用项目目录下的.cache/jobs_index.db
+            page_budget: 翻页预算(PageBudget),None表示使用默认设置
+            profiles: ProfileManager,提供时浏览器使用按网站持久化的配置目录(Cookie和缓存跨运行保留)
+            metrics: CrawlMetrics,监控指标,默认使用进程内共享的指标(可用serve()/dump_periodically()导出)
+            fingerprints: 列表页和结果的内容指纹,默认使用项目目录下的.cache/fingerprints.db;
+                          与上次相同的页面直接使用缓存,结果与上次相同时不重写输出文件
+            pagination: 未知网站学到的翻页方式,默认使用项目目录下的.cache/pagination.db
+            proxies: ProxyPool,提供时浏览器和职位详情请求通过代理出口发送
+            browser_pool: scheduler.BrowserPool,提供时从池中取浏览器、用完归还(同时运行的多个搜索共享
+                          有限的浏览器,headless由池决定)
+        """
+        self.page_cache = page_cache if page_cache is not None else PageCache()
+        self.dedup_index = dedup_index
+        self.detail_fetcher = detail_fetcher
+        self.search_index = search_index
+        self.page_budget = page_budget
+        self.profiles = profiles
+        self.metrics = metrics or default_metrics
+        self.fingerprints = fingerprints if fingerprints is not None else FingerprintStore()
+        self.pagination = pagination if pagination is not None else PaginationStrategies()
+        self.proxies = proxies
+        self.browser_pool = browser_pool
+        # 多个搜索同时运行时,延迟创建的组件只创建一次
+        self._lock = threading.Lock()
+
+        # 后台预热的浏览器(首次搜索时直接使用)
+        self._prewarm_thread = None
+        self._prewarmed_scraper = None
+        self._prewarm_headless = True
+        self._prewarm_lock = threading.Lock()
+
+    def prewarm(self, headless=True, url=None):
+        """
+        在后台线程中预先启动浏览器,交给下一次搜索使用
+
+        Selenium在后台线程中才被导入,不影响界面启动速度。
+        Args:
+            headless: 是否使用无头浏览器
+            url: 预计要搜索的网址(使用持久化配置时据此选择网站的配置目录)
+        """
+        with self._prewarm_lock:
+            if self._prewarm_thread or self._prewarmed_scraper:
+                return
+            self._prewarm_headless = headless
+            self._prewarm_thread = threading.Thread(
+                target=self._run_prewarm, args=(headless, url), daemon=True
+            )
+            self._prewarm_thread.start()
+
+    def _run_prewarm(self, headless, url=None):
+        """后台线程: 导入Selenium并启动浏览器"""
+        try:
+            from web_scraper import JobScraper
+            scraper = JobScraper(headless=headless, profiles=self.profiles, profile_site=self._profile_site(url),
+                                 metrics=self.metrics, proxies=self.proxies)
+        except Exception as e:
+            print(f"浏览器预热失败,将在搜索时重新启动: {e}")
+            scraper = None
+
+        with self._prewarm_lock:
+            self._prewarmed_scraper = scraper
+
+    def _take_prewarmed_scraper(self, headless):
+        """
+        取出预热好的浏览器(如果有)
+        Returns:
+            JobScraper或None
+        """
+        thread = self._prewarm_thread
+        if thread is None:
+            return None
+
+        # 预热仍在进行时等待完成,总比重新冷启动一个浏览器快
+        thread.join()
+
+        with self._prewarm_lock:
+            scraper = self._prewarmed_scraper
+            self._prewarmed_scraper = None
+            self._prewarm_thread = None
+
+        if scraper and self._prewarm_headless != headless:
+            scraper.close()
+            return None
+        return scraper
+
+    @staticmethod
+    def _profile_site(url):
+        """浏览器配置目录对应的网站"""
+        return domain_of(url) if url else None
+
+    def close(self):
+        """关闭尚未使用的预热浏览器和职位详情抓取器"""
+        scraper = self._take_prewarmed_scraper(self._prewarm_headless)
+        if scraper:
+            scraper.close()
+        if self.detail_fetcher:
+            self.detail_fetcher.close()
+            self.detail_fetcher = None
+        self.fingerprints.close()
+        self.pagination.close()
+
+    def _get_detail_fetcher(self):
+        """职位详情抓取器(首次使用时创建)"""
+        with self._lock:
+            if self.detail_fetcher is None:
+                from detail_fetcher import DetailFetcher
+                self.detail_fetcher = DetailFetcher(proxies=self.proxies)
+        return self.detail_fetcher
 
     def find_jobs(self, url, keywords, output_file, max_jobs=None, headless=True,
-                  progress_callback=None, exclude_keywords=None):
+                  progress_callback=None, exclude_keywords=None, offline=False, append=False,
+                  fetch_details=False, job_callback=None, rank=False, top_k=None):
         """
         查找职位并保存到文件
 
@@ -31,37 +161,279 @@ class JobFinder:
             headless: 是否使用无头浏览器
             progress_callback: 进度回调函数
             exclude_keywords: 排除关键字列表
+            offline: 不启动浏览器,只对缓存的列表页重新过滤
+            append: 追加到已有的输出文件(否则覆盖)
+            fetch_details: 抓取职位详情,按标题和职位描述一起匹配关键字(较慢)
+            job_callback: 每找到一个职位调用一次 callback(job)(如界面实时显示结果)
+            rank: 按与关键字的相关度排序后保存;True为各关键字权重相同,也可以是 {关键字: 权重}
+            top_k: 只保存相关度最高的前K个(指定时自动排序)
+        Returns:
+            ScrapeResult: 找到的职位列表(failed_pages记录抓取失败的页面;排序时按相关度从高到低)
         """
+        # 抓取前先检查输出格式,避免抓取完才发现无法保存
+        output_file = output_path(output_file)
+        sink_class(output_file)
+
         self._print_search_info(url, keywords, exclude_keywords, max_jobs, output_file)
 
-        # 网页抓取
-        scraper = JobScraper(headless=headless)
-        jobs = []
+        jobs = ScrapeResult()
+        for job in self.iter_jobs(url, keywords, max_jobs, headless, progress_callback, exclude_keywords,
+                                  offline, fetch_details, failed_pages=jobs.failed_pages):
+            jobs.append(job)
+            if job_callback:
+                job_callback(job)
+        self._print_failed_pages(jobs)
+
+        if not jobs:
+            print("未找到匹配的职位信息")
+            return jobs
+
+        print(f"\n✓ 成功找到 {len(jobs)} 个匹配职位")
+        self._mark_duplicates(jobs)
+        ranked = bool(rank or top_k)
+        if ranked:
+            jobs = self._rank_jobs(jobs, rank if isinstance(rank, dict) else keywords, exclude_keywords, top_k)
+
+        # 保存结果(与上次完全相同时不重写)
+        if not self._results_unchanged(jobs, output_file, append, ranked):
+            self._save_results(jobs, output_file, keywords, append, ranked)
+            self._index_jobs(jobs, output_file)
+        self._print_completion(jobs, output_file)
+        return jobs
+
+    def find_jobs_multi(self, url, profiles, max_jobs=None, headless=True,
+                        progress_callback=None, offline=False, append=False, fetch_details=False):
+        """
+        一次抓取,按多组关键字分别过滤,每组保存到自己的文件
+
+        列表页只抓取一次,N组关键字的开销与一组相同。
+        Args:
+            url: 招聘网站URL
+            profiles: 关键字组列表,每组为字典:
+                {'name': 名称, 'keywords': [...], 'exclude_keywords': [...],
+                 'output_file': 输出文件(默认为"名称.csv"), 'max_jobs': 本组最大职位数}
+            max_jobs: 每组默认的最大职位数,None表示不限制
+            headless: 是否使用无头浏览器
+            progress_callback: 进度回调函数(按所有组合计)
+            offline: 不启动浏览器,只对缓存的列表页重新过滤
+            append: 追加到已有的输出文件(否则覆盖)
+            fetch_details: 抓取职位详情,按标题和职位描述一起匹配关键字(较慢)
+        Returns:
+            dict: {名称: ScrapeResult}
+        """
+        names = [profile['name'] for profile in profiles]
+        if len(set(names)) != len(names):
+            raise ValueError("关键字组名称不能重复")
+
+        output_files = [output_path(profile.get('output_file') or f"{profile['name']}.csv")
+                        for profile in profiles]
+        for output_file in output_files:
+            sink_class(output_file)
+
+        print("=" * 60)
+        print("职位查找器启动(多组关键字)")
+        print("=" * 60)
+        print(f"目标网站: {url}")
+        for profile in profiles:
+            print(f"[{profile['name']}] 关键字: {', '.join(profile['keywords'])}")
+            if profile.get('exclude_keywords'):
+                print(f"[{profile['name']}] 排除关键字: {', '.join(profile['exclude_keywords'])}")
+        print("=" * 60)
+
+        filters = [
+            JobFilter(
+                profile['keywords'],
+                profile.get('exclude_keywords'),
+                name=profile['name'],
+                max_jobs=profile.get('max_jobs')
+            )
+            for profile in profiles
+        ]
+
+        # 各组共用同一份失败页面记录
+        results = {name: ScrapeResult() for name in names}
+        failed_pages = results[names[0]].failed_pages if names else []
+        for jobs in results.values():
+            jobs.failed_pages = failed_pages
+
+        for name, job in self._iter_results(url, filters, max_jobs, headless, progress_callback,
+                                            offline, fetch_details, failed_pages):
+            results[name].append(job)
+        if names:
+            self._print_failed_pages(results[names[0]])
+
+        # 每组分别保存
+        for profile, output_file, jobs in zip(profiles, output_files, results.values()):
+            if jobs:
+                self._mark_duplicates(jobs)
+            if not jobs:
+                print(f"[{profile['name']}] 未找到匹配的职位信息")
+                continue
+            if self._results_unchanged(jobs, output_file, append):
+                continue
+            self._save_results(jobs, output_file, profile['keywords'], append)
+            self._index_jobs(jobs, output_file)
+            print(f"✓ [{profile['name']}] {len(jobs)} 个职位已保存到: {output_file}")
+
+        return results
+
+    def iter_jobs(self, url, keywords, max_jobs=None, headless=True, progress_callback=None,
+                  exclude_keywords=None, offline=False, fetch_details=False, failed_pages=None):
+        """
+        逐个产出匹配的职位(不保存),可直接写入结果输出或只取前N个
+
+        调用方不取下一个职位时抓取暂停;提前停止迭代即停止抓取并关闭浏览器。
+        Args:
+            参数同find_jobs
+            failed_pages: 失败页面记录追加到该列表
+        Yields:
+            Job: 职位记录(可按字典访问 job['title']、job['url'])
+        """
+        filters = [JobFilter(keywords, exclude_keywords)]
+        for _, job in self._iter_results(url, filters, max_jobs, headless, progress_callback,
+                                         offline, fetch_details, failed_pages):
+            yield job
+
+    async def aiter_jobs(self, url, keywords, max_jobs=None, headless=True, progress_callback=None,
+                         exclude_keywords=None, offline=False, fetch_details=False, failed_pages=None,
+                         queue_size=100):
+        """
+        iter_jobs的异步版本(抓取在后台线程中进行,有界队列提供背压)
+        Args:
+            queue_size: 最多缓冲的职位数
+        """
+        jobs = self.iter_jobs(url, keywords, max_jobs, headless, progress_callback, exclude_keywords,
+                              offline, fetch_details, failed_pages)
+        async for job in iterate_in_thread(jobs, queue_size):
+            yield job
+
+    def _iter_results(self, url, filters, max_jobs, headless, progress_callback, offline, fetch_details,
+                      failed_pages):
+        """
+        在线抓取或离线过滤缓存
+        Yields:
+            tuple: (过滤器名称, 职位信息)
+        """
+        mode = 'offline' if offline else 'online'
+        site = domain_of(url)
+        self.metrics.inc('searchjob_searches_total', mode=mode, site=site)
+        started = time.monotonic()
+
+        if offline:
+            results = self._iter_cached_pages(url, filters, max_jobs, progress_callback, fetch_details)
+        else:
+            results = self._iter_scrape(url, filters, max_jobs, headless, progress_callback, fetch_details,
+                                        failed_pages)
+        try:
+            yield from results
+        finally:
+            self.metrics.observe('searchjob_search_seconds', time.monotonic() - started,
+                                 buckets=SEARCH_BUCKETS, mode=mode, site=site)
+
+    def _iter_scrape(self, url, filters, max_jobs, headless, progress_callback, fetch_details=False,
+                     failed_pages=None):
+        """
+        启动浏览器抓取职位,结束(或提前停止迭代)时关闭浏览器(使用浏览器池时归还)
+        Yields:
+            tuple: (过滤器名称, 职位信息)
+        """
+        detail_fetcher = self._get_detail_fetcher() if fetch_details else None
+
+        # 网页抓取(使用浏览器池,或优先使用预热好的浏览器)
+        if self.browser_pool is not None:
+            print("等待空闲的浏览器...")
+            scraper = self.browser_pool.acquire()
+        else:
+            scraper = self._take_prewarmed_scraper(headless)
+            if scraper:
+                print("✓ 使用预热的浏览器")
+        if scraper:
+            self._configure_scraper(scraper, detail_fetcher)
+        else:
+            from web_scraper import JobScraper
+            scraper = JobScraper(headless=headless, page_cache=self.page_cache,
+                                 detail_fetcher=detail_fetcher, page_budget=self.page_budget,
+                                 profiles=self.profiles, profile_site=self._profile_site(url),
+                                 metrics=self.metrics, fingerprints=self.fingerprints,
+                                 pagination=self.pagination, proxies=self.proxies)
 
         try:
-            jobs = scraper.scrape_jobs(
+            yield from scraper.iter_profiles(
                 url=url,
-                keywords=keywords,
+                filters=filters,
                 max_jobs=max_jobs,
                 progress_callback=progress_callback,
-                exclude_keywords=exclude_keywords
+                failed_pages=failed_pages
             )
 
-            if not jobs:
-                print("未找到匹配的职位信息")
-                return
-
-            print(f"\n✓ 成功找到 {len(jobs)} 个匹配职位")
-
         except Exception as e:
             print(f"✗ 抓取职位失败: {e}")
             raise
         finally:
-            scraper.close()
+            if self.browser_pool is not None:
+                self.browser_pool.release(scraper, broken=scraper.driver is None)
+            else:
+                scraper.close()
 
-        # 保存结果
-        self._save_results(jobs, output_file, keywords)
-        self._print_completion(jobs, output_file)
+    def _configure_scraper(self, scraper, detail_fetcher):
+        """预热的或池中的浏览器改用本查找器的缓存、指标等组件"""
+        scraper.page_cache = self.page_cache
+        scraper.detail_fetcher = detail_fetcher
+        scraper.metrics = self.metrics
+        scraper.fingerprints = self.fingerprints
+        scraper.pagination = self.pagination
+        if self.page_budget:
+            scraper.page_budget = self.page_budget
+
+    def _iter_cached_pages(self, url, filters, max_jobs, progress_callback, fetch_details=False):
+        """
+        不启动浏览器,按新的关键字过滤缓存的列表页
+        fetch_details时只使用已缓存的职位描述,不发送网络请求
+        Yields:
+            tuple: (过滤器名称, 职位信息)
+        """
+        print("离线模式: 使用缓存的列表页重新过滤")
+        start = time.perf_counter()
+
+        results = [JobCounter() for _ in filters]
+        limits = [job_filter.max_jobs or max_jobs for job_filter in filters]
+        filter_callback = progress_callback if len(filters) == 1 and limits[0] else None
+        seen_ids = set()
+        page_count = 0
+
+        for page_url, links in self.page_cache.iter_listing(url):
+            if all(limit and len(jobs) >= limit for jobs, limit in zip(results, limits)):
+                break
+            page_count += 1
+
+            # 与在线抓取一样跨页去重
+            candidates = []
+            for href, text in page_candidates(links):
+                key = job_id(href)
+                if key not in seen_ids:
+                    seen_ids.add(key)
+                    candidates.append((href, text))
+
+            descriptions = self._cached_descriptions(candidates) if fetch_details else None
+            for job_filter, jobs, limit in zip(filters, results, limits):
+                for job in job_filter.apply(candidates, jobs, limit, filter_callback, descriptions, page_url):
+                    yield job_filter.name, job
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if page_count == 0:
+            print("缓存中没有该列表页(或已过期),请先在线抓取一次")
+        else:
+            print(f"已过滤 {page_count} 个缓存页面,耗时 {elapsed_ms:.0f} 毫秒")
+
+    def _cached_descriptions(self, candidates):
+        """读取已缓存的职位描述"""
+        cache = self._get_detail_fetcher().cache
+        descriptions = {}
+        for href, _ in candidates:
+            description = cache.get(href)
+            if description is not None:
+                descriptions[href] = description
+        return descriptions
 
     def _print_search_info(self, url, keywords, exclude_keywords, max_jobs, output_file):
         """打印搜索信息"""
@@ -76,31 +448,91 @@ class JobFinder:
         print(f"输出文件: {output_file}")
         print("=" * 60)
 
-    def _save_results(self, jobs, output_file, keywords):
-        """保存职位信息到CSV文件"""
-        import csv
+    def _mark_duplicates(self, jobs):
+        """标记近似重复的职位(与本次及历史职位比较,只分组不删除)"""
+        with self._lock:
+            if self.dedup_index is None:
+                self.dedup_index = NearDuplicateIndex()
+        try:
+            duplicated = cluster_jobs(jobs, self.dedup_index)
+        except Exception as e:
+            print(f"近似重复检测失败: {e}")
+            return
+        if duplicated:
+            self.metrics.inc('searchjob_near_duplicates_total', duplicated)
+            clusters = len({job['cluster'] for job in jobs if job['duplicates']})
+            print(f"发现 {duplicated} 个近似重复职位(共 {clusters} 组,含历史职位)")
+
+    def _index_jobs(self, jobs, output_file):
+        """职位写入本地全文索引(索引失败不影响已保存的结果)"""
+        try:
+            with self._lock:
+                if self.search_index is None:
+                    from search_index import JobSearchIndex
+                    self.search_index = JobSearchIndex()
+            self.search_index.add_many(jobs, source=os.path.abspath(output_file))
+        except Exception as e:
+            print(f"更新职位索引失败: {e}")
+
+    def _print_failed_pages(self, jobs):
+        """打印抓取失败的页面(已抓取的职位照常保存)"""
+        failed_pages = getattr(jobs, 'failed_pages', [])
+        if not failed_pages:
+            return
+        print(f"\n⚠ 以下 {len(failed_pages)} 个页面抓取失败,已跳过:")
+        for failed in failed_pages:
+            print(f"  第 {failed['page']} 页: {failed['url']}")
+            print(f"    {failed['error']}")
+
+    def _rank_jobs(self, jobs, keywords, exclude_keywords, top_k=None):
+        """按相关度排序(保留failed_pages),每个职位记录相关度"""
+        from ranking import RelevanceProfile, rank_jobs
 
-        # 确保目录存在
-        dir_path = os.path.dirname(output_file)
-        if dir_path:
-            os.makedirs(dir_path, exist_ok=True)
+        start = time.perf_counter()
+        ranked = rank_jobs(jobs, RelevanceProfile(keywords, exclude_keywords), top_k)
+        result = ScrapeResult(job for score, job in ranked)
+        result.failed_pages = jobs.failed_pages
+        for score, job in ranked:
+            job['score'] = round(score, 6)
 
-        # 自动添加.csv扩展名
-        if not output_file.endswith('.csv'):
-            output_file = output_file.rsplit('.', 1)[0] + '.csv'
+        kept = f",保留前 {len(result)} 个" if len(result) < len(jobs) else ""
+        print(f"已按相关度排序 {len(jobs)} 个职位{kept}(耗时 {(time.perf_counter() - start) * 1000:.0f} 毫秒)")
+        for score, job in ranked[:5]:
+            print(f"  {score:.3f}  {job['title'].splitlines()[0][:50]}")
+        return result
 
-        # 写入CSV
-        with open(output_file, 'w', encoding='utf-8-sig', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['职位标题', '职位链接'])
+    def _results_unchanged(self, jobs, output_file, append=False, ranked=False):
+        """结果与上次写入该文件的完全相同(且文件仍在)时返回True,追加模式总是写入"""
+        if append or not os.path.exists(output_file):
+            return False
+        try:
+            fingerprint = jobs_fingerprint(jobs, ordered=ranked)
+            unchanged = self.fingerprints.get(self.fingerprints.output_key(output_file)) == fingerprint
+        except Exception as e:
+            print(f"读取结果指纹失败: {e}")
+            return False
+        if unchanged:
+            print(f"结果与上次相同,{output_file} 无需重写")
+        return unchanged
 
-            for job in jobs:
-                writer.writerow([
-                    job.get('title', '未知'),
-                    job.get('url', '')
-                ])
+    def _save_results(self, jobs, output_file, keywords, append=False, ranked=False):
+        """保存职位信息(格式由输出文件扩展名决定)"""
+        with open_sink(output_file, append=append) as sink:
+            sink.write(jobs)
+        # 追加后文件内容不再等于本次结果,下次不能据此跳过写入
+        fingerprint = jobs_fingerprint(jobs, ordered=ranked)
+        if append:
+            fingerprint = 'append:' + fingerprint
+        try:
+            self.fingerprints.update(self.fingerprints.output_key(output_file), fingerprint, len(jobs))
+        except Exception as e:
+            print(f"保存结果指纹失败: {e}")
+        self.metrics.inc('searchjob_jobs_saved_total', len(jobs))
 
-        print(f"CSV格式: 第一列=职位标题, 第二列=职位链接")
+        if output_file.lower().endswith('.csv'):
+            print(f"CSV格式: 第一列=职位标题, 第二列=职位链接")
+        if append:
+            print(f"已追加 {sink.count} 个职位到: {output_file}")
 
     def _print_completion(self, jobs, output_file):
         """打印完成信息"""
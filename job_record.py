@@ -0,0 +1,126 @@
+"""
+职位记录 - 代替 {'title': ..., 'url': ...} 字典
+
+大规模抓取(如网格抓取)时职位对象数量很多,每个字典的固定开销和URL中大段重复的
+前缀(https://www.zhaopin.com/jobdetail/)占了大部分内存。Job:
+- 使用 __slots__,没有每个对象的 __dict__
+- URL拆成 站点、路径前缀、剩余部分 三段,前两段驻留(sys.intern),所有职位共享同一个字符串
+- 同一页的职位共享同一个来源页URL字符串
+- 保留字典式访问(job['title']、job.get('url')、job['cluster'] = ...),原有代码和调用方无需修改
+"""
+
+import sys
+
+from url_tools import job_id
+
+
+def _split_url(url):
+    """
+    拆分URL: ('https://host', '/path/prefix/', 'rest?query')
+    无法识别时前两段为空字符串
+    """
+    scheme_end = url.find('://')
+    if scheme_end < 0:
+        return '', '', url
+    path_start = url.find('/', scheme_end + 3)
+    if path_start < 0:
+        return sys.intern(url), '', ''
+    query_start = url.find('?', path_start)
+    path_end = url.rfind('/', path_start, query_start if query_start >= 0 else len(url)) + 1
+    return sys.intern(url[:path_start]), sys.intern(url[path_start:path_end]), url[path_end:]
+
+
+class Job:
+    """职位记录(支持字典式访问)"""
+
+    # 字典式访问时可用的字段(值为None视为不存在)
+    FIELDS = ('title', 'url', 'description', 'cluster', 'duplicates', 'source_page', 'score')
+
+    __slots__ = ('title', '_origin', '_prefix', '_rest', '_job_id', 'description', 'cluster', 'duplicates',
+                 'source_page', 'score')
+
+    def __init__(self, title, url, description=None, source_page=None, cluster=None, duplicates=None,
+                 score=None):
+        """
+        Args:
+            title: 职位标题
+            url: 职位详情页URL
+            description: 职位描述(抓取详情时)
+            source_page: 职位所在的列表页URL
+            cluster: 近似重复组ID
+            duplicates: 组内其他职位数
+            score: 与关键字的相关度(按相关度排序时)
+        """
+        self.title = title
+        self.url = url
+        self.description = description
+        self.source_page = sys.intern(source_page) if source_page else None
+        self.cluster = cluster
+        self.duplicates = duplicates
+        self.score = score
+
+    @property
+    def url(self):
+        return self._origin + self._prefix + self._rest
+
+    @url.setter
+    def url(self, url):
+        self._origin, self._prefix, self._rest = _split_url(url or '')
+        self._job_id = None
+
+    @property
+    def host(self):
+        """站点(如 https://www.zhaopin.com)"""
+        return self._origin
+
+    @property
+    def job_id(self):
+        """规范职位ID(首次使用时计算)"""
+        if self._job_id is None:
+            self._job_id = job_id(self.url)
+        return self._job_id
+
+    # 字典式访问
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELDS:
+            raise KeyError(f"Job不支持字段: {key}")
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.FIELDS and getattr(self, key) is not None
+
+    def get(self, key, default=None):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        return default
+
+    def keys(self):
+        return [key for key in self.FIELDS if getattr(self, key) is not None]
+
+    def to_dict(self):
+        """转换为字典(只包含有值的字段)"""
+        return {key: getattr(self, key) for key in self.keys()}
+
+    def __eq__(self, other):
+        if isinstance(other, Job):
+            other = other.to_dict()
+        return isinstance(other, dict) and self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Job(title={self.title!r}, url={self.url!r})"
+
+    def __reduce__(self):
+        # 跨进程传递(网格抓取)后重新驻留站点和路径前缀
+        return (Job, (self.title, self.url, self.description, self.source_page, self.cluster, self.duplicates,
+                      self.score))
@@ -0,0 +1,103 @@
+"""
+按搜索区分的日志输出 - 同时运行多个搜索时,各自的print输出进入各自的日志
+
+抓取代码到处使用print,同时运行多个搜索时不能把sys.stdout整个重定向到其中一个搜索的日志框:
+- install() 把sys.stdout/sys.stderr换成按上下文分发的流(只需一次),没有绑定日志的线程照常输出到控制台
+- capture(sink) 期间当前线程的输出交给sink;后台线程用contextvars.copy_context()启动时同样生效
+- LineSink 把print的片段(正文、换行分两次写入)拼成整行,多个线程同时输出时各自拼接
+"""
+
+import contextlib
+import contextvars
+import sys
+import threading
+
+
+# 当前上下文的 (stdout接收者, stderr接收者)
+_current = contextvars.ContextVar('searchjob_log_sinks', default=None)
+_install_lock = threading.Lock()
+
+
+class _RoutingStream:
+    """按上下文分发的输出流"""
+
+    def __init__(self, fallback, index):
+        """
+        Args:
+            fallback: 没有绑定日志时使用的原输出流(pythonw下可能为None)
+            index: 0为stdout,1为stderr
+        """
+        self.fallback = fallback
+        self.index = index
+
+    def write(self, text):
+        sinks = _current.get()
+        if sinks is not None:
+            sinks[self.index](text)
+        elif self.fallback is not None:
+            self.fallback.write(text)
+        return len(text)
+
+    def flush(self):
+        if _current.get() is None and self.fallback is not None:
+            self.fallback.flush()
+
+    def __getattr__(self, name):
+        # encoding、isatty等属性沿用原输出流
+        return getattr(self.fallback, name)
+
+
+def install():
+    """把sys.stdout和sys.stderr换成按上下文分发的流(重复调用无影响)"""
+    with _install_lock:
+        for index, name in enumerate(('stdout', 'stderr')):
+            stream = getattr(sys, name)
+            if not isinstance(stream, _RoutingStream):
+                setattr(sys, name, _RoutingStream(stream, index))
+
+
+@contextlib.contextmanager
+def capture(sink, error_sink=None):
+    """
+    期间当前上下文的输出交给sink
+    Args:
+        sink: 接收stdout文本片段的函数
+        error_sink: 接收stderr文本片段的函数,默认与sink相同
+    """
+    install()
+    token = _current.set((sink, error_sink or sink))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+        for target in (sink, error_sink):
+            flush = getattr(target, 'flush', None)
+            if flush:
+                flush()
+
+
+class LineSink:
+    """把输出片段拼成整行,每行调用一次callback(line)(空行忽略)"""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self._partial = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, text):
+        key = threading.get_ident()
+        with self._lock:
+            lines = (self._partial.pop(key, '') + text).split('\n')
+            if lines[-1]:
+                self._partial[key] = lines[-1]
+        for line in lines[:-1]:
+            if line.strip():
+                self.callback(line.rstrip())
+
+    def flush(self):
+        """输出各线程尚未换行的内容"""
+        with self._lock:
+            rest, self._partial = list(self._partial.values()), {}
+        for line in rest:
+            if line.strip():
+                self.callback(line.rstrip())
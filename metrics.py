@@ -0,0 +1,322 @@
+"""
+抓取监控指标 - 长时间无人值守运行时的实时计数器和直方图
+
+功能:
+- 计数器/直方图/当前值,按标签(网站、错误类型等)区分
+- Prometheus文本格式: 本地HTTP端点(/metrics)或定期写入文件(可交给node_exporter的textfile采集器)
+- 写入.json文件时保存为JSON快照
+- 每秒页数按最近一段时间的滑动窗口计算;限速器状态在导出时读取
+- 其他进程(如网格抓取的工作进程)的快照可以合并导出,按来源加标签区分
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+# 页面加载时间直方图的桶上限(秒)
+LOAD_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 16, 32)
+
+# 指标说明(Prometheus的HELP行)
+HELP = {
+    'searchjob_pages_total': '已抓取的列表页数',
+    'searchjob_page_load_seconds': '列表页加载时间(driver.get)',
+    'searchjob_links_scanned_total': '扫描的页面链接数',
+    'searchjob_candidates_total': '候选职位链接数',
+    'searchjob_new_candidates_total': '跨页去重后的新候选职位数',
+    'searchjob_duplicates_total': '翻页重复的候选职位数',
+    'searchjob_matches_total': '匹配的职位数',
+    'searchjob_unchanged_pages_total': '与上次相同、直接使用缓存结果的列表页数',
+    'searchjob_match_rate': '本次抓取的匹配率(匹配数/新候选职位数)',
+    'searchjob_pages_per_second': '最近一分钟的抓取速度(页/秒)',
+    'searchjob_errors_total': '抓取错误数(按类型)',
+    'searchjob_driver_restarts_total': '浏览器会话失效后的重启次数',
+    'searchjob_driver_recycles_total': '按页数/内存更换浏览器的次数',
+    'searchjob_searches_total': '执行的搜索次数',
+    'searchjob_search_seconds': '一次搜索的总耗时',
+    'searchjob_jobs_saved_total': '保存的职位数',
+    'searchjob_near_duplicates_total': '标记为近似重复的职位数',
+    'searchjob_grid_shards_total': '网格抓取完成/失败的分片数',
+    'searchjob_grid_duplicates_total': '网格抓取中不同分片重复的职位数',
+    'searchjob_throttle_rate': '限速器当前请求速率(页/秒)',
+    'searchjob_throttle_concurrency': '限速器当前并发上限',
+    'searchjob_throttle_in_flight': '限速器正在处理的请求数',
+    'searchjob_throttle_blocks_total': '触发拦截的次数',
+    'searchjob_proxy_blocks_total': '各代理出口遇到的拦截页数',
+    'searchjob_proxy_ejections_total': '代理出口被移出轮换的次数',
+}
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=None):
+    items = list(key) + list(extra or [])
+    if not items:
+        return ''
+    parts = []
+    for name, value in items:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{name}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+class _Histogram:
+    """累计桶计数(Prometheus直方图)"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class CrawlMetrics:
+    """抓取指标 - 同一进程内的抓取器和查找器共享"""
+
+    def __init__(self, window=60, throttles=None):
+        """
+        Args:
+            window: 计算每秒页数的滑动窗口(秒)
+            throttles: ThrottleRegistry,导出时附带各域名的限速状态,None表示使用默认限速器
+        """
+        self.window = window
+        self.throttles = throttles
+        self.started_at = time.time()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._page_times = deque()
+        self._sources = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._dump_thread = None
+        self._dump_stop = threading.Event()
+
+    def inc(self, name, amount=1, **labels):
+        """计数器加amount"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        """设置当前值"""
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name, value, buckets=LOAD_BUCKETS, **labels):
+        """直方图记录一个观测值"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(buckets)
+            histogram.observe(value)
+
+    def page_done(self, site):
+        """记录抓取完一页(用于每秒页数)"""
+        now = time.monotonic()
+        with self._lock:
+            key = ('searchjob_pages_total', _label_key({'site': site}))
+            self._counters[key] = self._counters.get(key, 0) + 1
+            self._page_times.append(now)
+
+    def set_source(self, name, snapshot, label='worker'):
+        """
+        合并导出其他进程的指标快照(同一来源只保留最新的一份)
+        Args:
+            name: 来源名称(如工作进程编号)
+            snapshot: 该进程CrawlMetrics.snapshot()的结果
+            label: 区分来源的标签名
+        """
+        with self._lock:
+            self._sources[str(name)] = (label, snapshot)
+
+    def pages_per_second(self):
+        """最近window秒内的抓取速度"""
+        now = time.monotonic()
+        with self._lock:
+            while self._page_times and self._page_times[0] < now - self.window:
+                self._page_times.popleft()
+            pages = len(self._page_times)
+        elapsed = min(self.window, time.time() - self.started_at)
+        return pages / elapsed if elapsed > 0 else 0.0
+
+    def _collect_throttles(self):
+        """读取限速器状态 [(指标名, 标签, 值), ...]"""
+        throttles = self.throttles
+        if throttles is None:
+            from throttle import default_registry
+            throttles = default_registry
+        samples = []
+        for domain, state in throttles.metrics().items():
+            labels = (('domain', domain),)
+            samples.append(('searchjob_throttle_rate', labels, state['rate']))
+            samples.append(('searchjob_throttle_concurrency', labels, state['concurrency_limit']))
+            samples.append(('searchjob_throttle_in_flight', labels, state['in_flight']))
+            samples.append(('searchjob_throttle_blocks_total', labels, state['blocks']))
+        return samples
+
+    def _samples(self):
+        """当前所有指标的快照"""
+        gauges = [('searchjob_pages_per_second', (), round(self.pages_per_second(), 4))]
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges += [(name, labels, value) for (name, labels), value in sorted(self._gauges.items())]
+            histograms = [(name, labels, list(h.buckets), list(h.counts), h.count, h.sum)
+                          for (name, labels), h in sorted(self._histograms.items())]
+            sources = sorted(self._sources.items())
+        gauges += self._collect_throttles()
+
+        for source, (label, snapshot) in sources:
+            def key(item):
+                return _label_key(dict(item['labels'], **{label: source}))
+            counters += [((c['name'], key(c)), c['value']) for c in snapshot['counters']]
+            gauges += [(g['name'], key(g), g['value']) for g in snapshot['gauges']]
+            histograms += [(h['name'], key(h), h['buckets'], h['counts'], h['count'], h['sum'])
+                           for h in snapshot['histograms']]
+        return counters, gauges, histograms
+
+    def render(self):
+        """
+        Prometheus文本格式
+        Returns:
+            str: 指标文本
+        """
+        counters, gauges, histograms = self._samples()
+        # 同名指标的样本必须相邻
+        counters.sort(key=lambda sample: sample[0][0])
+        gauges.sort(key=lambda sample: sample[0])
+        histograms.sort(key=lambda sample: sample[0])
+        lines = []
+        declared = set()
+
+        def declare(name, kind):
+            if name not in declared:
+                declared.add(name)
+                if name in HELP:
+                    lines.append(f"# HELP {name} {HELP[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            declare(name, 'counter')
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for name, labels, value in gauges:
+            declare(name, 'counter' if name.endswith('_total') else 'gauge')
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for name, labels, buckets, counts, count, total in histograms:
+            declare(name, 'histogram')
+            cumulative = 0
+            for bound, bucket_count in zip(list(buckets) + ['+Inf'], counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self):
+        """
+        JSON快照
+        Returns:
+            dict: {'time', 'counters', 'gauges', 'histograms'}
+        """
+        counters, gauges, histograms = self._samples()
+        return {
+            'time': time.time(),
+            'counters': [{'name': n, 'labels': dict(l), 'value': v} for (n, l), v in counters],
+            'gauges': [{'name': n, 'labels': dict(l), 'value': v} for n, l, v in gauges],
+            'histograms': [
+                {'name': n, 'labels': dict(l), 'buckets': b, 'counts': c, 'count': cnt, 'sum': s}
+                for n, l, b, c, cnt, s in histograms
+            ],
+        }
+
+    def write(self, path):
+        """写入文件(先写临时文件再替换,采集方不会读到一半的内容)"""
+        if path.endswith('.json'):
+            content = json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+        else:
+            content = self.render()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def dump_periodically(self, path, interval=15):
+        """
+        在后台线程中定期写入文件(.json为JSON快照,其他为Prometheus文本格式)
+        Args:
+            path: 输出文件
+            interval: 写入间隔(秒)
+        """
+        def run():
+            # 停止时再写一次最终的指标
+            while True:
+                stopped = self._dump_stop.wait(interval)
+                try:
+                    self.write(path)
+                except OSError as e:
+                    print(f"写入监控指标失败: {e}")
+                if stopped:
+                    break
+
+        self._dump_stop.clear()
+        self._dump_thread = threading.Thread(target=run, name="metrics-dump", daemon=True)
+        self._dump_thread.start()
+        print(f"监控指标每 {interval} 秒写入: {path}")
+
+    def serve(self, port=9464, host='127.0.0.1'):
+        """
+        在后台线程中提供 http://host:port/metrics
+        Returns:
+            int: 实际监听的端口(port为0时自动分配)
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        port = self._server.server_address[1]
+        print(f"监控指标: http://{host}:{port}/metrics")
+        return port
+
+    def close(self):
+        """停止HTTP端点和定期写入(最后写入一次)"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._dump_thread:
+            self._dump_stop.set()
+            self._dump_thread.join()
+            self._dump_thread = None
+
+
+# 进程内共享的默认指标
+default_metrics = CrawlMetrics()
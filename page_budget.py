@@ -0,0 +1,102 @@
+"""
+翻页预算 - 按每页的实际收获决定是否继续翻页
+
+代替固定的"最多10页":
+- 跟踪每页的匹配率和新职位比例(跨页去重后)
+- 预计下一页的新增匹配数(指数平滑)低于阈值时停止
+- 收获一直很高时可以超过10页,直到页数上限或时间上限
+"""
+
+import time
+
+
+class PageBudget:
+    """自适应翻页预算"""
+
+    def __init__(self, max_pages=50, max_seconds=None, min_yield=1.5, min_pages=3,
+                 min_new_share=0.2, smoothing=0.5):
+        """
+        Args:
+            max_pages: 页数上限
+            max_seconds: 时间上限(秒),None表示不限制
+            min_yield: 预计每页新增匹配职位数低于该值时停止
+            min_pages: 至少抓取的页数(前几页的收获波动较大,不据此停止)
+            min_new_share: 本页新职位链接占比低于该值时停止(翻页后内容大多重复,通常是翻到了头)
+            smoothing: 指数平滑系数,越大越看重最近的页面
+        """
+        self.max_pages = max_pages
+        self.max_seconds = max_seconds
+        self.min_yield = min_yield
+        self.min_pages = min_pages
+        self.min_new_share = min_new_share
+        self.smoothing = smoothing
+        self.reset()
+
+    def reset(self):
+        """开始新的一次抓取"""
+        self.started_at = time.monotonic()
+        self.pages = 0
+        self.candidates = 0
+        self.new_candidates = 0
+        self.matches = 0
+        self.expected_yield = None
+        self.last_candidates = None
+        self.last_new_share = 1.0
+
+    def record(self, candidates, new_candidates, matches):
+        """
+        记录一页的收获
+        Args:
+            candidates: 本页候选职位数
+            new_candidates: 其中之前页面没有出现过的职位数
+            matches: 本页新增的匹配职位数
+        """
+        self.pages += 1
+        self.candidates += candidates
+        self.new_candidates += new_candidates
+        self.matches += matches
+        self.last_candidates = candidates
+        self.last_new_share = new_candidates / candidates if candidates else 0.0
+        if self.expected_yield is None:
+            self.expected_yield = float(matches)
+        else:
+            self.expected_yield = self.smoothing * matches + (1 - self.smoothing) * self.expected_yield
+
+    @property
+    def match_rate(self):
+        """累计匹配率(匹配数 / 新候选职位数)"""
+        return self.matches / self.new_candidates if self.new_candidates else 0.0
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    def stop_reason(self):
+        """
+        是否应停止翻页
+        Returns:
+            str: 停止原因,继续翻页时返回None
+        """
+        if self.pages >= self.max_pages:
+            return f"已达到页数上限({self.max_pages}页)"
+        if self.max_seconds is not None and self.elapsed >= self.max_seconds:
+            return f"已达到时间上限({self.max_seconds:.0f}秒)"
+        if self.last_candidates == 0:
+            return "本页没有职位,可能已到最后一页"
+        if self.pages and self.last_new_share < self.min_new_share:
+            return f"本页新职位仅占 {self.last_new_share:.0%},后续页面大多重复"
+        if self.pages >= self.min_pages and self.expected_yield < self.min_yield:
+            return f"预计每页新增 {self.expected_yield:.1f} 个匹配职位,低于 {self.min_yield:g},继续翻页收获不大"
+        return None
+
+    def percent(self):
+        """无最大职位数时的进度估计(按页数和时间上限)"""
+        fraction = self.pages / self.max_pages
+        if self.max_seconds:
+            fraction = max(fraction, self.elapsed / self.max_seconds)
+        return min(95, int(fraction * 100))
+
+    def summary(self):
+        """本次抓取的统计"""
+        return (f"共 {self.pages} 页, 新候选职位 {self.new_candidates}/{self.candidates}, "
+                f"匹配率 {self.match_rate:.0%}, 耗时 {self.elapsed:.0f} 秒")
@@ -0,0 +1,155 @@
+"""
+列表页缓存 - 把每页提取到的链接保存到磁盘
+
+功能:
+- 以规范化的列表页URL为键,保存该页所有链接(标题+URL)和下一页URL
+- 过期时间(TTL),过期的页面视为未缓存
+- 按总大小限制,最久未使用的页面优先淘汰(LRU)
+- 修改关键字/排除关键字后,可以直接对缓存重新过滤,无需启动浏览器
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from url_tools import canonical_url
+
+
+DEFAULT_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'pages.db')
+
+
+class PageCache:
+    """列表页链接缓存(SQLite文件,数据zlib压缩)"""
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, ttl=6 * 3600, max_bytes=64 * 1024 * 1024):
+        """
+        Args:
+            path: 缓存文件路径
+            ttl: 缓存有效期(秒)
+            max_bytes: 缓存数据总大小上限(字节),超出后淘汰最久未使用的页面
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        """打开数据库(首次使用时创建)"""
+        if self._conn is None:
+            dir_path = os.path.dirname(self.path)
+            if dir_path:
+                os.makedirs(dir_path, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                " url TEXT PRIMARY KEY,"
+                " fetched_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " next_url TEXT,"
+                " data BLOB NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at)")
+            self._conn.commit()
+        return self._conn
+
+    def put(self, page_url, links, next_url=None):
+        """
+        保存一页的链接
+        Args:
+            page_url: 列表页URL
+            links: [(href, text), ...]
+            next_url: 下一页URL(未知则为None)
+        """
+        data = zlib.compress(json.dumps(list(links), ensure_ascii=False).encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (url, fetched_at, accessed_at, size, next_url, data)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (canonical_url(page_url), now, now, len(data),
+                 canonical_url(next_url) if next_url else None, data)
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def get(self, page_url, ttl=None):
+        """
+        读取一页的链接
+        Args:
+            page_url: 列表页URL
+            ttl: 有效期(秒),默认使用构造时的设置
+        Returns:
+            tuple: (links, next_url),未缓存或已过期返回None
+        """
+        ttl = self.ttl if ttl is None else ttl
+        key = canonical_url(page_url)
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT fetched_at, next_url, data FROM pages WHERE url = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            fetched_at, next_url, data = row
+            if ttl and time.time() - fetched_at > ttl:
+                return None
+            conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), key))
+            conn.commit()
+
+        links = [tuple(link) for link in json.loads(zlib.decompress(data).decode('utf-8'))]
+        return links, next_url
+
+    def iter_listing(self, url, ttl=None):
+        """
+        从第一页开始,沿下一页URL依次读取缓存的列表页
+        Args:
+            url: 第一页URL
+        Yields:
+            tuple: (page_url, links)
+        """
+        page_url = url
+        seen = set()
+        while page_url and page_url not in seen:
+            seen.add(page_url)
+            entry = self.get(page_url, ttl)
+            if entry is None:
+                return
+            links, next_url = entry
+            yield page_url, links
+            page_url = next_url
+
+    def _evict(self, conn):
+        """总大小超出上限时,淘汰最久未使用的页面"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = conn.execute("SELECT url, size FROM pages ORDER BY accessed_at").fetchall()
+        target = self.max_bytes * 0.9
+        expired = []
+        for url, size in rows:
+            if total <= target:
+                break
+            expired.append((url,))
+            total -= size
+        conn.executemany("DELETE FROM pages WHERE url = ?", expired)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM pages")
+            conn.commit()
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
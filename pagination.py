@@ -0,0 +1,344 @@
+"""
+翻页策略学习 - 未知网站第一次抓取时识别翻页方式,按域名保存,之后直接使用
+
+支持的翻页方式:
+- url:    页码在URL中(/p2、page=2、start=20、list_2.html等),由第一页URL和"下一页"链接比较得出,
+          之后的页面直接修改URL,不需要查找按钮
+- click:  "下一页"按钮没有可用的链接(javascript:、按钮元素),记住找到按钮的规则(rel、aria-label、文本、class),
+          之后只用这一条规则查找并点击
+- scroll: 没有翻页按钮,滚动到底部后加载更多(无限滚动)
+
+查找按钮在浏览器中用一次脚本完成,不逐个尝试选择器。学到的方式连续失败时删除,下次重新识别。
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+
+DEFAULT_PAGINATION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'pagination.db')
+
+# 查找"下一页"元素的脚本,arguments[0]为规则名,返回找到的第一个可见、可用的元素
+_FIND_NEXT_JS = r"""
+const visible = el => el.tagName === 'LINK' || !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+const disabled = el => el.disabled || el.getAttribute('aria-disabled') === 'true'
+    || /disabled/i.test(el.getAttribute('class') || '')
+    || /disabled/i.test((el.parentElement && el.parentElement.getAttribute('class')) || '');
+const texts = ['下一页', '下一页>', '下一页 >', '下页', '>', '»', '›', 'next', 'next >', 'next ›', 'next page'];
+const finders = {
+  rel: () => document.querySelectorAll('a[rel~="next"], link[rel~="next"]'),
+  aria: () => Array.from(document.querySelectorAll('a[aria-label], button[aria-label], li[aria-label]'))
+      .filter(el => /^(next|下一页)/i.test(el.getAttribute('aria-label').trim())),
+  text: () => Array.from(document.querySelectorAll('a, button, span, li'))
+      .filter(el => texts.includes((el.innerText || '').trim().toLowerCase())),
+  class: () => document.querySelectorAll(
+      'a[class*="next" i], button[class*="next" i], li[class*="next" i] > a, li[class*="next" i] > button'),
+};
+const findNext = rule => Array.from(finders[rule]()).find(el => visible(el) && !disabled(el));
+"""
+
+# 识别: 返回 [[规则名, 链接], ...](每条规则找到的第一个元素)和页码为arguments[0]的链接
+_DETECT_JS = _FIND_NEXT_JS + r"""
+const found = [];
+for (const rule of Object.keys(finders)) {
+  const el = findNext(rule);
+  if (el) {
+    const link = el.closest('a') || el;
+    found.push([rule, link.href || '']);
+  }
+}
+const number = Array.from(document.querySelectorAll('a'))
+    .find(a => (a.innerText || '').trim() === arguments[0] && visible(a));
+return {next: found, number: number ? number.href : ''};
+"""
+
+# 点击: arguments[0]为规则名,返回是否找到并点击
+_CLICK_JS = _FIND_NEXT_JS + r"""
+const el = findNext(arguments[0]);
+if (!el || el.tagName === 'LINK') return false;
+el.click();
+return true;
+"""
+
+_COUNT_LINKS_JS = "return document.querySelectorAll('a').length;"
+
+# 页码前面可以出现的分隔符
+_DELIMITERS = '/?&;#_-'
+
+
+def _is_page_link(href):
+    return bool(href) and href.startswith(('http://', 'https://'))
+
+
+def _digit_at(text, index):
+    return 0 <= index < len(text) and text[index].isdigit()
+
+
+def url_strategy(current_url, next_url):
+    """
+    比较当前页和下一页的URL,推断页码的位置
+    Args:
+        current_url: 当前页URL
+        next_url: "下一页"链接
+    Returns:
+        dict: {'type': 'url', 'anchor', 'step', 'insert', 'where', 'first'},无法推断时返回None
+    """
+    if not (_is_page_link(current_url) and _is_page_link(next_url)) or current_url == next_url:
+        return None
+
+    # 公共前缀和后缀(退到完整的数字边界)
+    prefix = 0
+    limit = min(len(current_url), len(next_url))
+    while prefix < limit and current_url[prefix] == next_url[prefix]:
+        prefix += 1
+    if _digit_at(current_url, prefix) or _digit_at(next_url, prefix):
+        while prefix and current_url[prefix - 1].isdigit():
+            prefix -= 1
+    suffix = 0
+    limit = min(len(current_url), len(next_url)) - prefix
+    while suffix < limit and current_url[-1 - suffix] == next_url[-1 - suffix]:
+        suffix += 1
+    if _digit_at(current_url, len(current_url) - suffix - 1) or _digit_at(next_url, len(next_url) - suffix - 1):
+        while suffix and current_url[len(current_url) - suffix].isdigit():
+            suffix -= 1
+    current_part = current_url[prefix:len(current_url) - suffix]
+    next_part = next_url[prefix:len(next_url) - suffix]
+
+    if current_part.isdigit() and next_part.isdigit():
+        # 页码已在URL中: page=1 -> page=2
+        step = int(next_part) - int(current_part)
+        anchor = _anchor_before(current_url, prefix)
+        if step <= 0 or not anchor:
+            return None
+        return {'type': 'url', 'anchor': anchor, 'step': step, 'insert': None, 'where': None, 'first': None}
+
+    if not current_part:
+        # 第一页URL没有页码: /jobs?kw=a -> /jobs?kw=a&page=2
+        match = re.search(r'\d+', next_part)
+        if not match or re.search(r'\d', next_part[match.end():]):
+            return None
+        number = int(match.group())
+        anchor = _anchor_before(next_url, prefix + match.start())
+        if not anchor:
+            return None
+        return {
+            'type': 'url',
+            'anchor': anchor,
+            # 第二页为2(从1开始)或1(从0开始)时每页加1,否则视为偏移量(start=20 -> start=40)
+            'step': 1 if number <= 2 else number,
+            'insert': next_part[:match.start()] + '{page}' + next_part[match.end():],
+            'where': _insert_position(current_url, prefix, next_part),
+            'first': number,
+        }
+    return None
+
+
+def _insert_position(url, position, inserted):
+    """
+    第一页没有页码时,页码插入的位置(与具体的搜索条件无关,换关键字后也能使用)
+    Returns:
+        str: 'query'(查询参数末尾), 'path'(路径末尾), 'ext'(文件扩展名之前)
+    """
+    parts = urlsplit(url)
+    path_end = len(parts.scheme) + 3 + len(parts.netloc) + len(parts.path)
+    if position > path_end or inserted.startswith(('?', '&')):
+        return 'query'
+    if position < path_end and '.' in parts.path.rsplit('/', 1)[-1]:
+        return 'ext'
+    return 'path'
+
+
+def _anchor_before(url, position):
+    """页码前面的参数名/路径片段(到上一个分隔符为止,包括分隔符)"""
+    start = position
+    while start > 0 and url[start - 1] not in _DELIMITERS:
+        start -= 1
+    if start == 0:
+        return None
+    return url[start - 1:position]
+
+
+def next_page_url(current_url, strategy):
+    """
+    按学到的URL翻页方式计算下一页URL
+    Returns:
+        str: 下一页URL,当前URL不符合该方式时返回None
+    """
+    anchor = strategy['anchor']
+    # 查询参数的位置可能不同(?page= 或 &page=)
+    pattern = ('[?&]' + re.escape(anchor[1:]) if anchor[0] in '?&' else re.escape(anchor)) + r'(\d+)'
+    matches = list(re.finditer(pattern, current_url))
+    if matches:
+        match = matches[-1]
+        page = int(match.group(1)) + strategy['step']
+        return current_url[:match.start(1)] + str(page) + current_url[match.end(1):]
+
+    # 第一页: 在学习时的位置插入页码
+    insert = strategy.get('insert')
+    if not insert:
+        return None
+    insert = insert.replace('{page}', str(strategy['first']))
+    parts = urlsplit(current_url)
+    where = strategy.get('where')
+    if where == 'query':
+        query = insert.lstrip('?&')
+        if parts.query:
+            query = f"{parts.query}&{query}"
+        return urlunsplit(parts._replace(query=query))
+    path = parts.path
+    if where == 'ext' and '.' in path.rsplit('/', 1)[-1]:
+        stem, ext = path.rsplit('.', 1)
+        path = f"{stem}{insert}.{ext}"
+    elif insert.startswith('/'):
+        path = path.rstrip('/') + insert
+    else:
+        path = path if path.endswith('/') else path + '/'
+        path += insert
+    return urlunsplit(parts._replace(path=path))
+
+
+def detect_strategy(driver, current_url, page_num=1, scroll_wait=2):
+    """
+    在当前页识别翻页方式
+    Args:
+        driver: WebDriver(停留在当前页)
+        current_url: 当前页URL
+        page_num: 当前页码(查找页码为page_num+1的链接)
+        scroll_wait: 判断无限滚动时,滚动后等待的秒数
+    Returns:
+        tuple: (翻页方式, 下一页URL),都识别不到时返回(None, None)
+    """
+    found = driver.execute_script(_DETECT_JS, str(page_num + 1)) or {}
+    next_links = found.get('next') or []
+
+    # 优先使用URL翻页: 不依赖按钮,当前页加载失败时也能跳到下一页
+    candidates = [href for _, href in next_links] + [found.get('number') or '']
+    for href in candidates:
+        strategy = url_strategy(current_url, href)
+        if strategy:
+            return strategy, href
+
+    for rule, _ in next_links:
+        if rule != 'rel':
+            return {'type': 'click', 'rule': rule}, None
+
+    count = driver.execute_script(_COUNT_LINKS_JS) or 0
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+    time.sleep(scroll_wait)
+    if (driver.execute_script(_COUNT_LINKS_JS) or 0) > count:
+        return {'type': 'scroll'}, current_url
+    return None, None
+
+
+def click_next(driver, rule):
+    """
+    用学到的规则点击"下一页"
+    Returns:
+        bool: 是否找到并点击
+    """
+    return bool(driver.execute_script(_CLICK_JS, rule))
+
+
+def describe(strategy):
+    """翻页方式的说明文字"""
+    if strategy['type'] == 'url':
+        return f"URL翻页({strategy['anchor']}N,每页+{strategy['step']})"
+    if strategy['type'] == 'click':
+        return f"点击下一页按钮(按{strategy['rule']}查找)"
+    return "滚动加载"
+
+
+class PaginationStrategies:
+    """各域名学到的翻页方式(SQLite文件)"""
+
+    # 连续失败多少次后删除,下次重新识别
+    max_failures = 2
+
+    def __init__(self, path=DEFAULT_PAGINATION_FILE):
+        """
+        Args:
+            path: 数据库文件路径
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        """打开数据库(首次使用时创建)"""
+        if self._conn is None:
+            dir_path = os.path.dirname(self.path)
+            if dir_path:
+                os.makedirs(dir_path, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS strategies ("
+                " domain TEXT PRIMARY KEY,"
+                " strategy TEXT NOT NULL,"
+                " successes INTEGER NOT NULL DEFAULT 0,"
+                " failures INTEGER NOT NULL DEFAULT 0,"
+                " learned_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, domain):
+        """
+        域名学到的翻页方式
+        Returns:
+            dict: 翻页方式,没有记录时返回None
+        """
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT strategy FROM strategies WHERE domain = ?", (domain,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, domain, strategy):
+        """保存识别到的翻页方式"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO strategies (domain, strategy, successes, failures, learned_at)"
+                " VALUES (?, ?, 0, 0, ?)",
+                (domain, json.dumps(strategy, ensure_ascii=False), time.time())
+            )
+            conn.commit()
+
+    def record(self, domain, success):
+        """
+        记录按学到的方式翻页后是否得到了新职位
+        Returns:
+            bool: 是否因连续失败删除了该方式
+        """
+        with self._lock:
+            conn = self._connect()
+            if success:
+                conn.execute("UPDATE strategies SET successes = successes + 1, failures = 0 WHERE domain = ?",
+                             (domain,))
+                conn.commit()
+                return False
+            conn.execute("UPDATE strategies SET failures = failures + 1 WHERE domain = ?", (domain,))
+            row = conn.execute("SELECT failures FROM strategies WHERE domain = ?", (domain,)).fetchone()
+            forgotten = bool(row) and row[0] >= self.max_failures
+            if forgotten:
+                conn.execute("DELETE FROM strategies WHERE domain = ?", (domain,))
+            conn.commit()
+        return forgotten
+
+    def forget(self, domain):
+        """删除域名的翻页方式"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM strategies WHERE domain = ?", (domain,))
+            conn.commit()
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,343 @@
+"""
+职位相关度排序 - 按带权重的关键字给职位打分,输出排序后的结果
+
+关键字过滤只判断"是否包含",结果按页面顺序排列。本模块:
+- 标题(有职位描述时加上描述,权重较低)转换为特征向量: 英文/数字词 + 中文字符2、3元组,TF-IDF加权后归一化
+- 关键字配置为带权重的向量(如 AI:2 大模型 销售:-1,负权重表示降低相关度),与所有职位一次性计算余弦相似度
+- 安装了NumPy时用稀疏矩阵(CSR数组)运算和argpartition取前K个,否则逐个计算(结果相同,较慢)
+- 相同的标题(+描述)只提取一次特征、在矩阵中只占一行(列表页中大量重复的标题)
+
+用法:
+    python ranking.py jobs_result.jsonl --keywords AI:2 大模型 算法 --top 50 -o ranked.csv
+"""
+
+import argparse
+import heapq
+import json
+import math
+import re
+import unicodedata
+from collections import Counter
+
+from job_record import Job
+
+
+# 英文/数字词(保留 c++、c#、.net 等写法)与连续的中文
+TERM_RE = re.compile(r'[a-z0-9][a-z0-9+#.]*|[一-鿿]+')
+CJK_RE = re.compile(r'[一-鿿]')
+
+# 中文按字符n元组切分的长度
+NGRAM_SIZES = (2, 3)
+
+# 职位描述相对于标题的权重
+DEFAULT_DESCRIPTION_WEIGHT = 0.3
+
+
+def _term_features(term):
+    """一个词的特征: 英文/数字词本身;中文为字符2、3元组(单个汉字保留原字)"""
+    if len(term) == 1 or not CJK_RE.match(term):
+        return [term]
+    features = []
+    for size in NGRAM_SIZES:
+        features.extend(term[i:i + size] for i in range(len(term) - size + 1))
+    return features
+
+
+def _terms(text):
+    return TERM_RE.findall(unicodedata.normalize('NFKC', text).lower())
+
+
+def text_features(text):
+    """
+    文本的特征: 英文/数字词、中文词段的字符2、3元组
+    Returns:
+        list: 特征字符串(可重复,重复次数即词频)
+    """
+    features = []
+    for term in _terms(text or ''):
+        features.extend(_term_features(term))
+    return features
+
+
+def parse_weighted(keywords, default=1.0):
+    """
+    解析带权重的关键字
+    Args:
+        keywords: ['AI:2', '大模型', ...] 或 {关键字: 权重}
+    Returns:
+        dict: {关键字: 权重}
+    """
+    if isinstance(keywords, dict):
+        return {k: float(w) for k, w in keywords.items() if k.strip()}
+    weights = {}
+    for keyword in keywords or []:
+        keyword = keyword.strip()
+        name, sep, weight = keyword.rpartition(':')
+        if sep and name:
+            try:
+                weights[name] = float(weight)
+                continue
+            except ValueError:
+                pass
+        if keyword:
+            weights[keyword] = default
+    return weights
+
+
+class RelevanceProfile:
+    """带权重的关键字配置"""
+
+    def __init__(self, keywords, exclude_keywords=None, exclude_weight=-1.0):
+        """
+        Args:
+            keywords: 关键字列表(可带权重,如 'AI:2')或 {关键字: 权重}
+            exclude_keywords: 排除关键字,按exclude_weight(负数)降低相关度
+            exclude_weight: 排除关键字的默认权重
+        """
+        self.weights = parse_weighted(keywords)
+        for keyword, weight in parse_weighted(exclude_keywords, exclude_weight).items():
+            self.weights.setdefault(keyword, weight)
+        if not self.weights:
+            raise ValueError("相关度排序需要至少一个关键字")
+
+    def features(self):
+        """
+        关键字的特征权重(每个关键字的权重平均分到它的各个特征上)
+        Returns:
+            dict: {特征: 权重}
+        """
+        combined = {}
+        for keyword, weight in self.weights.items():
+            features = text_features(keyword)
+            for feature in features:
+                combined[feature] = combined.get(feature, 0.0) + weight / len(features)
+        return combined
+
+    def __repr__(self):
+        return f"RelevanceProfile({self.weights!r})"
+
+
+class _Corpus:
+    """
+    职位的稀疏特征矩阵(CSR: 第r行为 indptr[r]:indptr[r+1] 范围内的 (特征序号, 词频))
+
+    每种不同的 标题+描述 只占一行,rows[i]为第i个职位所在的行,multiplicity[r]为该行对应的职位数。
+    """
+
+    def __init__(self, jobs, description_weight):
+        self.vocabulary = {}
+        self.indices = []
+        self.counts = []
+        self.indptr = [0]
+        self.rows = []
+        self.multiplicity = []
+        # 词 -> 特征序号(不同标题中大量重复的词只切分一次)
+        self._term_ids = {}
+        row_of = {}
+
+        for job in jobs:
+            if type(job) is Job:
+                key = (job.title or '', job.description or '')
+            else:
+                key = (job.get('title') or '', job.get('description') or '')
+            row = row_of.get(key)
+            if row is None:
+                row = row_of[key] = len(self.multiplicity)
+                self._add_row(key[0], key[1], description_weight)
+                self.multiplicity.append(0)
+            self.multiplicity[row] += 1
+            self.rows.append(row)
+        self.total = len(self.rows)
+
+    def _ids(self, text):
+        """文本的特征序号(可重复)"""
+        ids = []
+        term_ids = self._term_ids
+        for term in _terms(text):
+            cached = term_ids.get(term)
+            if cached is None:
+                vocabulary = self.vocabulary
+                cached = term_ids[term] = [vocabulary.setdefault(f, len(vocabulary)) for f in _term_features(term)]
+            ids.extend(cached)
+        return ids
+
+    def _add_row(self, title, description, description_weight):
+        ids = self._ids(title.split('\n', 1)[0])
+        if description:
+            counts = Counter(ids)
+            for column, count in Counter(self._ids(description)).items():
+                counts[column] += count * description_weight
+            self.indices.extend(counts)
+            self.counts.extend(counts.values())
+        elif len(set(ids)) == len(ids):
+            # 标题中的特征通常不重复,不必计数
+            self.indices.extend(ids)
+            self.counts.extend([1] * len(ids))
+        else:
+            counts = Counter(ids)
+            self.indices.extend(counts)
+            self.counts.extend(counts.values())
+        self.indptr.append(len(self.indices))
+
+
+def _idf(document_frequency, total):
+    return math.log((1 + total) / (1 + document_frequency)) + 1
+
+
+def _tf(count):
+    # 对数词频: 标题中重复出现的词不会压过其他关键字
+    return 1 + math.log(count) if count >= 1 else count
+
+
+def _scores_numpy(corpus, profile_features, np):
+    """稀疏矩阵 × 关键字向量,得到每个职位的余弦相似度"""
+    size = len(corpus.vocabulary)
+    indices = np.asarray(corpus.indices, dtype=np.int64)
+    counts = np.asarray(corpus.counts, dtype=np.float64)
+    indptr = np.asarray(corpus.indptr, dtype=np.int64)
+    rows = np.asarray(corpus.rows, dtype=np.int64)
+    if not len(indices):
+        return np.zeros(len(rows))
+
+    # 文档频率按职位数计(相同标题的每个职位都算一次)
+    lengths = np.diff(indptr)
+    multiplicity = np.asarray(corpus.multiplicity, dtype=np.float64)
+    frequency = np.bincount(indices, weights=np.repeat(multiplicity, lengths), minlength=size)
+    idf = np.log((1 + corpus.total) / (1 + frequency)) + 1
+    tf = np.where(counts >= 1, 1 + np.log(np.maximum(counts, 1)), counts)
+    weights = tf * idf[indices]
+
+    query = np.zeros(size)
+    for feature, weight in profile_features.items():
+        column = corpus.vocabulary.get(feature)
+        if column is not None:
+            query[column] = weight * idf[column]
+
+    # 按行求和(reduceat不支持空行,末尾补0,空行的结果置0)
+    starts = indptr[:-1]
+    empty = lengths == 0
+    dots = np.add.reduceat(np.append(weights * query[indices], 0.0), starts)
+    norms = np.sqrt(np.add.reduceat(np.append(weights * weights, 0.0), starts))
+    dots[empty] = 0.0
+    norms[empty] = 1.0
+
+    query_norm = np.linalg.norm(query) or 1.0
+    return (dots / (norms * query_norm))[rows]
+
+
+def _scores_python(corpus, profile_features):
+    """没有NumPy时逐行计算余弦相似度"""
+    indices, counts, indptr = corpus.indices, corpus.counts, corpus.indptr
+    frequency = Counter()
+    for row, (start, end) in enumerate(zip(indptr, indptr[1:])):
+        for column in indices[start:end]:
+            frequency[column] += corpus.multiplicity[row]
+    idf = {column: _idf(count, corpus.total) for column, count in frequency.items()}
+
+    query = {}
+    for feature, weight in profile_features.items():
+        column = corpus.vocabulary.get(feature)
+        if column is not None:
+            query[column] = weight * idf[column]
+    query_norm = math.sqrt(sum(w * w for w in query.values())) or 1.0
+
+    row_scores = []
+    for start, end in zip(indptr, indptr[1:]):
+        dot = norm = 0.0
+        for column, count in zip(indices[start:end], counts[start:end]):
+            weight = _tf(count) * idf[column]
+            norm += weight * weight
+            if column in query:
+                dot += weight * query[column]
+        row_scores.append(dot / (math.sqrt(norm) * query_norm) if norm else 0.0)
+    return [row_scores[row] for row in corpus.rows]
+
+
+def rank_jobs(jobs, profile, top_k=None, description_weight=DEFAULT_DESCRIPTION_WEIGHT):
+    """
+    按相关度排序
+    Args:
+        jobs: 职位列表
+        profile: RelevanceProfile
+        top_k: 只返回相关度最高的前K个,None表示全部
+        description_weight: 职位描述的权重(相对于标题)
+    Returns:
+        list: [(相关度, 职位), ...],相关度从高到低(相同时保持原顺序)
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    corpus = _Corpus(jobs, description_weight)
+    features = profile.features()
+    count = len(jobs) if top_k is None else max(0, min(top_k, len(jobs)))
+
+    try:
+        import numpy as np
+    except ImportError:
+        scores = _scores_python(corpus, features)
+        order = heapq.nsmallest(count, range(len(jobs)), key=lambda i: (-scores[i], i))
+        return [(scores[i], jobs[i]) for i in order]
+
+    scores = _scores_numpy(corpus, features, np)
+    if count < len(jobs):
+        # 只对前K个排序: argpartition为线性时间
+        candidates = np.argpartition(-scores, count - 1)[:count] if count else np.array([], dtype=np.int64)
+    else:
+        candidates = np.arange(len(jobs))
+    order = candidates[np.lexsort((candidates, -scores[candidates]))]
+    return [(float(scores[i]), jobs[i]) for i in order]
+
+
+def _load_jobs(path):
+    """读取已保存的结果(CSV/JSON Lines/SQLite)"""
+    lower = path.lower()
+    if lower.endswith(('.jsonl', '.ndjson')):
+        with open(path, 'r', encoding='utf-8') as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        return [Job(r.get('title') or '', r.get('url') or '', r.get('description'), cluster=r.get('cluster'))
+                for r in records]
+    if lower.endswith(('.db', '.sqlite', '.sqlite3')):
+        import sqlite3
+        with sqlite3.connect(path) as conn:
+            rows = conn.execute("SELECT title, url, cluster FROM jobs ORDER BY id").fetchall()
+        return [Job(title, url, cluster=cluster) for title, url, cluster in rows]
+    if lower.endswith('.csv'):
+        import csv
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.reader(f))[1:]
+        return [Job(row[0], row[1]) for row in rows if len(row) >= 2]
+    raise ValueError(f"无法读取 {path} (支持 .csv、.jsonl、.db)")
+
+
+def main():
+    """命令行入口: 对已保存的结果按相关度排序"""
+    from sinks import open_sink, output_path
+
+    parser = argparse.ArgumentParser(description="按关键字相关度对职位排序")
+    parser.add_argument("input", help="已保存的结果(.csv/.jsonl/.db)")
+    parser.add_argument("--keywords", nargs="+", required=True, help="关键字,可带权重如 AI:2")
+    parser.add_argument("--exclude", nargs="*", default=[], help="降低相关度的关键字")
+    parser.add_argument("--top", type=int, default=None, help="只输出相关度最高的前K个")
+    parser.add_argument("--description-weight", type=float, default=DEFAULT_DESCRIPTION_WEIGHT,
+                        help="职位描述的权重(相对于标题)")
+    parser.add_argument("-o", "--output", help="输出文件(格式由扩展名决定),不指定时只打印")
+    args = parser.parse_args()
+
+    jobs = _load_jobs(args.input)
+    profile = RelevanceProfile(args.keywords, args.exclude)
+    ranked = rank_jobs(jobs, profile, args.top, args.description_weight)
+    print(f"共 {len(jobs)} 个职位,按 {profile.weights} 排序")
+    for rank, (score, job) in enumerate(ranked[:20], 1):
+        print(f"{rank:>4}. {score:.3f}  {job['title'].splitlines()[0][:50]}")
+
+    if args.output:
+        output_file = output_path(args.output)
+        for score, job in ranked:
+            job['score'] = round(score, 6)
+        with open_sink(output_file) as sink:
+            sink.write(job for score, job in ranked)
+        print(f"已保存 {sink.count} 个职位到: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+"""
+定时搜索调度器 - 长时间运行,按间隔重复执行保存的搜索
+
+功能:
+- 搜索队列: 每个搜索有执行间隔和优先级
+- 固定大小的浏览器池,所有搜索共享,避免每次冷启动Chrome
+- 相同列表页的搜索合并为一次抓取,各自按自己的关键字过滤
+- 抓取结果交给结果处理器(sink)
+"""
+
+import heapq
+import itertools
+import json
+import queue
+import threading
+import time
+
+from dedup import NearDuplicateIndex, cluster_jobs
+from metrics import default_metrics
+from url_tools import canonical_url
+
+
+class SavedSearch:
+    """保存的搜索 - 调度器中的一个定时任务"""
+
+    def __init__(self, name, url, keywords, exclude_keywords=None, max_jobs=None,
+                 interval=3600, priority=0, output_file=None, append=False):
+        """
+        Args:
+            name: 搜索名称(唯一)
+            url: 招聘网站URL
+            keywords: 匹配关键字列表
+            exclude_keywords: 排除关键字列表
+            max_jobs: 最大抓取职位数,None表示不限制
+            interval: 执行间隔(秒)
+            priority: 优先级,数值越大越先执行
+            output_file: 输出文件路径,供默认的结果处理器使用(扩展名决定格式)
+            append: 每次结果追加到输出文件(否则覆盖)
+        """
+        self.name = name
+        self.url = url
+        self.keywords = list(keywords)
+        self.exclude_keywords = list(exclude_keywords or [])
+        self.max_jobs = max_jobs
+        self.interval = interval
+        self.priority = priority
+        self.output_file = output_file or f"{name}.csv"
+        self.append = append
+
+    def coalesce_key(self):
+        """相同键(同一列表页)的搜索只需抓取一次"""
+        return canonical_url(self.url)
+
+    def to_filter(self):
+        """转换为JobFilter,合并抓取时按名称区分结果"""
+        from job_filter import JobFilter
+        return JobFilter(self.keywords, self.exclude_keywords, name=self.name, max_jobs=self.max_jobs)
+
+    @classmethod
+    def from_dict(cls, data):
+        """从字典(如JSON配置)创建"""
+        return cls(**data)
+
+
+class BrowserPool:
+    """固定大小的浏览器池 - 按需启动,用完归还"""
+
+    def __init__(self, size=2, headless=True, profiles=None, pagination=None, proxies=None):
+        """
+        Args:
+            size: 最多同时存在的浏览器数量
+            headless: 是否使用无头浏览器
+            profiles: ProfileManager,提供时浏览器使用持久化配置目录(每个浏览器一个槽位)
+            pagination: 未知网站学到的翻页方式(所有浏览器共享),默认使用项目目录下的.cache/pagination.db
+            proxies: ProxyPool,提供时每个浏览器粘性使用一个代理出口(尽量分散到不同出口)
+        """
+        if pagination is None:
+            from pagination import PaginationStrategies
+            pagination = PaginationStrategies()
+        self.size = size
+        self.headless = headless
+        self.profiles = profiles
+        self.pagination = pagination
+        self.proxies = proxies
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def acquire(self, timeout=None):
+        """
+        取出一个浏览器,池未满时启动新的,否则等待归还
+        Args:
+            timeout: 最多等待多少秒,超时抛出queue.Empty(None为一直等待)
+        Returns:
+            JobScraper
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+
+            if can_create:
+                try:
+                    from web_scraper import JobScraper
+                    return JobScraper(headless=self.headless, profiles=self.profiles, pagination=self.pagination,
+                                      proxies=self.proxies)
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+
+            # 定期醒来: 损坏的浏览器关闭后名额空出,可以启动新的
+            wait = 1.0 if deadline is None else min(1.0, deadline - time.monotonic())
+            if wait <= 0:
+                raise queue.Empty
+            try:
+                return self._idle.get(timeout=wait)
+            except queue.Empty:
+                pass
+
+    def prewarm(self):
+        """在后台启动一个浏览器放入池中(第一次搜索不用等待浏览器启动)"""
+        def warm():
+            try:
+                scraper = self.acquire(timeout=0)
+            except queue.Empty:
+                return
+            except Exception as e:
+                print(f"浏览器预热失败: {e}")
+                return
+            self.release(scraper)
+
+        threading.Thread(target=warm, name="pool-prewarm", daemon=True).start()
+
+    def release(self, scraper, broken=False):
+        """
+        归还浏览器
+        Args:
+            scraper: acquire()取出的JobScraper
+            broken: 浏览器是否已损坏(损坏的会被关闭,名额释放)
+        """
+        if broken or self._closed:
+            scraper.close()
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put(scraper)
+
+    def close(self):
+        """关闭池中所有空闲浏览器"""
+        self._closed = True
+        while True:
+            try:
+                scraper = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            scraper.close()
+            with self._lock:
+                self._created -= 1
+        self.pagination.close()
+        if self.proxies:
+            self.proxies.close()
+
+
+def file_sink(search, jobs):
+    """默认结果处理器: 保存到搜索的输出文件"""
+    from sinks import open_sink
+    with open_sink(search.output_file, append=search.append) as sink:
+        sink.write(jobs)
+    print(f"[{search.name}] 已保存 {len(jobs)} 个职位到 {search.output_file}")
+
+
+class _SearchGroup:
+    """合并后的一次抓取 - 包含所有同一列表页的到期搜索"""
+
+    def __init__(self, key, search):
+        self.key = key
+        self.searches = [search]
+
+    @property
+    def priority(self):
+        return max(s.priority for s in self.searches)
+
+
+class SearchScheduler:
+    """定时搜索调度器"""
+
+    def __init__(self, pool, sink=file_sink, dedup_index=None):
+        """
+        Args:
+            pool: BrowserPool,并发度等于池大小
+            sink: 结果处理器 sink(search, jobs)
+            dedup_index: NearDuplicateIndex,交给sink前标记近似重复职位,None表示不检测
+        """
+        self.pool = pool
+        self.sink = sink
+        self.dedup_index = dedup_index
+        self._schedule = []                # 堆: (下次执行时间, -优先级, 序号, 名称)
+        self._searches = {}                # 名称 -> SavedSearch
+        self._pending = {}                 # 键 -> 已排队等待执行的_SearchGroup
+        self._running = {}                 # 键 -> 正在抓取的_SearchGroup
+        self._ready = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stopped = threading.Event()
+        self._threads = []
+
+    def add(self, search, delay=0):
+        """
+        添加搜索
+        Args:
+            search: SavedSearch
+            delay: 首次执行前的等待时间(秒)
+        """
+        with self._cond:
+            self._searches[search.name] = search
+            self._push(search, time.time() + delay)
+            self._cond.notify()
+
+    def remove(self, name):
+        """移除搜索(已在执行的本次抓取不受影响)"""
+        with self._cond:
+            self._searches.pop(name, None)
+
+    def _push(self, search, run_at):
+        heapq.heappush(self._schedule, (run_at, -search.priority, next(self._seq), search.name))
+
+    def start(self):
+        """启动调度线程和工作线程(工作线程数等于浏览器池大小)"""
+        self._stopped.clear()
+        dispatcher = threading.Thread(target=self._dispatch_loop, name="scheduler", daemon=True)
+        self._threads = [dispatcher]
+        for i in range(self.pool.size):
+            self._threads.append(
+                threading.Thread(target=self._worker_loop, name=f"search-worker-{i}", daemon=True)
+            )
+        for thread in self._threads:
+            thread.start()
+        print(f"调度器已启动: {len(self._searches)} 个搜索, {self.pool.size} 个浏览器")
+
+    def stop(self, wait=True):
+        """停止调度,关闭浏览器池"""
+        self._stopped.set()
+        with self._cond:
+            self._cond.notify_all()
+        for _ in range(self.pool.size):
+            self._ready.put((float('inf'), next(self._seq), None))
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self.pool.close()
+        print("调度器已停止")
+
+    def run_forever(self):
+        """启动并阻塞运行,Ctrl+C停止"""
+        self.start()
+        try:
+            while not self._stopped.is_set():
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def _dispatch_loop(self):
+        """调度线程: 把到期的搜索合并后放入执行队列"""
+        while not self._stopped.is_set():
+            with self._cond:
+                now = time.time()
+                while self._schedule and self._schedule[0][0] <= now:
+                    _, _, _, name = heapq.heappop(self._schedule)
+                    search = self._searches.get(name)
+                    if search:
+                        self._enqueue(search)
+
+                timeout = self._schedule[0][0] - now if self._schedule else None
+                self._cond.wait(timeout)
+
+    def _enqueue(self, search):
+        """合并到已排队的同一列表页的抓取,否则新建一次抓取"""
+        key = search.coalesce_key()
+
+        # 本搜索正在执行中,本次到期直接由正在进行的抓取满足
+        running = self._running.get(key)
+        if running and search in running.searches:
+            return
+
+        group = self._pending.get(key)
+        if group:
+            if search not in group.searches:
+                group.searches.append(search)
+            return
+
+        group = _SearchGroup(key, search)
+        self._pending[key] = group
+        self._ready.put((-group.priority, next(self._seq), group))
+
+    def _worker_loop(self):
+        """工作线程: 占用一个浏览器执行抓取"""
+        while True:
+            _, _, group = self._ready.get()
+            if group is None or self._stopped.is_set():
+                return
+
+            with self._cond:
+                self._pending.pop(group.key, None)
+                self._running[group.key] = group
+
+            results = self._run_group(group)
+
+            with self._cond:
+                self._running.pop(group.key, None)
+                searches = list(group.searches)
+                next_run = time.time()
+                for search in searches:
+                    if search.name in self._searches:
+                        self._push(search, next_run + search.interval)
+                self._cond.notify()
+
+            if results is None:
+                continue
+
+            for search in searches:
+                try:
+                    if self.dedup_index is not None:
+                        cluster_jobs(results[search.name], self.dedup_index)
+                    self.sink(search, results[search.name])
+                except Exception as e:
+                    print(f"[{search.name}] 结果处理失败: {e}")
+
+    def _run_group(self, group):
+        """
+        执行一次抓取,列表页只抓取一次,按每个搜索的关键字分别过滤
+        Returns:
+            dict: {搜索名称: 职位列表},失败返回None
+        """
+        with self._cond:
+            searches = list(group.searches)
+        names = ', '.join(s.name for s in searches)
+        print(f"\n[调度] 开始抓取: {names}")
+
+        try:
+            scraper = self.pool.acquire()
+        except Exception as e:
+            print(f"[调度] 获取浏览器失败: {e}")
+            return None
+
+        broken = False
+        try:
+            results = scraper.scrape_profiles(
+                url=searches[0].url,
+                filters=[search.to_filter() for search in searches]
+            )
+            counts = ', '.join(f"{name} {len(jobs)}" for name, jobs in results.items())
+            print(f"[调度] 抓取完成: {counts}")
+            return results
+        except Exception as e:
+            print(f"[调度] 抓取失败: {names}: {e}")
+            broken = True
+            return None
+        finally:
+            self.pool.release(scraper, broken=broken)
+
+
+def load_searches(config_file):
+    """
+    从JSON文件读取保存的搜索
+    格式: [{"name": ..., "url": ..., "keywords": [...], "interval": 3600, ...}, ...]
+    """
+    with open(config_file, 'r', encoding='utf-8') as f:
+        return [SavedSearch.from_dict(item) for item in json.load(f)]
+
+
+def main():
+    """命令行入口: python scheduler.py searches.json --browsers 2"""
+    import argparse
+    from proxy_pool import DEFAULT_CHECK_URL, ProxyPool
+
+    parser = argparse.ArgumentParser(description="定时搜索调度器")
+    parser.add_argument("config", help="保存的搜索(JSON文件)")
+    parser.add_argument("--browsers", type=int, default=2, help="浏览器池大小")
+    parser.add_argument("--show-browser", action="store_true", help="显示浏览器窗口")
+    parser.add_argument("--persistent-profile", action="store_true", help="浏览器使用持久化配置目录(跨运行保留Cookie和缓存)")
+    parser.add_argument("--proxies", help="代理列表文件(每行一个 http://、socks5:// 或 direct),浏览器分散使用")
+    parser.add_argument("--proxy-check-url", default=DEFAULT_CHECK_URL,
+                        help="代理健康检查访问的页面(默认 %(default)s)")
+    parser.add_argument("--metrics-port", type=int, help="在该端口提供Prometheus格式的监控指标(/metrics)")
+    parser.add_argument("--metrics-file", help="定期写入监控指标的文件(.prom为Prometheus文本格式,.json为JSON)")
+    args = parser.parse_args()
+
+    if args.metrics_port:
+        default_metrics.serve(args.metrics_port)
+    if args.metrics_file:
+        default_metrics.dump_periodically(args.metrics_file)
+
+    profiles = None
+    if args.persistent_profile:
+        from browser_profile import ProfileManager
+        profiles = ProfileManager()
+    proxies = None
+    if args.proxies:
+        proxies = ProxyPool.from_file(args.proxies, check_url=args.proxy_check_url)
+        proxies.check_all()
+    pool = BrowserPool(size=args.browsers, headless=not args.show_browser, profiles=profiles, proxies=proxies)
+    scheduler = SearchScheduler(pool, dedup_index=NearDuplicateIndex())
+    for search in load_searches(args.config):
+        scheduler.add(search)
+    try:
+        scheduler.run_forever()
+    finally:
+        default_metrics.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+本地职位全文索引 - 在所有抓取过的职位中即时搜索
+
+功能:
+- 每次搜索完成后增量写入索引(同一职位按规范职位ID只保留一条)
+- SQLite FTS5 trigram分词,中文不需要分词词典;少于3个字的词退回LIKE匹配
+- 可以导入已有的CSV/JSONL/SQLite输出文件
+- 查询只读索引,不需要重新抓取或读取整个CSV
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from url_tools import job_id
+
+
+DEFAULT_SEARCH_INDEX_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '.cache', 'jobs_index.db'
+)
+
+# trigram分词器的最短可匹配长度
+MIN_FTS_TERM_LENGTH = 3
+
+
+class JobSearchIndex:
+    """本地职位全文索引"""
+
+    def __init__(self, path=DEFAULT_SEARCH_INDEX_FILE):
+        """
+        Args:
+            path: 索引文件路径
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        dir_path = os.path.dirname(path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id INTEGER PRIMARY KEY,"
+                " job_id TEXT UNIQUE NOT NULL,"
+                " title TEXT NOT NULL,"
+                " url TEXT NOT NULL,"
+                " description TEXT NOT NULL DEFAULT '',"
+                " source TEXT,"
+                " scraped_at TEXT NOT NULL)"
+            )
+            self.fts = self._create_fts()
+            self._rekey_legacy_ids()
+
+    def _rekey_legacy_ids(self):
+        """
+        旧版本中其他网站的职位ID不含查询参数(view.php?id=1和?id=2共用一行),按保存的URL重新计算
+        新ID已有记录时删除旧行(REPLACE删除的行不会触发删除触发器,全文索引会不同步)
+        """
+        legacy = self._conn.execute(
+            "SELECT id, job_id, url FROM jobs WHERE url LIKE '%?%' AND job_id NOT LIKE '%?%'"
+            " AND job_id NOT LIKE 'zhaopin:%' AND job_id NOT LIKE 'liepin:%'"
+        ).fetchall()
+        for row_id, old_id, url in legacy:
+            new_id = job_id(url)
+            if new_id == old_id:
+                continue
+            if self._conn.execute("SELECT 1 FROM jobs WHERE job_id = ?", (new_id,)).fetchone():
+                self._conn.execute("DELETE FROM jobs WHERE id = ?", (row_id,))
+            else:
+                self._conn.execute("UPDATE jobs SET job_id = ? WHERE id = ?", (new_id, row_id))
+
+    def _create_fts(self):
+        """创建FTS5 trigram索引(需要SQLite 3.34+),不支持时只用LIKE查询"""
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5("
+                " title, description, content='jobs', content_rowid='id', tokenize='trigram')"
+            )
+        except sqlite3.OperationalError as e:
+            print(f"当前SQLite不支持FTS5 trigram索引,搜索将逐条匹配: {e}")
+            return False
+
+        self._conn.executescript("""
+            CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+                INSERT INTO jobs_fts (rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END;
+            CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+                INSERT INTO jobs_fts (jobs_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+            END;
+            CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE ON jobs BEGIN
+                INSERT INTO jobs_fts (jobs_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+                INSERT INTO jobs_fts (rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END;
+        """)
+        return True
+
+    def add_many(self, jobs, source=None):
+        """
+        增量写入职位(一个事务),已有的职位更新标题和来源
+        Args:
+            jobs: 职位列表 [{'title': ..., 'url': ..., 'description': 可选}, ...]
+            source: 来源(如输出文件路径)
+        Returns:
+            int: 写入的职位数
+        """
+        scraped_at = datetime.now().isoformat(timespec='seconds')
+        rows = [
+            (job_id(job['url']), job.get('title', ''), job['url'],
+             job.get('description') or '', source, scraped_at)
+            for job in jobs if job.get('url')
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO jobs (job_id, title, url, description, source, scraped_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (job_id) DO UPDATE SET"
+                " title = excluded.title, url = excluded.url,"
+                " description = CASE WHEN excluded.description != '' THEN excluded.description"
+                " ELSE jobs.description END,"
+                " source = COALESCE(excluded.source, jobs.source),"
+                " scraped_at = excluded.scraped_at",
+                rows
+            )
+        return len(rows)
+
+    def search(self, query, limit=200):
+        """
+        搜索职位,空格分隔的多个词须全部包含(标题或职位描述)
+        Args:
+            query: 查询文本
+            limit: 最多返回的职位数
+        Returns:
+            list: [{'title', 'url', 'source', 'scraped_at'}, ...],按相关度(或时间)排序
+        """
+        terms = [term for term in query.split() if term]
+        if not terms:
+            return []
+
+        long_terms = [t for t in terms if len(t) >= MIN_FTS_TERM_LENGTH] if self.fts else []
+        short_terms = [t for t in terms if t not in long_terms]
+
+        conditions = []
+        params = []
+        for term in short_terms:
+            pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            conditions.append("(j.title LIKE ? ESCAPE '\\' OR j.description LIKE ? ESCAPE '\\')")
+            params.extend([pattern, pattern])
+
+        if long_terms:
+            sql = ("SELECT j.title, j.url, j.source, j.scraped_at FROM jobs_fts"
+                   " JOIN jobs j ON j.id = jobs_fts.rowid WHERE jobs_fts MATCH ?")
+            params.insert(0, ' '.join('"' + t.replace('"', '""') + '"' for t in long_terms))
+            order = "jobs_fts.rank"
+        else:
+            sql = "SELECT j.title, j.url, j.source, j.scraped_at FROM jobs j WHERE 1"
+            order = "j.scraped_at DESC, j.id DESC"
+
+        for condition in conditions:
+            sql += " AND " + condition
+        sql += f" ORDER BY {order} LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {'title': title, 'url': url, 'source': source, 'scraped_at': scraped_at}
+            for title, url, source, scraped_at in rows
+        ]
+
+    def count(self):
+        """索引中的职位数"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def import_file(self, path):
+        """
+        导入已有的输出文件(CSV/JSONL/SQLite)
+        Returns:
+            int: 导入的职位数
+        """
+        return self.add_many(read_output_file(path), source=os.path.abspath(path))
+
+    def close(self):
+        """关闭索引"""
+        with self._lock:
+            self._conn.close()
+
+
+def read_output_file(path):
+    """
+    读取职位输出文件
+    Returns:
+        list: [{'title': ..., 'url': ...}, ...]
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.reader(f))
+        # 第一行是表头
+        return [{'title': row[0], 'url': row[1]} for row in rows[1:] if len(row) >= 2]
+    if ext in ('.jsonl', '.ndjson'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    if ext in ('.db', '.sqlite', '.sqlite3'):
+        conn = sqlite3.connect(path)
+        try:
+            return [{'title': title, 'url': url} for title, url in conn.execute("SELECT title, url FROM jobs")]
+        finally:
+            conn.close()
+    raise ValueError(f"不支持导入的文件格式: {ext} (支持: .csv, .jsonl, .db)")
+
+
+def main():
+    """命令行入口: python search_index.py 关键字 / python search_index.py --import liepin.csv zhilian.csv"""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="搜索本地职位索引")
+    parser.add_argument("query", nargs="*", help="查询词(多个词须全部包含)")
+    parser.add_argument("--import", dest="imports", nargs="+", default=[], help="导入已有的输出文件")
+    parser.add_argument("--limit", type=int, default=50, help="最多显示的职位数")
+    args = parser.parse_args()
+
+    index = JobSearchIndex()
+    try:
+        for path in args.imports:
+            print(f"已导入 {index.import_file(path)} 个职位: {path}")
+
+        if args.query:
+            start = time.perf_counter()
+            results = index.search(' '.join(args.query), limit=args.limit)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            for job in results:
+                print(f"{job['title'].splitlines()[0][:60]}\n    {job['url']}")
+            print(f"共 {len(results)} 个职位(索引共 {index.count()} 个),耗时 {elapsed_ms:.1f} 毫秒")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
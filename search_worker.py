@@ -0,0 +1,300 @@
+"""
+搜索工作进程 - 图形界面的搜索在子进程中运行
+
+抓取和Tk在同一进程时,抓取线程与界面争用GIL,抓取卡住时界面也跟着卡住。本模块:
+- 每个工作进程有自己的JobFinder和一个浏览器(搜索之间保留,下一次搜索不用重新启动)
+- 界面通过一条单向管道发送命令,工作进程通过另一条管道发回消息,都是短元组:
+    界面 -> 工作进程: ('S', 搜索编号, 搜索参数) 开始搜索   ('C', 搜索编号) 停止搜索
+                      ('W',) 预热浏览器   ('Q',) 退出
+    工作进程 -> 界面: ('L', 级别, 文本) 一行日志   ('P', 已找到, 目标数, 百分比) 进度
+                      ('J', [(标题, 链接), ...]) 一批职位   ('D', 状态, 说明) 搜索结束(done/cancelled/failed)
+- 工作进程中print的输出按行发回界面,界面进程的sys.stdout不受影响
+- 停止: 先通知工作进程在下一次进度/职位回调时中断;超时仍未结束则强制结束整个进程树(包括浏览器),
+  需要时再启动新的工作进程
+"""
+
+import multiprocessing
+import os
+import queue
+import signal
+import subprocess
+import threading
+import time
+
+from log_stream import LineSink, capture
+
+
+# 职位每攒够多少个发回一次
+JOB_BATCH_SIZE = 50
+
+
+class SearchCancelled(Exception):
+    """搜索被用户停止"""
+
+
+class SearchWorker:
+    """搜索工作进程(在界面进程中使用)"""
+
+    def __init__(self, name='search-worker'):
+        """启动工作进程"""
+        child_commands, self._commands = multiprocessing.Pipe(duplex=False)
+        self._events, child_events = multiprocessing.Pipe(duplex=False)
+        self.process = multiprocessing.Process(
+            target=_worker_main, args=(child_commands, child_events), name=name, daemon=True
+        )
+        self.process.start()
+        # 关闭本进程中的子进程一端,工作进程退出时这里才能读到EOF
+        child_commands.close()
+        child_events.close()
+
+        # 当前搜索(调用方的任意对象),None表示空闲
+        self.task = None
+        self.kill_deadline = None
+        self.dead = False
+
+    @property
+    def busy(self):
+        return self.task is not None
+
+    @property
+    def alive(self):
+        return not self.dead and self.process.is_alive()
+
+    def _send(self, command):
+        try:
+            self._commands.send(command)
+        except (BrokenPipeError, EOFError, OSError):
+            self.dead = True
+
+    def start_search(self, task, search_id, params):
+        """
+        开始搜索
+        Args:
+            task: 调用方的搜索对象(结束前保存在self.task)
+            search_id: 搜索编号
+            params: find_jobs的参数 {'url', 'keywords', 'output_file', ...}
+        """
+        self.task = task
+        self.kill_deadline = None
+        self._send(('S', search_id, params))
+
+    def prewarm(self):
+        """在工作进程中预热浏览器"""
+        self._send(('W',))
+
+    def cancel(self, search_id, grace=5):
+        """
+        停止当前搜索
+        Args:
+            search_id: 搜索编号
+            grace: 超过多少秒仍未结束时需要强制结束(见overdue)
+        """
+        self._send(('C', search_id))
+        self.kill_deadline = time.monotonic() + grace
+
+    @property
+    def overdue(self):
+        """停止请求已超时,需要强制结束"""
+        return self.busy and self.kill_deadline is not None and time.monotonic() >= self.kill_deadline
+
+    def poll(self, limit=500):
+        """
+        取出工作进程发回的消息(不等待)
+        Returns:
+            list: 消息元组,每次最多limit条
+        """
+        messages = []
+        try:
+            while len(messages) < limit and self._events.poll():
+                messages.append(self._events.recv())
+        except (EOFError, OSError):
+            self.dead = True
+        return messages
+
+    def kill(self):
+        """强制结束工作进程及其浏览器"""
+        _kill_tree(self.process)
+        self.dead = True
+
+    def close(self, timeout=5):
+        """通知工作进程关闭浏览器后退出,超时则强制结束"""
+        if self.alive:
+            self._send(('Q',))
+            self.process.join(timeout)
+        if self.process.is_alive():
+            self.kill()
+        self._commands.close()
+        self._events.close()
+
+
+def _kill_tree(process):
+    """结束进程及其子进程(chromedriver、Chrome)"""
+    if process.pid is None or not process.is_alive():
+        return
+    if os.name == 'nt':
+        subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)], capture_output=True)
+    else:
+        try:
+            # 工作进程启动时创建了自己的进程组
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            process.kill()
+    process.join(5)
+
+
+class _Channel:
+    """发回界面的管道(工作进程中多个线程都会输出)"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        with self._lock:
+            try:
+                self.connection.send(message)
+            except (BrokenPipeError, OSError):
+                # 界面已退出,读命令的线程会收到EOF并停止搜索
+                pass
+
+    def log(self, text, level='INFO'):
+        self.send(('L', level, text))
+
+
+def _read_commands(commands, requests, cancelled):
+    """读命令的线程: 停止命令立即生效,其他命令按顺序交给主线程"""
+    while True:
+        try:
+            command = commands.recv()
+        except (EOFError, OSError):
+            # 界面进程已退出: 停止当前搜索,关闭浏览器后退出
+            cancelled.add(None)
+            requests.put(('Q',))
+            return
+        if command[0] == 'C':
+            cancelled.add(command[1])
+        else:
+            requests.put(command)
+
+
+def _create_finder():
+    """工作进程的JobFinder: 一个浏览器,搜索之间保留"""
+    from browser_profile import ProfileManager
+    from job_finder import JobFinder
+    from pagination import PaginationStrategies
+    from scheduler import BrowserPool
+
+    profiles = ProfileManager()
+    pagination = PaginationStrategies()
+    pool = BrowserPool(size=1, headless=True, profiles=profiles, pagination=pagination)
+    return JobFinder(profiles=profiles, pagination=pagination, browser_pool=pool)
+
+
+def _worker_main(commands, events):
+    """工作进程入口"""
+    if hasattr(os, 'setsid'):
+        # 独立的进程组: 强制结束时连同浏览器一起结束
+        os.setsid()
+
+    channel = _Channel(events)
+    requests = queue.Queue()
+    cancelled = set()
+    threading.Thread(target=_read_commands, args=(commands, requests, cancelled), daemon=True).start()
+
+    finder = None
+    with capture(LineSink(channel.log), LineSink(lambda line: channel.log(line, 'ERROR'))):
+        try:
+            while True:
+                command = requests.get()
+                if command[0] == 'Q':
+                    break
+                if finder is None:
+                    finder = _create_finder()
+                if command[0] == 'W':
+                    finder.browser_pool.prewarm()
+                elif command[0] == 'S':
+                    search_id, params = command[1], command[2]
+                    _run_search(finder, params, channel,
+                                lambda: search_id in cancelled or None in cancelled)
+        finally:
+            if finder is not None:
+                finder.browser_pool.close()
+                finder.close()
+    events.close()
+
+
+def _run_search(finder, params, channel, is_cancelled):
+    """
+    运行一个搜索,日志、进度和职位发回界面
+    Args:
+        finder: JobFinder
+        params: find_jobs的参数
+        channel: _Channel
+        is_cancelled: 返回是否已被停止的函数
+    """
+    batch = []
+
+    def flush():
+        if batch:
+            channel.send(('J', list(batch)))
+            batch.clear()
+
+    def check_cancelled():
+        if is_cancelled():
+            raise SearchCancelled()
+
+    def progress_callback(current, total, percent):
+        check_cancelled()
+        flush()
+        channel.send(('P', current, total, percent))
+
+    def job_callback(job):
+        check_cancelled()
+        batch.append((job['title'], job['url']))
+        if len(batch) >= JOB_BATCH_SIZE:
+            flush()
+
+    channel.log("===== 开始搜索 =====")
+    channel.log(f"目标网站: {params['url']}")
+    channel.log(f"关键字: {', '.join(params['keywords'])}")
+    if params.get('exclude_keywords'):
+        channel.log(f"排除关键字: {', '.join(params['exclude_keywords'])}", 'WARNING')
+    channel.log(f"输出文件: {params['output_file']}")
+
+    try:
+        jobs = finder.find_jobs(headless=True, progress_callback=progress_callback, job_callback=job_callback,
+                                **params)
+    except SearchCancelled:
+        flush()
+        channel.log("搜索已停止(本次结果未保存)", 'WARNING')
+        channel.send(('D', 'cancelled', "已停止"))
+        return
+    except Exception as e:
+        flush()
+        channel.log(f"✗ 错误: {e}", 'ERROR')
+        channel.log("=" * 50, 'ERROR')
+        channel.send(('D', 'failed', "搜索失败"))
+        return
+    flush()
+
+    channel.log("===== 搜索完成 =====", 'SUCCESS')
+    # 职位数量直接取自内存中的结果,不重新读取输出文件
+    job_count = len(jobs) if jobs else 0
+    output_file = params['output_file']
+    if os.path.exists(output_file):
+        channel.log(f"✓ 输出文件已生成: {output_file}", 'SUCCESS')
+        channel.log(f"✓ 文件大小: {_output_size(output_file)} 字节", 'SUCCESS')
+        channel.log(f"✓ 共保存 {job_count} 个职位", 'SUCCESS')
+    elif job_count:
+        channel.log(f"✗ 警告: 文件未生成: {output_file}", 'ERROR')
+    channel.send(('D', 'done', f"完成: {job_count} 个职位"))
+
+
+def _output_size(output_file):
+    """输出文件大小(Parquet输出为目录,统计目录下所有文件)"""
+    if os.path.isdir(output_file):
+        return sum(
+            os.path.getsize(os.path.join(output_file, name))
+            for name in os.listdir(output_file)
+        )
+    return os.path.getsize(output_file)
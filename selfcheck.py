@@ -0,0 +1,248 @@
+"""
+自检 - 不启动Chrome检查容易回归的抓取流程(使用fake_browser的假浏览器)
+
+检查项:
+- generic: 其他网站(非智联/猎聘)的多页抓取。职位链接只靠查询参数区分(view.php?id=N)时,
+           每页都应算作新职位,不能因为跨页去重把整页当成重复而提前停止翻页
+- scroll:  无限滚动的网站。滚动后之前加载的职位仍在页面上,新职位比例只按新加载的部分计算,
+           不能因此提前停止
+- dedup:   近似重复分组。同一批中后加入的职位与之前两个不相似的组都相似时两组合并,
+           之前职位的组ID也应更新为合并后的组
+- proxy:   代理池健康检查。在本机启动几个代替真实代理的HTTP代理(正常、返回拦截页、连不上),
+           检查页面使用不存在的域名,只有经过代理才能打开;应只有正常的出口留在轮换中
+
+用法:
+    python selfcheck.py              # 运行全部检查
+    python selfcheck.py generic
+    python selfcheck.py scroll
+    python selfcheck.py dedup
+    python selfcheck.py proxy
+"""
+
+import argparse
+import contextlib
+import http.server
+import io
+import os
+import socket
+import sys
+import tempfile
+import threading
+
+from fake_browser import FakeWebDriver
+
+
+def _fast_scraper_class():
+    """不等待页面加载的抓取器(假浏览器的页面不需要等待)"""
+    from web_scraper import JobScraper
+
+    class FastScraper(JobScraper):
+        def _wait_for_page_load(self, waited=0):
+            pass
+
+    return FastScraper
+
+
+def _generic_listing(pages, page_size):
+    """其他网站的列表页: 每页page_size个 view.php?id=N 职位"""
+    return [
+        [(f'https://jobs.example.com/view.php?id={page * page_size + i}&utm_source=list',
+          f'AI算法工程师 {page * page_size + i}')
+         for i in range(page_size)]
+        for page in range(pages)
+    ]
+
+
+def _crawl(listing, url, scroll=False):
+    """
+    用假浏览器抓取(默认的翻页预算,翻页方式保存在临时文件)
+    Returns:
+        tuple: (职位列表, 抓取日志)
+    """
+    from metrics import CrawlMetrics
+    from pagination import PaginationStrategies
+    from throttle import ThrottleRegistry
+
+    driver = FakeWebDriver(listing, url=url, scroll=scroll)
+    with tempfile.TemporaryDirectory() as tmp:
+        pagination = PaginationStrategies(os.path.join(tmp, 'pagination.db'))
+        scraper = _fast_scraper_class()(
+            driver=driver, throttles=ThrottleRegistry(rate=1000, max_rate=1000), metrics=CrawlMetrics(),
+            pagination=pagination,
+        )
+        log = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(log):
+                jobs = scraper.scrape_jobs(url, ['AI'])
+                scraper.close()
+        finally:
+            pagination.close()
+    return jobs, log.getvalue()
+
+
+def check_generic_crawl(pages=5, page_size=20):
+    """
+    其他网站的多页抓取: 每页page_size个 view.php?id=N 职位,应抓完全部页面
+    Returns:
+        list: 发现的问题,空列表表示通过
+    """
+    jobs, log = _crawl(_generic_listing(pages, page_size), 'https://jobs.example.com/list/p1')
+
+    problems = []
+    expected = pages * page_size
+    if len(jobs) != expected:
+        problems.append(f"找到 {len(jobs)} 个职位,应为 {expected} 个")
+    urls = {job['url'] for job in jobs}
+    if len(urls) != len(jobs):
+        problems.append(f"结果中有重复职位({len(jobs) - len(urls)} 个)")
+    if '后续页面大多重复' in log:
+        problems.append("不同的 ?id= 职位被当成重复,提前停止了翻页")
+    return problems
+
+
+def check_scroll_crawl(pages=12, page_size=20):
+    """
+    无限滚动的网站: 每次滚动多加载page_size个职位,之前的职位仍在页面上,应一直滚动到全部加载完
+    Returns:
+        list: 发现的问题,空列表表示通过
+    """
+    jobs, log = _crawl(_generic_listing(pages, page_size), 'https://jobs.example.com/feed', scroll=True)
+
+    problems = []
+    expected = pages * page_size
+    if len(jobs) != expected:
+        problems.append(f"找到 {len(jobs)} 个职位,应为 {expected} 个")
+    if '滚动加载' not in log:
+        problems.append("没有识别为无限滚动")
+    if '后续页面大多重复' in log:
+        problems.append("滚动后页面上仍保留的旧职位被当成重复,提前停止了滚动")
+    return problems
+
+
+def check_dedup_bridge():
+    """
+    A、B不相似,C与两者都相似: 三个职位应在同一组,每个都有2个重复
+    Returns:
+        list: 发现的问题,空列表表示通过
+    """
+    from dedup import cluster_jobs
+
+    titles = ['Python后端开发工程师', 'Java后端开发工程师(北京)', '后端开发工程师']
+    jobs = [{'title': title, 'url': f'https://jobs.example.com/view.php?id={i}'} for i, title in enumerate(titles)]
+    cluster_jobs(jobs)
+
+    problems = []
+    clusters = [job['cluster'] for job in jobs]
+    if len(set(clusters)) != 1:
+        problems.append(f"重复组为 {clusters},应合并为一组")
+    duplicates = [job['duplicates'] for job in jobs]
+    if duplicates != [2, 2, 2]:
+        problems.append(f"重复数为 {duplicates},应为 [2, 2, 2]")
+    return problems
+
+
+class _StandInProxy(http.server.BaseHTTPRequestHandler):
+    """代替真实代理的本地HTTP代理: 不转发,直接以server.page作为目标网站的页面"""
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        body = self.server.page.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_proxy(page):
+    """在本机随机端口启动代理替身"""
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _StandInProxy)
+    server.page = page
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _unused_port():
+    """一个当前没有监听的本机端口(模拟连不上的代理)"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def check_proxy_pool():
+    """
+    代理池健康检查: 正常的出口保留,返回拦截页和连不上的出口移出轮换
+    Returns:
+        list: 发现的问题,空列表表示通过
+    """
+    from proxy_pool import ProxyPool
+
+    # .invalid域名无法解析,请求没有经过代理时一定失败
+    check_url = 'http://jobs.selfcheck.invalid/'
+    good = _start_proxy('<html><title>职位列表</title>AI算法工程师</html>')
+    blocked = _start_proxy('<html><title>安全验证</title>访问过于频繁,请完成验证</html>')
+    good_url = f'http://127.0.0.1:{good.server_port}'
+    blocked_url = f'http://127.0.0.1:{blocked.server_port}'
+    dead_url = f'http://127.0.0.1:{_unused_port()}'
+
+    pool = ProxyPool([good_url, blocked_url, dead_url], check_url=check_url, check_timeout=5)
+    log = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log):
+            healthy = pool.check_all()
+            assigned = pool.assign('selfcheck')
+    finally:
+        pool.close()
+        for server in (good, blocked):
+            server.shutdown()
+            server.server_close()
+
+    problems = []
+    if pool.healthy_urls() != [good_url]:
+        problems.append(f"可用出口为 {pool.healthy_urls()},应只有 {good_url}")
+    if healthy != 1:
+        problems.append(f"check_all返回 {healthy} 个可用出口,应为1个")
+    if assigned.url != good_url:
+        problems.append(f"分配到出口 {assigned.name},应为正常的出口")
+    if not any(check_url.rstrip('/') in path for path in good.requests):
+        problems.append(f"健康检查没有经过代理访问 {check_url}(代理收到: {good.requests})")
+    if not blocked.requests:
+        problems.append("返回拦截页的代理没有收到健康检查请求")
+    return problems
+
+
+CHECKS = {
+    'generic': check_generic_crawl,
+    'scroll': check_scroll_crawl,
+    'dedup': check_dedup_bridge,
+    'proxy': check_proxy_pool,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="不启动Chrome检查抓取流程")
+    parser.add_argument("checks", nargs="*", help=f"要运行的检查({', '.join(CHECKS)}),默认全部")
+    args = parser.parse_args()
+    unknown = [name for name in args.checks if name not in CHECKS]
+    if unknown:
+        parser.error(f"未知的检查: {', '.join(unknown)}")
+
+    failed = False
+    for name in args.checks or list(CHECKS):
+        problems = CHECKS[name]()
+        if problems:
+            failed = True
+            print(f"✗ {name}")
+            for problem in problems:
+                print(f"    {problem}")
+        else:
+            print(f"✓ {name}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+结果输出模块 - 把职位写入文件或数据库
+
+支持的格式(按输出文件扩展名选择):
+- .csv: 两列CSV(职位标题,职位链接),Excel可直接打开(按相关度排序时行的顺序即排名)
+- .jsonl: 每行一个JSON对象
+- .db/.sqlite/.sqlite3: SQLite数据库,批量事务插入
+- .parquet: Parquet数据集目录,每次运行追加一个分片文件(需要pyarrow)
+
+追加模式下只写入新增的职位,不会重新读取或重写已有数据。
+"""
+
+import csv
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+
+class ResultSink:
+    """结果输出基类"""
+
+    # 对应的文件扩展名
+    extensions = ()
+
+    def __init__(self, path, append=False):
+        """
+        Args:
+            path: 输出路径
+            append: 是否追加到已有数据(否则覆盖)
+        """
+        self.path = path
+        self.append = append
+        self.count = 0
+        # 同一次运行写入的职位使用相同的抓取时间
+        self.scraped_at = datetime.now().isoformat(timespec='seconds')
+
+        dir_path = os.path.dirname(path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+
+    def write(self, jobs):
+        """写入一批职位"""
+        jobs = list(jobs)
+        if jobs:
+            self._write(jobs)
+            self.count += len(jobs)
+
+    def _write(self, jobs):
+        raise NotImplementedError
+
+    def close(self):
+        """完成写入"""
+        pass
+
+    def _record(self, job):
+        """职位转换为输出记录(cluster为近似重复组ID,score为相关度,未计算时为None)"""
+        return {
+            'title': job.get('title', '未知'),
+            'url': job.get('url', ''),
+            'scraped_at': self.scraped_at,
+            'cluster': job.get('cluster'),
+            'score': job.get('score'),
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CsvSink(ResultSink):
+    """CSV输出(第一列=职位标题,第二列=职位链接)"""
+
+    extensions = ('.csv',)
+
+    def __init__(self, path, append=False):
+        super().__init__(path, append)
+        write_header = not (append and os.path.exists(path) and os.path.getsize(path) > 0)
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8-sig', newline='')
+        self._writer = csv.writer(self._file)
+        if write_header:
+            self._writer.writerow(['职位标题', '职位链接'])
+
+    def _write(self, jobs):
+        self._writer.writerows([job.get('title', '未知'), job.get('url', '')] for job in jobs)
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlSink(ResultSink):
+    """JSON Lines输出(每行一个职位)"""
+
+    extensions = ('.jsonl', '.ndjson')
+
+    def __init__(self, path, append=False):
+        super().__init__(path, append)
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def _write(self, jobs):
+        self._file.writelines(
+            json.dumps(self._record(job), ensure_ascii=False) + '\n' for job in jobs
+        )
+
+    def close(self):
+        self._file.close()
+
+
+class SqliteSink(ResultSink):
+    """SQLite输出(jobs表,每批职位一个事务)"""
+
+    extensions = ('.db', '.sqlite', '.sqlite3')
+
+    def __init__(self, path, append=False):
+        super().__init__(path, append)
+        self._conn = sqlite3.connect(path)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id INTEGER PRIMARY KEY,"
+                " title TEXT NOT NULL,"
+                " url TEXT NOT NULL,"
+                " scraped_at TEXT NOT NULL,"
+                " cluster INTEGER,"
+                " score REAL)"
+            )
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+            if 'cluster' not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN cluster INTEGER")
+            if 'score' not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN score REAL")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_url ON jobs (url)")
+            if not append:
+                self._conn.execute("DELETE FROM jobs")
+
+    def _write(self, jobs):
+        rows = [(r['title'], r['url'], r['scraped_at'], r['cluster'], r['score']) for r in map(self._record, jobs)]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO jobs (title, url, scraped_at, cluster, score) VALUES (?, ?, ?, ?, ?)", rows
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+class ParquetSink(ResultSink):
+    """Parquet数据集输出(目录,每次运行一个分片文件,按行组批量写入)"""
+
+    extensions = ('.parquet',)
+
+    # 每个行组的职位数
+    row_group_size = 10000
+
+    def __init__(self, path, append=False):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("输出Parquet需要安装pyarrow: pip install pyarrow")
+
+        super().__init__(path, append)
+        self._pa = pa
+        self._pq = pq
+        self._schema = pa.schema([
+            ('title', pa.string()),
+            ('url', pa.string()),
+            ('scraped_at', pa.string()),
+            ('cluster', pa.int64()),
+            ('score', pa.float64()),
+        ])
+
+        if os.path.isfile(path):
+            raise ValueError(f"Parquet输出应为目录,但 {path} 是文件")
+        os.makedirs(path, exist_ok=True)
+        if not append:
+            for name in os.listdir(path):
+                if name.endswith('.parquet'):
+                    os.remove(os.path.join(path, name))
+
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        self._part_path = os.path.join(path, f"part-{stamp}.parquet")
+        self._writer = None
+        self._buffer = []
+
+    def _write(self, jobs):
+        self._buffer.extend(self._record(job) for job in jobs)
+        if len(self._buffer) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        """缓冲的职位写成一个行组"""
+        if not self._buffer:
+            return
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._part_path, self._schema)
+        table = self._pa.Table.from_pylist(self._buffer, schema=self._schema)
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+        self._buffer = []
+
+    def close(self):
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+
+
+SINKS = [CsvSink, JsonlSink, SqliteSink, ParquetSink]
+
+
+def output_path(path):
+    """
+    规范化输出路径: 没有扩展名时默认输出CSV
+    Returns:
+        str: 实际输出路径
+    """
+    if not os.path.splitext(path.rstrip('/\\'))[1]:
+        path = path + '.csv'
+        print(f"输出文件没有扩展名,使用CSV格式: {path}")
+    return path
+
+
+def sink_class(path):
+    """根据扩展名选择输出类型"""
+    ext = os.path.splitext(path.rstrip('/\\'))[1].lower()
+    for cls in SINKS:
+        if ext in cls.extensions:
+            return cls
+    supported = ', '.join(ext for cls in SINKS for ext in cls.extensions)
+    raise ValueError(f"不支持的输出格式: {ext} (支持: {supported})")
+
+
+def open_sink(path, append=False):
+    """
+    打开输出
+    Args:
+        path: 输出路径,扩展名决定格式
+        append: 是否追加到已有数据
+    Returns:
+        ResultSink
+    """
+    return sink_class(path)(path, append=append)
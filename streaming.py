@@ -0,0 +1,76 @@
+"""
+流式抓取工具 - 在异步代码中使用同步的职位生成器
+
+浏览器操作是阻塞的,在后台线程中运行生成器,职位通过有界队列交给事件循环:
+- 队列满时后台线程等待(背压),不会无限缓冲
+- 调用方提前停止迭代时通知后台线程停止,并关闭生成器(浏览器停在当前页)
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+
+
+# 生成器结束/出错的标记
+_DONE = object()
+_ERROR = object()
+
+
+async def iterate_in_thread(iterable, queue_size=100):
+    """
+    在后台线程中迭代同步生成器,异步地逐个产出元素
+    Args:
+        iterable: 同步可迭代对象(如JobScraper.iter_jobs())
+        queue_size: 最多缓冲的元素数
+    Yields:
+        生成器产出的元素
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def put(item):
+        """放入队列,队列满时等待;调用方已停止时返回False"""
+        try:
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        except RuntimeError:
+            # 事件循环已关闭
+            return False
+        while True:
+            try:
+                future.result(timeout=0.5)
+                return True
+            except concurrent.futures.TimeoutError:
+                if stop.is_set():
+                    future.cancel()
+                    return False
+
+    def produce():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if stop.is_set() or not put((item, None)):
+                    return
+            put((_DONE, None))
+        except Exception as e:
+            put((_ERROR, e))
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close:
+                close()
+
+    thread = threading.Thread(target=produce, name="stream-producer", daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is _DONE:
+                return
+            if item is _ERROR:
+                raise error
+            yield item
+    finally:
+        stop.set()
+        # 等待后台线程关闭生成器,避免浏览器仍在被使用
+        await loop.run_in_executor(None, thread.join)
@@ -0,0 +1,186 @@
+"""
+按域名自适应限速 - AIMD(加性增、乘性减)
+
+功能:
+- 每个域名独立的并发上限和请求速率(使用代理出口时按 域名+出口 区分)
+- 页面正常时缓慢提高并发和速率,遇到验证码/拦截页时成倍降低
+- 识别拦截页(验证码、访问过于频繁等)
+- 导出当前限速状态,便于监控
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from url_tools import domain_of
+
+
+# 拦截页特征(页面标题或正文包含即视为被拦截)
+BLOCK_MARKERS = [
+    '验证码', '安全验证', '滑动验证', '人机验证', '请完成验证', '访问过于频繁',
+    '访问异常', '异常访问', '操作频繁', '请稍后再试',
+    'captcha', 'verify you are human', 'access denied', 'too many requests',
+    # 浏览器通过代理出口连接失败时的错误页
+    'err_proxy_connection_failed', 'err_tunnel_connection_failed', 'err_socks_connection_failed',
+]
+
+
+def detect_block(page_text):
+    """
+    判断页面是否为拦截页
+    Args:
+        page_text: 页面标题和正文片段
+    Returns:
+        str: 命中的拦截特征,未命中返回None
+    """
+    if not page_text:
+        return None
+    text = page_text.lower()
+    for marker in BLOCK_MARKERS:
+        if marker in text:
+            return marker
+    return None
+
+
+class DomainThrottle:
+    """单个域名的限速器"""
+
+    def __init__(self, domain, concurrency=2, min_concurrency=1, max_concurrency=8,
+                 rate=0.5, min_rate=0.02, max_rate=2.0,
+                 concurrency_step=0.1, rate_step=0.02, backoff=0.5):
+        """
+        Args:
+            domain: 域名
+            concurrency: 初始并发上限(同时处理的页面数)
+            min_concurrency/max_concurrency: 并发上限范围
+            rate: 初始请求速率(页/秒)
+            min_rate/max_rate: 请求速率范围
+            concurrency_step: 每个正常页面增加的并发上限
+            rate_step: 每个正常页面增加的速率
+            backoff: 遇到拦截时的乘性降低系数
+        """
+        self.domain = domain
+        self.concurrency = float(concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.rate = float(rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.concurrency_step = concurrency_step
+        self.rate_step = rate_step
+        self.backoff = backoff
+
+        self.in_flight = 0
+        self.successes = 0
+        self.blocks = 0
+        self._next_allowed = 0.0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self):
+        """当前并发上限(整数)"""
+        return max(self.min_concurrency, int(self.concurrency))
+
+    @property
+    def delay(self):
+        """当前两次请求之间的最小间隔(秒)"""
+        return 1.0 / self.rate
+
+    def acquire(self):
+        """等待并发名额和请求间隔"""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self.in_flight < self.limit:
+                    wait = self._next_allowed - now
+                    if wait <= 0:
+                        self.in_flight += 1
+                        self._next_allowed = now + self.delay
+                        return
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+
+    def release(self):
+        """归还并发名额"""
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """占用一个并发名额: with throttle.slot(): ..."""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def on_success(self):
+        """页面正常: 加性提高并发和速率"""
+        with self._cond:
+            self.successes += 1
+            self.concurrency = min(self.max_concurrency, self.concurrency + self.concurrency_step)
+            self.rate = min(self.max_rate, self.rate + self.rate_step)
+            self._cond.notify_all()
+
+    def on_block(self):
+        """遇到拦截: 乘性降低并发和速率,并推迟下一次请求"""
+        with self._cond:
+            self.blocks += 1
+            self.concurrency = max(self.min_concurrency, self.concurrency * self.backoff)
+            self.rate = max(self.min_rate, self.rate * self.backoff)
+            self._next_allowed = max(self._next_allowed, time.monotonic() + self.delay)
+        print(f"⚠ {self.domain} 触发限速: 并发上限 {self.limit}, 请求间隔 {self.delay:.1f} 秒")
+
+    def metrics(self):
+        """当前限速状态"""
+        with self._cond:
+            return {
+                'concurrency_limit': self.limit,
+                'rate': round(self.rate, 4),
+                'delay': round(self.delay, 2),
+                'in_flight': self.in_flight,
+                'successes': self.successes,
+                'blocks': self.blocks,
+            }
+
+
+class ThrottleRegistry:
+    """按域名管理限速器 - 同一进程内的所有抓取器共享"""
+
+    def __init__(self, **defaults):
+        """
+        Args:
+            defaults: 新建DomainThrottle时使用的参数
+        """
+        self.defaults = defaults
+        self._throttles = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, route=None):
+        """
+        获取URL所属域名的限速器
+        Args:
+            url: 页面URL
+            route: 代理出口名称,不同出口各自限速(网站按IP限制频率),None表示直连
+        """
+        domain = domain_of(url)
+        if route:
+            domain = f"{domain}@{route}"
+        with self._lock:
+            throttle = self._throttles.get(domain)
+            if throttle is None:
+                throttle = DomainThrottle(domain, **self.defaults)
+                self._throttles[domain] = throttle
+            return throttle
+
+    def metrics(self):
+        """所有域名的限速状态 {域名: {...}}"""
+        with self._lock:
+            throttles = list(self._throttles.values())
+        return {t.domain: t.metrics() for t in throttles}
+
+
+# 进程内共享的默认限速器
+default_registry = ThrottleRegistry()
@@ -0,0 +1,100 @@
+"""
+URL工具函数
+
+功能:
+- 规范化招聘列表页URL,用于合并相同搜索、缓存键等
+- 从职位详情页URL中提取职位ID和公司ID
+"""
+
+import re
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+# 智联: /jobdetail/CCL1295664340J40783527216.htm (CC...为公司, J...为职位)
+ZHAOPIN_JOB_RE = re.compile(r'zhaopin\.com/jobdetail/(CC[A-Z]?\d+)(J\d+)', re.I)
+# 猎聘: /job/1978747195.shtml 或 /a/12345.shtml
+LIEPIN_JOB_RE = re.compile(r'liepin\.com/(job|a)/(\d+)\.shtml', re.I)
+# 列表页给职位链接加的跟踪参数,不影响打开的是哪个职位
+TRACKING_PARAMS = {'refcode', 'srccode', 'preactionid'}
+TRACKING_PREFIXES = ('utm_',)
+
+
+def canonical_url(url):
+    """
+    规范化URL: 协议和域名转小写,去掉片段和末尾斜杠,查询参数排序
+    Args:
+        url: 原始URL
+    Returns:
+        str: 规范化后的URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or 'https').lower()
+    netloc = parts.netloc.lower()
+    path = parts.path.rstrip('/') or '/'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+def domain_of(url):
+    """
+    提取URL的域名(去掉www.前缀和端口)
+    Args:
+        url: 原始URL
+    Returns:
+        str: 域名,如 zhaopin.com
+    """
+    netloc = urlsplit(url).netloc.lower()
+    netloc = netloc.split('@')[-1].split(':')[0]
+    if netloc.startswith('www.'):
+        netloc = netloc[4:]
+    return netloc
+
+
+def job_id(url):
+    """
+    提取职位的规范ID(去掉refcode等跟踪参数后仍能识别同一职位)
+    Args:
+        url: 职位详情页URL
+    Returns:
+        str: 如 zhaopin:CCL1295664340J40783527216, 无法识别时返回去掉跟踪参数后的规范化URL
+            (view.php?id=1 和 view.php?id=2 是不同的职位)
+    """
+    match = ZHAOPIN_JOB_RE.search(url)
+    if match:
+        return f"zhaopin:{match.group(1).upper()}{match.group(2).upper()}"
+
+    match = LIEPIN_JOB_RE.search(url)
+    if match:
+        return f"liepin:{match.group(1)}/{match.group(2)}"
+
+    return canonical_url(strip_tracking(url))
+
+
+def strip_tracking(url):
+    """
+    去掉URL中的跟踪参数(refcode、srccode、preactionid、utm_*)
+    Args:
+        url: 原始URL
+    Returns:
+        str: 去掉跟踪参数后的URL,其余查询参数保持原顺序
+    """
+    parts = urlsplit(url.strip())
+    if not parts.query:
+        return url.strip()
+    query = [
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PREFIXES)
+    ]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), parts.fragment))
+
+
+def company_id(url):
+    """
+    从职位URL中提取公司ID(目前只有智联的URL包含公司信息)
+    Returns:
+        str: 如 zhaopin:CCL1295664340, 无法识别返回None
+    """
+    match = ZHAOPIN_JOB_RE.search(url)
+    if match:
+        return f"zhaopin:{match.group(1).upper()}"
+    return None
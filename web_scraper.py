@@ -4,7 +4,7 @@
 功能:
 - 支持多页抓取
 - 自动识别招聘网站类型(智联、猎聘等)
-- 智能翻页(直接修改URL参数)
+- 智能翻页(直接修改URL参数),其他网站自动识别翻页方式并按域名记住
 - 职位过滤和去重
 """
 
@@ -14,22 +14,103 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException
+import copy
+import threading
 import time
 import os
 import re
+from urllib.parse import urlsplit
+
+from job_filter import ScrapeResult, JobCounter, JobFilter, match_keywords, page_candidates
+from streaming import iterate_in_thread
+from browser_governor import BrowserGovernor
+from fingerprints import listing_fingerprint
+from metrics import default_metrics
+from page_budget import PageBudget
+from pagination import click_next, describe, detect_strategy, next_page_url
+from throttle import default_registry, detect_block
+from url_tools import domain_of, job_id
+
+
+# 浏览器会话失效时的错误信息特征
+DEAD_SESSION_MARKERS = [
+    'invalid session id', 'no such window', 'chrome not reachable',
+    'disconnected', 'session deleted', 'target window already closed',
+]
 
 
 class JobScraper:
     """职位抓取器 - 自动抓取招聘网站职位信息"""
 
-    def __init__(self, headless=True):
+    # 疑似拦截页的最大重试次数
+    max_block_retries = 3
+    # 单页出错的最大重试次数
+    max_page_retries = 2
+    # 出错重试的初始等待时间(秒),每次重试翻倍
+    retry_backoff = 2.0
+    # 单次抓取允许的出错总次数,超过后停止抓取并返回已有结果
+    error_budget = 8
+    # 打开页面后等待多久提取首屏链接,与上次的指纹比较(秒)
+    quick_check_wait = 2
+    # 连续多少页与上次相同时,其余页面直接使用缓存的结果
+    max_unchanged_pages = 2
+
+    def __init__(self, headless=True, throttles=None, page_cache=None, detail_fetcher=None, page_budget=None,
+                 governor=None, profiles=None, profile_site=None, metrics=None, driver=None, fingerprints=None,
+                 pagination=None, proxies=None, proxy_key=None):
         """
         初始化Selenium WebDriver
         Args:
             headless: 是否使用无头模式(不显示浏览器窗口)
+            throttles: 按域名限速的ThrottleRegistry,默认使用进程内共享的实例
+            page_cache: PageCache,抓取到的列表页链接写入缓存,None表示不缓存
+            detail_fetcher: DetailFetcher,提供时抓取职位详情,按标题和职位描述一起匹配关键字
+            page_budget: PageBudget,决定翻多少页(每次抓取使用它的副本),默认使用PageBudget()的默认设置
+            governor: BrowserGovernor,抓取页数或内存超过上限时更换浏览器,默认使用BrowserGovernor()的默认设置
+            profiles: ProfileManager,提供时使用持久化的浏览器配置目录(保留Cookie和磁盘缓存)
+            profile_site: 配置目录对应的网站(如zhaopin.com),None表示共用默认配置
+            metrics: CrawlMetrics,记录抓取速度、加载时间、错误等监控指标,默认使用进程内共享的指标
+            driver: 已启动的WebDriver(如fake_browser.FakeWebDriver),None表示启动Chrome
+            fingerprints: FingerprintStore,与page_cache一起提供时,首屏内容与上次相同的页面跳过滚动加载、
+                          直接使用缓存的链接,连续多页未变化时其余页面也使用缓存
+            pagination: PaginationStrategies,保存未知网站学到的翻页方式,之后优先使用;None表示每次重新识别
+            proxies: ProxyPool,浏览器通过分配到的代理出口访问,出口多次遇到拦截页时换用其他出口
+            proxy_key: 粘性分配出口的工作者标识(如网格抓取的进程编号),默认每个抓取器单独分配
         """
         self.driver = None
         self.wait = None
+        self.headless = headless
+        self.throttles = throttles or default_registry
+        self.page_cache = page_cache
+        self.detail_fetcher = detail_fetcher
+        self.page_budget = page_budget or PageBudget()
+        self.governor = governor or BrowserGovernor()
+        self.restarts = 0
+        self.recycles = 0
+        self.profiles = profiles
+        self.profile_site = profile_site
+        self.metrics = metrics or default_metrics
+        self.fingerprints = fingerprints
+        self.pagination = pagination
+        self.proxies = proxies
+        self.proxy_key = proxy_key if proxy_key is not None else f"scraper-{id(self)}"
+        # 上一次翻页使用的学到的翻页方式所属域名(下一页抓取后记录是否成功)
+        self._pagination_domain = None
+        # 本页首屏的新指纹 (页面URL, 指纹, 职位ID数),本页链接写入缓存后才保存
+        self._pending_fingerprint = None
+        # 上一次翻页的方式: 'url'(按URL打开下一页)、'click'、'scroll',失败时为None
+        self._pagination_type = None
+        # 浏览器 -> 使用的配置目录、代理出口
+        self._driver_profiles = {}
+        self._driver_proxies = {}
+        # 正在后台关闭的旧浏览器
+        self._retiring = []
+
+        if driver is not None:
+            self.driver = driver
+            self.wait = WebDriverWait(driver, 10)
+            return
 
         try:
             self._init_driver(headless)
@@ -41,24 +122,47 @@ class JobScraper:
 
     def _init_driver(self, headless):
         """初始化ChromeDriver"""
-        chrome_options = self._get_chrome_options(headless)
+        self.driver = self._create_driver(headless)
+        self.wait = WebDriverWait(self.driver, 10)
+
+    def _create_driver(self, headless):
+        """
+        启动一个新的浏览器(不替换当前浏览器,可在后台线程中调用)
+        Returns:
+            WebDriver
+        """
+        # 每个浏览器独占一个配置目录(更换浏览器时新旧两个同时运行)
+        profile_dir = self.profiles.acquire(self.profile_site) if self.profiles else None
+        proxy = self._assign_proxy()
+        chrome_options = self._get_chrome_options(headless, profile_dir, proxy)
         print("正在初始化ChromeDriver...")
 
         # 尝试多种方式初始化ChromeDriver
-        if self._try_system_driver(chrome_options):
-            print("✓ 使用系统ChromeDriver")
-        elif self._try_webdriver_manager(chrome_options):
-            print("✓ 使用webdriver-manager")
-        elif self._try_local_driver(chrome_options):
-            print("✓ 使用本地ChromeDriver")
-        else:
-            raise Exception("所有ChromeDriver初始化方法都失败")
-
-        self.wait = WebDriverWait(self.driver, 10)
-
-    def _get_chrome_options(self, headless):
+        for try_driver, label in ((self._try_system_driver, "系统ChromeDriver"),
+                                  (self._try_webdriver_manager, "webdriver-manager"),
+                                  (self._try_local_driver, "本地ChromeDriver")):
+            driver = try_driver(chrome_options)
+            if driver:
+                print(f"✓ 使用{label}")
+                if profile_dir:
+                    self._driver_profiles[id(driver)] = profile_dir
+                if proxy:
+                    self._driver_proxies[id(driver)] = proxy
+                return driver
+
+        if profile_dir:
+            self.profiles.release(profile_dir)
+        raise Exception("所有ChromeDriver初始化方法都失败")
+
+    def _get_chrome_options(self, headless, profile_dir=None, proxy=None):
         """获取Chrome配置选项"""
         options = Options()
+        if profile_dir:
+            for argument in self.profiles.chrome_arguments(profile_dir):
+                options.add_argument(argument)
+        if proxy:
+            for argument in self.proxies.chrome_arguments(proxy):
+                options.add_argument(argument)
         if headless:
             options.add_argument('--headless=new')
         options.add_argument('--no-sandbox')
@@ -76,20 +180,18 @@ class JobScraper:
     def _try_system_driver(self, options):
         """尝试使用系统ChromeDriver"""
         try:
-            self.driver = webdriver.Chrome(options=options)
-            return True
+            return webdriver.Chrome(options=options)
         except:
-            return False
+            return None
 
     def _try_webdriver_manager(self, options):
         """尝试使用webdriver-manager自动下载"""
         try:
             from webdriver_manager.chrome import ChromeDriverManager
             service = Service(ChromeDriverManager(driver_version="latest").install())
-            self.driver = webdriver.Chrome(service=service, options=options)
-            return True
+            return webdriver.Chrome(service=service, options=options)
         except:
-            return False
+            return None
 
     def _try_local_driver(self, options):
         """尝试使用项目目录中的ChromeDriver"""
@@ -97,11 +199,10 @@ class JobScraper:
         if os.path.exists(driver_path):
             try:
                 service = Service(driver_path)
-                self.driver = webdriver.Chrome(service=service, options=options)
-                return True
+                return webdriver.Chrome(service=service, options=options)
             except:
                 pass
-        return False
+        return None
 
     def _print_install_guide(self):
         """打印ChromeDriver安装指南"""
@@ -122,69 +223,486 @@ class JobScraper:
             progress_callback: 进度回调函数 callback(current, total, percent)
             exclude_keywords: 排除关键字列表
         Returns:
-            list: 职位信息列表,包含title和url
+            ScrapeResult: 职位信息列表,包含title和url;failed_pages记录失败的页面
         """
-        jobs = []
-        keyword_set = self._normalize_keywords(keywords)
-        exclude_set = self._normalize_keywords(exclude_keywords) if exclude_keywords else set()
-        page_num = 1
-        max_pages = 10
+        result = ScrapeResult()
+        result.extend(self.iter_jobs(url, keywords, max_jobs, progress_callback, exclude_keywords,
+                                     failed_pages=result.failed_pages))
+        return result
 
-        if exclude_set:
-            print(f"已设置排除关键字: {', '.join(exclude_set)}")
+    def scrape_profiles(self, url, filters, max_jobs=None, progress_callback=None):
+        """
+        一次抓取,同时按多组关键字过滤
+        Args:
+            url: 目标网站URL
+            filters: JobFilter列表,每个过滤器的name应唯一
+            max_jobs: 每组最大职位数(JobFilter.max_jobs优先),None表示不限制
+            progress_callback: 进度回调函数 callback(current, total, percent),按所有组合计
+        Returns:
+            dict: {过滤器名称: ScrapeResult}
+        """
+        # 各过滤器共用同一份失败页面记录
+        results = {job_filter.name: ScrapeResult() for job_filter in filters}
+        failed_pages = next(iter(results.values())).failed_pages if results else []
+        for result in results.values():
+            result.failed_pages = failed_pages
+
+        for name, job in self.iter_profiles(url, filters, max_jobs, progress_callback, failed_pages):
+            results[name].append(job)
+        return results
+
+    def iter_jobs(self, url, keywords, max_jobs=None, progress_callback=None, exclude_keywords=None,
+                  failed_pages=None):
+        """
+        逐个产出匹配的职位(找到即产出,不在内存中累积)
 
-        target_count = max_jobs if max_jobs else 100
+        调用方不取下一个职位时抓取暂停;提前停止迭代即停止抓取。
+        Args:
+            url: 目标网站URL
+            keywords: 匹配关键字列表(只要包含任一即匹配)
+            max_jobs: 最大抓取职位数,None表示不限制
+            progress_callback: 进度回调函数 callback(current, total, percent)
+            exclude_keywords: 排除关键字列表
+            failed_pages: 失败页面记录追加到该列表
+        Yields:
+            Job: 职位记录(可按字典访问 job['title']、job['url'])
+        """
+        job_filter = JobFilter(keywords, exclude_keywords)
+        for _, job in self._iter_crawl(url, [job_filter], max_jobs, progress_callback, failed_pages):
+            yield job
+
+    def iter_profiles(self, url, filters, max_jobs=None, progress_callback=None, failed_pages=None):
+        """
+        一次抓取按多组关键字过滤,逐个产出匹配的职位
+        Yields:
+            tuple: (过滤器名称, 职位信息)
+        """
+        for index, job in self._iter_crawl(url, filters, max_jobs, progress_callback, failed_pages):
+            yield filters[index].name, job
+
+    async def aiter_jobs(self, url, keywords, max_jobs=None, progress_callback=None, exclude_keywords=None,
+                         failed_pages=None, queue_size=100):
+        """
+        iter_jobs的异步版本: 浏览器在后台线程中抓取,通过有界队列交给事件循环
 
-        # 多页抓取循环
-        while page_num <= max_pages:
+        队列满时抓取线程等待(背压);提前停止迭代即停止抓取。
+        Args:
+            queue_size: 最多缓冲的职位数
+        """
+        jobs = self.iter_jobs(url, keywords, max_jobs, progress_callback, exclude_keywords, failed_pages)
+        async for job in iterate_in_thread(jobs, queue_size):
+            yield job
+
+    def _iter_crawl(self, url, filters, max_jobs, progress_callback, failed_pages=None):
+        """
+        多页抓取循环: 每页只提取一次链接,依次交给所有过滤器
+        Yields:
+            tuple: (过滤器序号, 职位信息)
+        """
+        # 只统计数量,职位交给调用方
+        results = [JobCounter() for _ in filters]
+        if failed_pages is None:
+            failed_pages = []
+
+        limits = [job_filter.max_jobs or max_jobs for job_filter in filters]
+
+        throttle = self.throttles.get(url, self._proxy_route())
+        metrics = self.metrics
+        site = domain_of(url)
+        # self.page_budget只是设置: 查找器把同一个预算交给多个浏览器同时抓取,每次抓取各用一份副本
+        budget = copy.copy(self.page_budget)
+        budget.reset()
+        # 已出现过的职位ID(跨页去重,翻页重复的职位不再交给过滤器)
+        seen_ids = set()
+        page_url = url
+        page_num = 1
+        block_retries = 0
+        suspect_empty = False
+        page_retries = 0
+        errors = 0
+        unchanged_pages = 0
+        # 无限滚动时,滚动前已加载的候选职位数(页面保留之前的职位,只有新加载的部分算作本页)
+        scrolled_from = None
+        self._pagination_domain = None
+        self._pending_fingerprint = None
+
+        for job_filter in filters:
+            if job_filter.exclude_set:
+                label = f"[{job_filter.name}] " if job_filter.name else ""
+                print(f"{label}已设置排除关键字: {', '.join(job_filter.exclude_set)}")
+
+        # 单个过滤器且有最大职位数时逐条报告进度,否则每页汇总一次
+        per_job_progress = len(filters) == 1 and limits[0]
+        filter_callback = progress_callback if per_job_progress else None
+
+        # 多页抓取循环(页数由翻页预算决定)
+        while page_num <= budget.max_pages:
             # 检查是否达到最大数量
-            if max_jobs and len(jobs) >= max_jobs:
-                print(f"\n已达到最大职位数: {max_jobs}")
+            if self._all_limits_reached(results, limits):
+                print(f"\n已达到最大职位数: {max_jobs or max(limits)}")
                 break
 
             print(f"\n===== 正在抓取第 {page_num} 页 =====")
 
-            # 访问页面
-            self._visit_page(url, page_num)
+            try:
+                with throttle.slot():
+                    # 访问页面
+                    self._visit_page(page_url, page_num, reload=block_retries > 0 or page_retries > 0)
+
+                    # 首屏与上次相同时直接使用上次的链接
+                    links = self._unchanged_page_links(page_url)
+                    page_unchanged = links is not None
+                    if page_unchanged:
+                        candidates = page_candidates(links)
+                    else:
+                        # 等待页面加载(比较指纹时已经等待过的时间不再重复等待)
+                        self._wait_for_page_load(
+                            self.quick_check_wait if self.fingerprints is not None and self.page_cache is not None else 0
+                        )
+
+                        # 抓取当前页职位
+                        links, candidates = self._scrape_current_page()
+            except Exception as e:
+                # 单页出错不影响已抓取的结果
+                errors += 1
+                metrics.inc('searchjob_errors_total', site=site, type=type(e).__name__)
+                error = self._format_error(e)
+                print(f"✗ 第 {page_num} 页出错: {error}")
+
+                if errors >= self.error_budget:
+                    print(f"出错次数已达上限({self.error_budget}),停止抓取,保留已找到的职位")
+                    failed_pages.append({'page': page_num, 'url': page_url, 'error': error})
+                    break
+
+                if not self._recover_driver(e):
+                    failed_pages.append({'page': page_num, 'url': page_url, 'error': error})
+                    break
+
+                if page_retries < self.max_page_retries:
+                    delay = self.retry_backoff * (2 ** page_retries)
+                    page_retries += 1
+                    print(f"{delay:.0f} 秒后重试第 {page_num} 页 ({page_retries}/{self.max_page_retries})")
+                    time.sleep(delay)
+                    continue
 
-            # 等待页面加载
-            self._wait_for_page_load()
+                # 重试用尽: 记录失败页面,尽量跳到下一页继续
+                failed_pages.append({'page': page_num, 'url': page_url, 'error': error})
+                page_retries = 0
+                page_url = self._go_to_next_page(page_url, allow_click=False, page_num=page_num)
+                if not page_url:
+                    break
+                page_num += 1
+                continue
 
-            # 抓取当前页职位
-            page_jobs = self._scrape_current_page(keyword_set, exclude_set, target_count, jobs, progress_callback)
+            page_retries = 0
+            metrics.inc('searchjob_links_scanned_total', len(links), site=site)
+
+            # 跨页去重后交给所有过滤器,匹配的立即产出
+            matches, new_ids = self._filter_page(candidates, filters, results, limits, filter_callback, seen_ids,
+                                                 page_url)
+            new_candidates = list(new_ids.values())
+            page_jobs = []
+            for index, job in matches:
+                page_jobs.append(job)
+                yield index, job
+
+            print(f"本页找到 {len(page_jobs)} 个匹配职位"
+                  f"(新职位 {len(new_candidates)}/{len(candidates)})")
+
+            # 区分拦截页/异常空页与真正的最后一页
+            block_reason = self._check_blocked(candidates)
+            if block_reason == 'blocked':
+                metrics.inc('searchjob_errors_total', site=site, type='blocked')
+                throttle.on_block()
+                if self._on_proxy_block():
+                    if self.driver is None:
+                        print("没有可用的浏览器,停止抓取")
+                        break
+                    # 换了出口: 新出口有自己的限速器
+                    throttle = self.throttles.get(url, self._proxy_route())
+                if block_retries < self.max_block_retries:
+                    block_retries += 1
+                    print(f"疑似被拦截,降速后重试本页 ({block_retries}/{self.max_block_retries})")
+                    continue
+                print("多次重试后仍被拦截,停止抓取")
+                break
+            if block_reason == 'empty' and not suspect_empty:
+                # 没有任何职位链接: 可能是最后一页,也可能是异常空页,重试一次确认
+                suspect_empty = True
+                block_retries += 1
+                print("本页没有职位链接,稍后重试一次确认")
+                continue
 
-            print(f"本页找到 {len(page_jobs)} 个匹配职位")
+            if suspect_empty and candidates:
+                # 重试后有职位,说明之前是异常空页
+                metrics.inc('searchjob_errors_total', site=site, type='empty_page')
+                throttle.on_block()
+            elif candidates:
+                # 有候选职位就是正常页面(关键字较窄时常常没有匹配,也要计为成功,限速才能回升)
+                throttle.on_success()
+                if self.proxy:
+                    self.proxies.on_success(self.proxy)
+            block_retries = 0
+            suspect_empty = False
+
+            seen_ids.update(new_ids)
+            page_size = len(candidates)
+            if scrolled_from is not None:
+                page_size = max(page_size - scrolled_from, len(new_candidates))
+            budget.record(page_size, len(new_candidates), len(page_jobs))
+            self._record_pagination(bool(new_candidates))
+            metrics.page_done(site)
+            metrics.inc('searchjob_candidates_total', page_size, site=site)
+            metrics.inc('searchjob_new_candidates_total', len(new_candidates), site=site)
+            metrics.inc('searchjob_duplicates_total', page_size - len(new_candidates), site=site)
+            metrics.inc('searchjob_matches_total', len(page_jobs), site=site)
+            metrics.set('searchjob_match_rate', round(budget.match_rate, 4), site=site)
+            self._report_page_progress(progress_callback, per_job_progress, results, limits, budget)
 
             # 检查是否需要翻页
-            if self._should_stop_paging(jobs, max_jobs, page_jobs):
+            if self._should_stop_paging(results, limits, budget):
+                self._cache_page(page_url, links, None)
                 break
 
+            # 连续多页与上次相同: 后面的页面通常也没有变化,直接使用缓存的结果
+            unchanged_pages = unchanged_pages + 1 if page_unchanged else 0
+            if unchanged_pages >= self.max_unchanged_pages:
+                cached = self.page_cache.get(page_url, ttl=0)
+                if cached and cached[1]:
+                    print(f"连续 {unchanged_pages} 页与上次相同,其余页面使用上次的结果")
+                    self._cache_page(page_url, links, cached[1])
+                    yield from self._replay_cached_pages(cached[1], filters, results, limits, filter_callback,
+                                                         seen_ids, budget)
+                    break
+
+            # 浏览器占用过多时在翻页前更换。点击/滚动翻页依赖当前页面的状态,新浏览器只能重新打开本页,
+            # 所以只在下一页能按URL打开时更换,否则推迟到之后的页面(超过上限期间每页都会再次提示)
+            current_url = self.driver.current_url
+            recycle_reason = self.governor.page_done(self, current_url)
+            if recycle_reason:
+                if self._next_page_by_url(current_url):
+                    self._recycle_driver(recycle_reason)
+                else:
+                    print(f"{recycle_reason},下一页需要在当前页面上翻页,暂不更换浏览器")
+
             # 翻页
-            if not self._go_to_next_page(url, page_num):
+            try:
+                next_url = self._go_to_next_page(current_url, page_num=page_num)
+            except Exception as e:
+                print(f"翻页失败: {self._format_error(e)}")
+                next_url = None
+
+            self._cache_page(page_url, links, next_url)
+            if not next_url:
                 break
+            page_url = next_url
+            scrolled_from = len(candidates) if self._pagination_type == 'scroll' else None
 
             page_num += 1
 
-        return jobs
+        print(f"\n抓取统计: {budget.summary()}")
+        if failed_pages:
+            print(f"\n⚠ 有 {len(failed_pages)} 个页面抓取失败")
+
+    def _format_error(self, error):
+        """错误信息(只取第一行,Selenium的错误信息常带有堆栈)"""
+        message = str(error).strip().splitlines()
+        message = message[0] if message else ''
+        return f"{type(error).__name__}: {message}"
+
+    def _is_session_dead(self, error):
+        """判断错误是否因为浏览器会话/窗口失效"""
+        if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+            return True
+        message = str(error).lower()
+        return any(marker in message for marker in DEAD_SESSION_MARKERS)
+
+    def _recover_driver(self, error):
+        """
+        浏览器会话失效时恢复: 优先切换/新开标签页,不行再重启浏览器
+        Returns:
+            bool: 浏览器是否可用
+        """
+        if not self._is_session_dead(error):
+            return True
+
+        # 窗口被关闭但会话仍在: 切换到剩余窗口或新开一个标签页
+        if not isinstance(error, InvalidSessionIdException):
+            try:
+                handles = self.driver.window_handles
+                if handles:
+                    self.driver.switch_to.window(handles[0])
+                else:
+                    self.driver.switch_to.new_window('tab')
+                print("✓ 已切换到新的标签页")
+                return True
+            except Exception:
+                pass
+
+        return self._restart_driver()
+
+    def _restart_driver(self):
+        """
+        重启浏览器
+        Returns:
+            bool: 是否重启成功
+        """
+        print("浏览器会话已失效,正在重启浏览器...")
+        self._quit_driver(self.driver)
+        self.driver = None
+
+        try:
+            self._init_driver(self.headless)
+        except Exception as e:
+            print(f"✗ 重启浏览器失败: {e}")
+            return False
+
+        self.restarts += 1
+        self.metrics.inc('searchjob_driver_restarts_total')
+        print(f"✓ 浏览器已重启(第 {self.restarts} 次)")
+        return True
+
+    def _recycle_driver(self, reason):
+        """
+        更换浏览器(保留Cookie),旧浏览器在后台关闭
+        Returns:
+            bool: 是否已更换
+        """
+        print(f"{reason},更换浏览器以释放内存...")
+        old_driver = self.driver
+        try:
+            cookies = old_driver.get_cookies()
+            site_url = old_driver.current_url
+        except Exception:
+            cookies, site_url = [], None
+
+        new_driver = self.governor.take_driver()
+        if new_driver is not None and self._driver_proxy_ejected(new_driver):
+            # 预热浏览器使用的出口已被移出轮换
+            self._quit_driver(new_driver)
+            new_driver = None
+        if new_driver is None:
+            try:
+                new_driver = self._create_driver(self.headless)
+            except Exception as e:
+                print(f"✗ 启动新浏览器失败,继续使用当前浏览器: {e}")
+                return False
+
+        self.driver = new_driver
+        self.wait = WebDriverWait(new_driver, 10)
+        self._restore_cookies(cookies, site_url)
 
-    def _normalize_keywords(self, keywords):
-        """标准化关键字(转小写去空)"""
-        if not keywords:
-            return set()
-        return set(k.lower() for k in keywords if k.strip())
+        thread = threading.Thread(target=self._quit_driver, args=(old_driver,), daemon=True)
+        thread.start()
+        self._retiring.append(thread)
 
-    def _visit_page(self, base_url, page_num):
-        """访问指定页面"""
-        if page_num == 1:
-            print(f"正在访问 {base_url}...")
-            self.driver.get(base_url)
+        self.recycles += 1
+        self.metrics.inc('searchjob_driver_recycles_total')
+        print(f"✓ 已更换浏览器(第 {self.recycles} 次)")
+        return True
+
+    def _restore_cookies(self, cookies, site_url):
+        """把旧浏览器的Cookie复制到新浏览器(需要先打开同一网站)"""
+        if not cookies or not site_url:
+            return
+        try:
+            if domain_of(self.driver.current_url) != domain_of(site_url):
+                parts = urlsplit(site_url)
+                self.driver.get(f"{parts.scheme}://{parts.netloc}/")
+        except Exception:
+            return
+
+        restored = 0
+        for cookie in cookies:
+            cookie = dict(cookie)
+            if 'expiry' in cookie:
+                cookie['expiry'] = int(cookie['expiry'])
+            try:
+                self.driver.add_cookie(cookie)
+                restored += 1
+            except Exception:
+                continue
+        print(f"已恢复 {restored}/{len(cookies)} 个Cookie")
+
+    def _quit_driver(self, driver):
+        """关闭浏览器(忽略错误),释放其配置目录"""
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        self._driver_proxies.pop(id(driver), None)
+        profile_dir = self._driver_profiles.pop(id(driver), None)
+        if profile_dir:
+            self.profiles.release(profile_dir)
+
+    @property
+    def proxy(self):
+        """当前浏览器使用的代理出口,直连或未使用代理池时为None"""
+        return self._driver_proxies.get(id(self.driver))
+
+    def _assign_proxy(self):
+        """为新浏览器分配出口(粘性: 同一抓取器一直使用同一个出口,直到它被移出轮换)"""
+        if not self.proxies:
+            return None
+        preferred = self.proxy_key if isinstance(self.proxy_key, int) else None
+        proxy = self.proxies.assign(self.proxy_key, preferred)
+        print(f"出口: {proxy.name}")
+        return proxy
+
+    def _proxy_route(self):
+        """当前出口名称(限速器按出口区分),直连时为None"""
+        proxy = self.proxy
+        return proxy.name if proxy and proxy.url else None
+
+    def _driver_proxy_ejected(self, driver):
+        """浏览器使用的出口是否已被移出轮换"""
+        proxy = self._driver_proxies.get(id(driver))
+        return proxy is not None and not proxy.healthy
+
+    def _on_proxy_block(self):
+        """
+        当前出口遇到拦截页: 记录,出口被移出轮换时换用其他出口重启浏览器
+        Returns:
+            bool: 是否换了出口(换出口后浏览器启动失败时self.driver为None)
+        """
+        proxy = self.proxy
+        if proxy is None:
+            return False
+        self.metrics.inc('searchjob_proxy_blocks_total', proxy=proxy.name)
+        if not self.proxies.on_block(proxy):
+            return False
+
+        self.metrics.inc('searchjob_proxy_ejections_total', proxy=proxy.name)
+        print("更换出口,重启浏览器...")
+        self._quit_driver(self.driver)
+        self.driver = None
+        try:
+            self._init_driver(self.headless)
+        except Exception as e:
+            print(f"✗ 更换出口后启动浏览器失败: {e}")
+        return True
+
+    def _visit_page(self, page_url, page_num, reload=False):
+        """
+        访问指定页面(点击翻页后浏览器已在目标页,无需重复加载)
+        Args:
+            page_url: 页面URL
+            page_num: 页码
+            reload: 是否强制重新加载
+        """
+        if reload or page_num == 1 or self.driver.current_url != page_url:
+            print(f"正在访问 {page_url}...")
+            started = time.monotonic()
+            self.driver.get(page_url)
+            self.metrics.observe('searchjob_page_load_seconds', time.monotonic() - started,
+                                 site=domain_of(page_url))
         else:
             print(f"当前页面: {self.driver.current_url}")
 
-    def _wait_for_page_load(self):
-        """等待页面完全加载"""
+    def _wait_for_page_load(self, waited=0):
+        """等待页面完全加载(waited: 打开页面后已经等待的秒数)"""
         print("等待页面加载...")
-        time.sleep(8)
+        time.sleep(max(0, 8 - waited))
 
         print("正在加载页面内容(滚动)...")
         for _ in range(5):
@@ -197,143 +715,243 @@ class JobScraper:
         print("等待职位卡片加载...")
         time.sleep(3)
 
-    def _scrape_current_page(self, keyword_set, exclude_set, target_count, jobs, progress_callback):
+    def _scrape_current_page(self):
         """
-        抓取当前页的职位信息
+        抓取当前页的链接
         Returns:
-            list: 本页找到的职位列表
+            tuple: (本页所有链接, 本页候选职位)
         """
         print("正在搜索职位链接...")
 
-        all_links = self.driver.find_elements(By.TAG_NAME, "a")
-        print(f"本页找到 {len(all_links)} 个链接")
+        links = self._extract_links()
+        print(f"本页找到 {len(links)} 个链接")
 
-        seen_urls = set()
-        seen_titles = set()
-        page_jobs = []
+        return links, page_candidates(links)
 
-        for elem in all_links:
-            # 检查是否已达到最大数量
-            if target_count and len(jobs) >= target_count:
-                break
+    def _extract_links(self):
+        """
+        一次性提取页面上所有链接的URL和文本
+        Returns:
+            list: [(href, text), ...]
+        """
+        try:
+            links = self.driver.execute_script(
+                "return Array.from(document.querySelectorAll('a'))"
+                ".map(a => [a.href || '', (a.innerText || '').trim()]);"
+            )
+            if isinstance(links, list):
+                return [(href, text) for href, text in links]
+        except Exception:
+            pass
 
+        # 脚本执行失败时,逐个读取链接元素
+        links = []
+        for elem in self.driver.find_elements(By.TAG_NAME, "a"):
             try:
-                href = elem.get_attribute('href')
-                text = elem.text.strip()
-
-                if not href or not text:
-                    continue
-
-                # 过滤非职位链接
-                if not self._is_valid_job_link(href, text):
-                    continue
-
-                # 去重
-                if not self._is_unique_job(href, text, seen_urls, seen_titles):
-                    continue
-
-                seen_urls.add(href)
-                seen_titles.add(text.lower().strip())
-
-                # 排除关键字过滤
-                if exclude_set and self._match_keywords(text, exclude_set):
-                    print(f"⊗ [跳过] {text[:60]}... (包含排除关键字)")
-                    continue
-
-                # 匹配关键字
-                if self._match_keywords(text, keyword_set):
-                    job_info = {'title': text, 'url': href}
-                    jobs.append(job_info)
-                    page_jobs.append(job_info)
-                    print(f"✓ [总计:{len(jobs)}] {text[:60]}...")
-
-                    # 更新进度
-                    if progress_callback:
-                        percent = min(95, int((len(jobs) / target_count) * 100))
-                        progress_callback(len(jobs), target_count, percent)
-
+                links.append((elem.get_attribute('href') or '', elem.text.strip()))
             except Exception:
                 continue
+        return links
 
-        return page_jobs
-
-    def _is_valid_job_link(self, href, text):
-        """判断是否为有效的职位链接"""
-        # 排除明显不是职位的链接
-        exclude_patterns = [
-            'login', 'register', 'home', 'sitemap', 'about', 'contact',
-            'help', 'faq', 'privacy', 'terms', 'javascript:', 'mailto:',
-            '.css', '.js', '.png', '.jpg', '.gif', '.svg', '.woff', '.ttf',
-            '#', 'tel:', 'weixin:', 'download'
-        ]
+    def _filter_page(self, candidates, filters, results, limits, filter_callback, seen_ids, page_url=None):
+        """
+        之前页面出现过的职位不再重复处理,其余依次交给每个过滤器
+        Returns:
+            tuple: (匹配的职位 [(过滤器序号, 职位信息), ...], 本页新职位 {职位ID: (href, text)})
+        """
+        new_ids = {}
+        for href, text in candidates:
+            key = job_id(href)
+            if key not in seen_ids:
+                new_ids.setdefault(key, (href, text))
+        new_candidates = list(new_ids.values())
+
+        # 需要时抓取本页候选职位的详情
+        descriptions = self._fetch_descriptions(new_candidates, filters)
+
+        matches = []
+        for index, (job_filter, result, limit) in enumerate(zip(filters, results, limits)):
+            for job in job_filter.apply(new_candidates, result, limit, filter_callback, descriptions, page_url):
+                matches.append((index, job))
+        return matches, new_ids
+
+    def _unchanged_page_links(self, page_url):
+        """
+        提取首屏链接,与上次访问该页时的指纹比较
+        Returns:
+            list: 未变化时返回上次缓存的完整链接(不需要再滚动加载),否则返回None
+        """
+        if self.fingerprints is None or self.page_cache is None:
+            return None
+
+        self._pending_fingerprint = None
+        time.sleep(self.quick_check_wait)
+        fingerprint, count, candidates = listing_fingerprint(self._extract_links())
+        if fingerprint is None:
+            return None
+        if count < candidates:
+            # 有候选职位共用一个职位ID,指纹相同不代表页面没有变化
+            return None
+        try:
+            unchanged = self.fingerprints.get(self.fingerprints.page_key(page_url)) == fingerprint
+            cached = self.page_cache.get(page_url, ttl=0) if unchanged else None
+        except Exception as e:
+            print(f"读取页面指纹失败: {e}")
+            return None
+        # 新指纹等本页重新抓取的链接写入缓存后再保存(见_cache_page): 抓取出错或重试时,
+        # 不能让旧的缓存链接与新指纹对应上
+        self._pending_fingerprint = (page_url, fingerprint, count)
+        if not cached:
+            return None
+
+        print(f"本页与上次相同({count} 个职位),使用上次的结果")
+        self.metrics.inc('searchjob_unchanged_pages_total', site=domain_of(page_url))
+        return cached[0]
+
+    def _replay_cached_pages(self, url, filters, results, limits, filter_callback, seen_ids, budget):
+        """
+        沿缓存的下一页URL继续过滤(不打开页面),缓存过期或达到停止条件时结束
+        Yields:
+            tuple: (过滤器序号, 职位信息)
+        """
+        for page_url, links in self.page_cache.iter_listing(url):
+            candidates = page_candidates(links)
+            matches, new_ids = self._filter_page(candidates, filters, results, limits, filter_callback, seen_ids,
+                                                 page_url)
+            yield from matches
+            seen_ids.update(new_ids)
+            budget.record(len(candidates), len(new_ids), len(matches))
+            print(f"[缓存] {page_url}: {len(matches)} 个匹配职位")
+            if self._all_limits_reached(results, limits) or budget.stop_reason():
+                break
 
-        href_lower = href.lower()
+    def _fetch_descriptions(self, candidates, filters):
+        """
+        并发抓取候选职位的详情(标题已包含排除关键字的职位不抓取)
+        Returns:
+            dict: {url: 职位描述},未设置detail_fetcher时为空
+        """
+        if not self.detail_fetcher or not candidates:
+            return {}
 
-        # 检查排除模式
-        for pattern in exclude_patterns:
-            if pattern in href_lower:
-                return False
+        urls = [
+            href for href, text in candidates
+            if any(not job_filter.exclude_set or not match_keywords(text, job_filter.exclude_set)
+                   for job_filter in filters)
+        ]
+        try:
+            self.detail_fetcher.use_browser_cookies(self.driver)
+            return self.detail_fetcher.fetch_many(urls)
+        except Exception as e:
+            # 详情抓取失败时退回到只按标题匹配
+            print(f"职位详情抓取失败,本页只按标题匹配: {self._format_error(e)}")
+            return {}
+
+    def _cache_page(self, page_url, links, next_url):
+        """把本页链接写入缓存(供修改关键字后离线重新过滤)"""
+        if self.page_cache is None:
+            return
+        try:
+            self.page_cache.put(page_url, links, next_url)
+        except Exception as e:
+            print(f"写入页面缓存失败: {e}")
+            return
 
-        # 排除纯域名链接
-        if href_lower.count('/') <= 2:
-            return False
+        # 缓存中已是本页的链接,保存与之对应的首屏指纹
+        pending, self._pending_fingerprint = self._pending_fingerprint, None
+        if pending is None or pending[0] != page_url:
+            return
+        try:
+            self.fingerprints.update(self.fingerprints.page_key(page_url), pending[1], pending[2])
+        except Exception as e:
+            print(f"保存页面指纹失败: {e}")
 
-        # 文本长度检查
-        if not (3 <= len(text) <= 200):
-            return False
+    def _check_blocked(self, candidates):
+        """
+        检查本页是否为拦截页或异常空页
+        有候选职位的页面是正常列表页,不检查拦截特征(职位标题或正文中可能恰好出现"验证码"等词)
+        Returns:
+            str: 'blocked'(命中拦截特征), 'empty'(没有任何职位链接), 正常返回None
+        """
+        if candidates:
+            return None
 
-        # 排除纯数字或特殊符号
-        if text.strip().isdigit():
-            return False
+        try:
+            page_text = self.driver.execute_script(
+                "return document.title + '\\n' + "
+                "(document.body ? document.body.innerText.slice(0, 5000) : '');"
+            )
+        except Exception:
+            page_text = ''
 
-        return True
+        marker = detect_block(page_text)
+        if marker:
+            print(f"检测到拦截页特征: {marker}")
+            return 'blocked'
 
-    def _is_unique_job(self, href, text, seen_urls, seen_titles):
-        """检查职位是否唯一"""
-        if href in seen_urls:
-            return False
-        if text.lower().strip() in seen_titles:
-            return False
-        return True
+        return 'empty'
 
-    def _match_keywords(self, text, keywords):
-        """检查文本是否包含任一关键字"""
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in keywords)
+    def _all_limits_reached(self, results, limits):
+        """所有过滤器是否都已达到最大职位数"""
+        return all(limit and len(result) >= limit for result, limit in zip(results, limits))
 
-    def _should_stop_paging(self, jobs, max_jobs, page_jobs):
+    def _should_stop_paging(self, results, limits, budget):
         """判断是否应该停止翻页"""
-        if max_jobs and len(jobs) >= max_jobs:
-            print(f"已达到最大职位数: {max_jobs},停止翻页")
+        if self._all_limits_reached(results, limits):
+            print(f"已达到最大职位数: {max(limits)},停止翻页")
             return True
 
-        if len(page_jobs) == 0:
-            print("本页没有找到职位,可能已到最后一页")
+        reason = budget.stop_reason()
+        if reason:
+            print(f"{reason},停止翻页")
             return True
 
         return False
 
-    def _go_to_next_page(self, url, page_num):
+    def _report_page_progress(self, progress_callback, per_job_progress, results, limits, budget):
+        """每页汇总报告一次进度(逐条报告时跳过)"""
+        if not progress_callback or per_job_progress:
+            return
+        current = sum(len(result) for result in results)
+        if all(limits):
+            total = sum(limits)
+            progress_callback(current, total, min(95, int(current / total * 100)))
+        else:
+            # 不限制职位数时按翻页预算估计进度
+            progress_callback(current, current, budget.percent())
+
+    def _go_to_next_page(self, current_url, allow_click=True, page_num=1):
         """
         翻到下一页
+        Args:
+            current_url: 当前页URL
+            allow_click: 是否允许点击翻页(当前页加载失败时无法点击)
+            page_num: 当前页码
         Returns:
-            bool: True表示成功翻页,False表示失败
+            str: 下一页URL,失败返回None
         """
-        print("\n尝试点击下一页...")
-
-        current_url = self.driver.current_url
+        print("\n尝试翻到下一页...")
+        self._pagination_type = None
 
         # 智联招聘: /p1 -> /p2 -> /p3
         if 'zhaopin.com' in current_url:
+            self._pagination_type = 'url'
             return self._paginate_zhaopin(current_url)
 
         # 猎聘: currentPage=0 -> currentPage=1
         elif 'liepin.com' in current_url:
+            self._pagination_type = 'url'
             return self._paginate_liepin(current_url)
 
-        # 其他网站: 尝试点击按钮
-        else:
-            return self._click_next_button()
+        # 其他网站: 使用学到的翻页方式,没有时在当前页识别
+        return self._paginate_learned(current_url, allow_click, page_num)
+
+    def _next_page_by_url(self, current_url):
+        """下一页能否直接按URL打开(智联、猎聘,或该域名学到的是URL翻页)"""
+        if 'zhaopin.com' in current_url or 'liepin.com' in current_url:
+            return True
+        strategy = self.pagination.get(domain_of(current_url)) if self.pagination else None
+        return bool(strategy and strategy['type'] == 'url')
 
     def _paginate_zhaopin(self, current_url):
         """智联招聘翻页策略"""
@@ -354,9 +972,7 @@ class JobScraper:
             print(f"添加页码: p2")
 
         print(f"下一页URL: {next_url}")
-        self.driver.get(next_url)
-        time.sleep(5)
-        return True
+        return next_url
 
     def _paginate_liepin(self, current_url):
         """猎聘翻页策略"""
@@ -377,80 +993,69 @@ class JobScraper:
             print(f"添加页码: currentPage=1")
 
         print(f"下一页URL: {next_url}")
-        self.driver.get(next_url)
-        time.sleep(5)
-        return True
+        return next_url
 
-    def _click_next_button(self):
+    def _paginate_learned(self, current_url, allow_click, page_num):
         """
-        尝试点击下一页按钮(通用方法)
+        其他网站翻页: 优先使用该域名学到的翻页方式,不可用时在当前页重新识别并保存
         Returns:
-            bool: 是否成功点击
-        """
-        print("正在查找下一页按钮...")
-
-        # 定义多种选择器
-        selectors = [
-            # 文本匹配
-            "//a[contains(text(), '下一页')]",
-            "//a[contains(text(), '下一页>')]",
-            "//a[contains(text(), '»')]",
-            "//a[contains(text(), '>')]",
-            "//span[contains(text(), '下一页')]/parent::a",
-            "//button[contains(text(), '下一页')]",
-            # class属性匹配
-            "//a[contains(@class, 'next')]",
-            "//li[contains(@class, 'next')]/a",
-            "//li[contains(@class, 'Next')]/a",
-            "//button[contains(@class, 'next')]",
-            # 通用翻页
-            "//a[@aria-label='Next']",
-            "//a[@aria-label='next']",
-        ]
-
-        # 尝试每个选择器
-        for selector in selectors:
-            try:
-                next_button = self.driver.find_element(By.XPATH, selector)
-                if next_button.is_display() and next_button.is_enabled():
-                    print(f"✓ 找到下一页按钮")
-                    self.driver.execute_script("arguments[0].click();", next_button)
-                    time.sleep(1)
-                    return True
-            except:
-                continue
-
-        # 尝试查找页码链接(如"2")
-        print("尝试查找页码链接...")
-        all_links = self.driver.find_elements(By.TAG_NAME, "a")
-        for link in all_links:
-            try:
-                href = link.get_attribute('href', '')
-                text = link.text.strip()
-
-                # 查找指向第2页的链接
-                if ('/p2' in href or '/p2?' in href or 'currentPage=1' in href):
-                    if link.is_display() and link.is_enabled():
-                        print(f"✓ 找到第2页链接")
-                        link.click()
-                        time.sleep(1)
-                        return True
-
-                # 查找包含数字2的翻页链接
-                if text == '2':
-                    if link.is_display() and link.is_enabled():
-                        print(f"✓ 找到页码2链接")
-                        link.click()
-                        time.sleep(1)
-                        return True
-            except:
-                continue
-
-        # 调试信息
-        self._print_page_links_debug()
+            str: 下一页URL,失败返回None
+        """
+        domain = domain_of(current_url)
+        strategy = self.pagination.get(domain) if self.pagination else None
+        if strategy:
+            print(f"使用学到的翻页方式: {describe(strategy)}")
+            next_url = self._apply_pagination(strategy, current_url, allow_click)
+            if next_url:
+                self._pagination_domain = domain
+                self._pagination_type = strategy['type']
+                return next_url
+            print("学到的翻页方式在本页不可用,重新识别")
+
+        if not allow_click:
+            return None
+
+        print("正在识别翻页方式...")
+        strategy, next_url = detect_strategy(self.driver, current_url, page_num)
+        if not strategy:
+            self._print_page_links_debug()
+            print("未找到可用的下一页按钮")
+            return None
+
+        print(f"✓ 识别到翻页方式: {describe(strategy)}")
+        if self.pagination:
+            self.pagination.put(domain, strategy)
+            self._pagination_domain = domain
+        if strategy['type'] == 'click':
+            next_url = self._apply_pagination(strategy, current_url, allow_click)
+        if next_url:
+            self._pagination_type = strategy['type']
+        return next_url
+
+    def _apply_pagination(self, strategy, current_url, allow_click):
+        """
+        按翻页方式翻到下一页
+        Returns:
+            str: 下一页URL(点击翻页、滚动加载时为浏览器当前URL),不可用时返回None
+        """
+        if strategy['type'] == 'url':
+            return next_page_url(current_url, strategy)
+        if not allow_click:
+            return None
+        if strategy['type'] == 'click':
+            if not click_next(self.driver, strategy['rule']):
+                return None
+            time.sleep(1)
+            return self.driver.current_url
+        # 无限滚动: 停留在当前页,滚动加载更多,已出现过的职位由跨页去重过滤
+        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        return self.driver.current_url
 
-        print("未找到可用的下一页按钮")
-        return False
+    def _record_pagination(self, success):
+        """按学到的方式翻页后,记录下一页是否有新职位(连续失败时删除该方式)"""
+        domain, self._pagination_domain = self._pagination_domain, None
+        if domain and self.pagination and self.pagination.record(domain, success):
+            print(f"学到的翻页方式多次没有得到新职位,下次重新识别: {domain}")
 
     def _print_page_links_debug(self):
         """打印页面链接用于调试"""
@@ -459,7 +1064,7 @@ class JobScraper:
         for i, link in enumerate(all_links[:30]):
             try:
                 text = link.text.strip()
-                href = link.get_attribute('href', '')
+                href = link.get_attribute('href') or ''
                 if text:
                     print(f"  [{i}] 文本='{text[:50]}' href='{href[:80]}'")
             except:
@@ -467,12 +1072,16 @@ class JobScraper:
 
     def close(self):
         """关闭浏览器"""
+        if getattr(self, 'governor', None):
+            self.governor.close(self)
+        for thread in getattr(self, '_retiring', []):
+            thread.join()
         if hasattr(self, 'driver') and self.driver:
-            try:
-                self.driver.quit()
-                print("\n浏览器已关闭")
-            except:
-                pass
+            self._quit_driver(self.driver)
+            self.driver = None
+            print("\n浏览器已关闭")
+        if getattr(self, 'proxies', None):
+            self.proxies.release(self.proxy_key)
 
     def __del__(self):
         """析构函数,确保浏览器被关闭"""